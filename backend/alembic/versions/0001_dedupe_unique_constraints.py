@@ -0,0 +1,163 @@
+"""Deduplicate rows and add the unique constraints used by upserts
+
+Databases created before these constraints existed were built by create_all,
+which never alters existing tables, so the ON CONFLICT (constraint) upserts
+fail there. This backfills concepts.normalized_name, collapses duplicates and
+adds uq_concept_user_normalized_name, uq_daily_log_user_date and
+uq_assignment_log_title. Safe to run on a database that already has them.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_unique(inspector, table: str, name: str) -> bool:
+    return any(c["name"] == name for c in inspector.get_unique_constraints(table))
+
+
+def _backfill_normalized_names():
+    # Same key as normalize_concept_name(): lowercased, whitespace collapsed
+    op.execute("ALTER TABLE concepts ADD COLUMN IF NOT EXISTS normalized_name VARCHAR(255)")
+    op.execute("""
+        UPDATE concepts
+        SET normalized_name = left(regexp_replace(btrim(lower(name)), '\\s+', ' ', 'g'), 255)
+        WHERE normalized_name IS NULL
+    """)
+    op.execute("ALTER TABLE concepts ALTER COLUMN normalized_name SET NOT NULL")
+
+
+def _dedupe_concepts():
+    """Keep the earliest-learned concept per (user, normalized name) and move links onto it"""
+    op.execute("""
+        CREATE TEMP TABLE concept_dupes AS
+        SELECT id AS duplicate_id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY user_id, normalized_name
+                ORDER BY first_learned_date NULLS LAST, created_at, id
+            ) AS keep_id
+            FROM concepts
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        INSERT INTO log_concepts (log_id, concept_id, context)
+        SELECT lc.log_id, d.keep_id, lc.context
+        FROM log_concepts lc JOIN concept_dupes d ON lc.concept_id = d.duplicate_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("""
+        UPDATE concept_relations SET concept_a_id = d.keep_id
+        FROM concept_dupes d WHERE concept_a_id = d.duplicate_id
+    """)
+    op.execute("""
+        UPDATE concept_relations SET concept_b_id = d.keep_id
+        FROM concept_dupes d WHERE concept_b_id = d.duplicate_id
+    """)
+    op.execute("DELETE FROM concept_relations WHERE concept_a_id = concept_b_id")
+    op.execute("""
+        UPDATE concepts c
+        SET definition = COALESCE(c.definition, dup.definition),
+            category = COALESCE(c.category, dup.category),
+            times_practiced = (SELECT count(*) FROM log_concepts lc WHERE lc.concept_id = c.id)
+        FROM concept_dupes d JOIN concepts dup ON dup.id = d.duplicate_id
+        WHERE c.id = d.keep_id
+    """)
+    op.execute("DELETE FROM concepts WHERE id IN (SELECT duplicate_id FROM concept_dupes)")
+    op.execute("DROP TABLE concept_dupes")
+
+
+def _dedupe_daily_logs():
+    """Keep the most recently updated log per (user, date); its concepts, patterns and assignments survive"""
+    op.execute("""
+        CREATE TEMP TABLE log_dupes AS
+        SELECT id AS duplicate_id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY user_id, log_date
+                ORDER BY updated_at DESC NULLS LAST, created_at DESC, id
+            ) AS keep_id
+            FROM daily_logs
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        INSERT INTO log_concepts (log_id, concept_id, context)
+        SELECT d.keep_id, lc.concept_id, lc.context
+        FROM log_concepts lc JOIN log_dupes d ON lc.log_id = d.duplicate_id
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("""
+        INSERT INTO pattern_instances (pattern_id, log_id, notes)
+        SELECT pi.pattern_id, d.keep_id, pi.notes
+        FROM pattern_instances pi JOIN log_dupes d ON pi.log_id = d.duplicate_id
+        ON CONFLICT DO NOTHING
+    """)
+    # Assignments would otherwise lose their log (ON DELETE SET NULL); duplicates are collapsed next
+    op.execute("""
+        UPDATE assignments SET log_id = d.keep_id
+        FROM log_dupes d WHERE log_id = d.duplicate_id
+    """)
+    # Activities, remaining links and ingestion jobs of the duplicates go with them via ON DELETE CASCADE
+    op.execute("DELETE FROM daily_logs WHERE id IN (SELECT duplicate_id FROM log_dupes)")
+    op.execute("DROP TABLE log_dupes")
+
+
+def _dedupe_assignments():
+    """Keep one assignment per (log, title), preferring completed then newest"""
+    op.execute("""
+        DELETE FROM assignments WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY log_id, title
+                    ORDER BY (status = 'completed') DESC NULLS LAST,
+                             completed_at DESC NULLS LAST, created_at DESC, id
+                ) AS rank
+                FROM assignments
+                WHERE log_id IS NOT NULL
+            ) ranked
+            WHERE rank > 1
+        )
+    """)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    
+    if "concepts" in tables and not _has_unique(inspector, "concepts", "uq_concept_user_normalized_name"):
+        _backfill_normalized_names()
+        _dedupe_concepts()
+        op.create_unique_constraint(
+            "uq_concept_user_normalized_name", "concepts", ["user_id", "normalized_name"]
+        )
+    
+    if "daily_logs" in tables and not _has_unique(inspector, "daily_logs", "uq_daily_log_user_date"):
+        _dedupe_daily_logs()
+        op.create_unique_constraint(
+            "uq_daily_log_user_date", "daily_logs", ["user_id", "log_date"]
+        )
+    
+    if "assignments" in tables and not _has_unique(inspector, "assignments", "uq_assignment_log_title"):
+        _dedupe_assignments()
+        op.create_unique_constraint(
+            "uq_assignment_log_title", "assignments", ["log_id", "title"]
+        )
+
+
+def downgrade() -> None:
+    # Merged duplicates are not restored
+    op.drop_constraint("uq_assignment_log_title", "assignments", type_="unique")
+    op.drop_constraint("uq_daily_log_user_date", "daily_logs", type_="unique")
+    op.drop_constraint("uq_concept_user_normalized_name", "concepts", type_="unique")
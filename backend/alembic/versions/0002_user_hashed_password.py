@@ -0,0 +1,30 @@
+"""Add users.hashed_password for password login
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "users" not in inspector.get_table_names():
+        return
+    if "hashed_password" not in {c["name"] for c in inspector.get_columns("users")}:
+        op.add_column("users", sa.Column("hashed_password", sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "hashed_password")
@@ -0,0 +1,30 @@
+"""Add ingestion_jobs.heartbeat_at lease column
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "ingestion_jobs" not in inspector.get_table_names():
+        return
+    if "heartbeat_at" not in {c["name"] for c in inspector.get_columns("ingestion_jobs")}:
+        op.add_column("ingestion_jobs", sa.Column("heartbeat_at", sa.TIMESTAMP(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ingestion_jobs", "heartbeat_at")
@@ -0,0 +1,23 @@
+"""
+API Dependencies
+Resolve the authenticated user from the bearer token without touching the database
+"""
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+import uuid
+
+from app.core.security import token_verifier, InvalidTokenError
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+
+
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> uuid.UUID:
+    """User id from a valid access token (401 otherwise)"""
+    try:
+        return token_verifier.verify(token)
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired access token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
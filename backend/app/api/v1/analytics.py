@@ -0,0 +1,146 @@
+"""
+Analytics API Endpoints
+Serve dashboard metrics from the incrementally maintained rollup table
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from typing import List, Optional
+from datetime import date, timedelta
+from collections import Counter
+import uuid
+
+from app.database import get_db
+from app.api.deps import get_current_user_id
+from app.schemas.common import AnalyticsResponse, AnalyticsPeriodResponse, StreakResponse
+from app.models import AnalyticsRollup, Concept
+from app.services.analytics_rollups import ROLLUP_PERIODS, TOTAL_PERIOD
+
+router = APIRouter()
+
+
+async def _latest_day_row(db: AsyncSession, user_id: uuid.UUID) -> Optional[AnalyticsRollup]:
+    result = await db.execute(
+        select(AnalyticsRollup).where(
+            and_(
+                AnalyticsRollup.user_id == user_id,
+                AnalyticsRollup.period == "day",
+                AnalyticsRollup.log_count > 0
+            )
+        ).order_by(AnalyticsRollup.period_start.desc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _streaks(db: AsyncSession, user_id: uuid.UUID) -> StreakResponse:
+    """Current streak counts only if the last logged day is today or yesterday"""
+    latest = await _latest_day_row(db, user_id)
+    if not latest:
+        return StreakResponse(current_streak=0, longest_streak=0)
+    
+    # Longest streak is kept on the user's total row as day rows are renumbered
+    result = await db.execute(
+        select(AnalyticsRollup.streak_days).where(
+            and_(
+                AnalyticsRollup.user_id == user_id,
+                AnalyticsRollup.period == TOTAL_PERIOD
+            )
+        )
+    )
+    current = latest.streak_days or 0
+    if latest.period_start < date.today() - timedelta(days=1):
+        current = 0
+    return StreakResponse(
+        current_streak=current,
+        longest_streak=result.scalar() or 0,
+        last_logged_date=latest.period_start
+    )
+
+
+@router.get("/analytics/activity", response_model=List[AnalyticsPeriodResponse])
+async def get_activity(
+    period: str = Query("day", description="day, week or month"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Activity minutes by type, mood/difficulty distributions and concept counts
+    per period (defaults: the last 30 days, 12 weeks or 12 months)
+    """
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"period must be one of {', '.join(ROLLUP_PERIODS)}"
+        )
+    
+    end_date = end_date or date.today()
+    if not start_date:
+        lookback = {"day": 29, "week": 7 * 12 - 1, "month": 365}[period]
+        start_date = end_date - timedelta(days=lookback)
+    
+    result = await db.execute(
+        select(AnalyticsRollup).where(
+            and_(
+                AnalyticsRollup.user_id == user_id,
+                AnalyticsRollup.period == period,
+                AnalyticsRollup.period_end >= start_date,
+                AnalyticsRollup.period_start <= end_date,
+                AnalyticsRollup.log_count > 0
+            )
+        ).order_by(AnalyticsRollup.period_start)
+    )
+    return result.scalars().all()
+
+
+@router.get("/analytics/streaks", response_model=StreakResponse)
+async def get_streaks(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Current and longest consecutive-day logging streaks"""
+    return await _streaks(db, user_id)
+
+
+@router.get("/analytics/overview", response_model=AnalyticsResponse)
+async def get_overview(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """All-time totals, summed over the monthly rollups"""
+    result = await db.execute(
+        select(AnalyticsRollup).where(
+            and_(
+                AnalyticsRollup.user_id == user_id,
+                AnalyticsRollup.period == "month"
+            )
+        )
+    )
+    months = result.scalars().all()
+    difficulties = Counter()
+    for month in months:
+        difficulties.update(month.difficulty_counts or {})
+    
+    result = await db.execute(
+        select(Concept.name, Concept.mastery_level, Concept.times_practiced)
+        .where(Concept.user_id == user_id)
+        .order_by(Concept.times_practiced.desc(), Concept.mastery_level.desc())
+        .limit(10)
+    )
+    top_concepts = [
+        {"name": name, "mastery_level": level, "times_practiced": practiced}
+        for name, level, practiced in result.all()
+    ]
+    
+    streaks = await _streaks(db, user_id)
+    
+    return AnalyticsResponse(
+        total_days_logged=sum(month.log_count for month in months),
+        total_concepts_learned=sum(month.new_concept_count for month in months),
+        total_activities=sum(month.activity_count for month in months),
+        total_assignments=sum(month.assignment_count for month in months),
+        learning_streak=streaks.current_streak,
+        most_common_difficulties=[level for level, _ in difficulties.most_common()],
+        top_concepts=top_concepts
+    )
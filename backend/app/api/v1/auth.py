@@ -0,0 +1,90 @@
+"""
+Authentication API Endpoints
+Register accounts and issue signed access tokens
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+import asyncio
+import uuid
+
+from app.database import get_db
+from app.schemas.common import UserCreate, UserResponse, TokenResponse
+from app.models import User
+from app.core.security import hash_password, verify_password, create_access_token
+from app.api.deps import get_current_user_id
+
+router = APIRouter()
+
+
+def _email_taken(email: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"An account for {email} already exists"
+    )
+
+
+def _token_response(user_id: uuid.UUID) -> TokenResponse:
+    token, expires_in = create_access_token(user_id)
+    return TokenResponse(access_token=token, expires_in=expires_in)
+
+
+@router.post("/auth/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+async def register(
+    user_data: UserCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create an account and return an access token for it"""
+    email = user_data.email.strip().lower()
+    result = await db.execute(select(User.id).where(User.email == email))
+    if result.scalar_one_or_none():
+        raise _email_taken(email)
+    
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed = await asyncio.to_thread(hash_password, user_data.password)
+    user = User(email=email, full_name=user_data.full_name, hashed_password=hashed)
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent registration took the email after the check above
+        await db.rollback()
+        raise _email_taken(email)
+    
+    return _token_response(user.id)
+
+
+@router.post("/auth/token", response_model=TokenResponse)
+async def login(
+    form: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    """OAuth2 password flow: the username field carries the email"""
+    result = await db.execute(select(User).where(User.email == form.username.strip().lower()))
+    user = result.scalar_one_or_none()
+    
+    if not user or not await asyncio.to_thread(verify_password, form.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    
+    return _token_response(user.id)
+
+
+@router.get("/auth/me", response_model=UserResponse)
+async def read_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Profile of the authenticated user"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User no longer exists"
+        )
+    return user
@@ -2,64 +2,64 @@
 Daily Log Ingestion API Endpoints
 Handle creation and retrieval of daily logs
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Tuple, AsyncIterator, Dict, Any, Optional
 from datetime import date
+import asyncio
+import base64
+import json
 import uuid
 
-from app.database import get_db
-from app.schemas.common import DailyLogCreate, DailyLogResponse
-from app.models import DailyLog, User
-from app.services.llm_service import llm_service
-from app.core.embeddings import embedding_generator
-from app.core.vector_store import vector_store
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.api.deps import get_current_user_id
+from app.schemas.common import DailyLogCreate, DailyLogResponse, DailyLogListItem, IngestionJobResponse
+from app.models import DailyLog, IngestionJob
+from app.services.ingestion_pipeline import (
+    extract_log_data, extract_log_data_batch, apply_structured_data,
+    materialize_structured_data, embed_new_concepts,
+    generate_log_embedding, generate_log_embeddings,
+    upsert_log_embedding, upsert_log_embeddings, refresh_log_embedding
+)
+from app.services.ingestion_jobs import ingestion_workers, initial_stages
+from app.services.lexical_search import index_log_text
+from app.services.summary_engine import invalidate_summaries
 
 router = APIRouter()
 
-# Temporary: For single-user MVP, use a fixed user ID
-# TODO: Replace with proper authentication
-TEMP_USER_ID = "00000000-0000-0000-0000-000000000001"
 
-
-async def get_or_create_temp_user(db: AsyncSession) -> str:
-    """Get or create temporary user for MVP"""
-    result = await db.execute(
-        select(User).where(User.id == uuid.UUID(TEMP_USER_ID))
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        user = User(
-            id=uuid.UUID(TEMP_USER_ID),
-            email="temp@intern-ai.com",
-            full_name="Test User"
-        )
-        db.add(user)
-        await db.commit()
-    
-    return TEMP_USER_ID
-
-
-@router.post("/logs/daily", response_model=DailyLogResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/logs/daily",
+    response_model=DailyLogResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": IngestionJobResponse}}
+)
 async def create_daily_log(
     log_data: DailyLogCreate,
+    background: bool = False,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new daily log entry
     
     - Extracts structured data using Gemini
-    - Stores in PostgreSQL
+    - Stores in PostgreSQL, normalizing concepts, activities and assignments
     - Generates and stores embeddings in Qdrant
-    """
-    user_id = await get_or_create_temp_user(db)
     
+    With `background=true` only the raw log is persisted; the remaining
+    stages run on the ingestion worker pool and the response is 202 with
+    a job to poll at GET /jobs/{job_id}.
+    """
     # Check if log for this date already exists
     result = await db.execute(
         select(DailyLog).where(
-            DailyLog.user_id == uuid.UUID(user_id),
+            DailyLog.user_id == user_id,
             DailyLog.log_date == log_data.log_date
         )
     )
@@ -71,58 +71,274 @@ async def create_daily_log(
             detail=f"Log for {log_data.log_date} already exists. Use PUT to update."
         )
     
+    if background:
+        daily_log = DailyLog(
+            user_id=user_id,
+            log_date=log_data.log_date,
+            raw_text=log_data.raw_text
+        )
+        db.add(daily_log)
+        await db.flush()
+        
+        job = IngestionJob(
+            user_id=user_id,
+            log_id=daily_log.id,
+            status="queued",
+            stages=initial_stages()
+        )
+        db.add(job)
+        await invalidate_summaries(db, daily_log.user_id, [daily_log.log_date])
+        await db.commit()
+        await db.refresh(job)
+        
+        if not ingestion_workers.enqueue(job.id):
+            print(f"⚠️ Ingestion queue full; job {job.id} left for the next sweep")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=IngestionJobResponse.model_validate(job).model_dump(mode="json")
+        )
+    
     # Extract structured data using LLM
-    print(f"🤖 Extracting structured data from log...")
-    try:
-        structured_data = llm_service.extract_structured_data(log_data.raw_text)
-    except Exception as e:
-        print(f"⚠️ LLM extraction failed: {e}")
-        structured_data = {}
+    structured_data = await extract_log_data(log_data.raw_text)
     
     # Create daily log
     daily_log = DailyLog(
-        user_id=uuid.UUID(user_id),
+        user_id=user_id,
         log_date=log_data.log_date,
-        raw_text=log_data.raw_text,
-        structured_data=structured_data,
-        mood=structured_data.get("mood"),
-        difficulty_level=structured_data.get("difficulty_level")
+        raw_text=log_data.raw_text
     )
+    apply_structured_data(daily_log, structured_data)
     
     db.add(daily_log)
+    await db.flush()
+    new_concepts = await materialize_structured_data(db, [daily_log])
+    await invalidate_summaries(db, daily_log.user_id, [daily_log.log_date])
     await db.commit()
     await db.refresh(daily_log)
+    index_log_text(daily_log)
     
-    # Generate and store embedding (async task in production)
+    # Generate and store embedding
     try:
-        embedding = embedding_generator.generate_log_embedding(log_data.raw_text)
-        concepts = structured_data.get("concepts", [])
-        
-        vector_store.add_log_embedding(
-            log_id=str(daily_log.id),
-            embedding=embedding,
-            log_date=str(log_data.log_date),
-            summary=log_data.raw_text[:200],  # First 200 chars as summary
-            concepts=concepts
-        )
+        embedding = await generate_log_embedding(log_data.raw_text)
+        await upsert_log_embedding(daily_log, embedding)
         print(f"✅ Stored embedding in Qdrant")
     except Exception as e:
         print(f"⚠️ Failed to store embedding: {e}")
     
+    try:
+        await embed_new_concepts(new_concepts)
+    except Exception as e:
+        print(f"⚠️ Failed to store concept embeddings: {e}")
+    
     return daily_log
 
 
+@router.post("/logs/daily/bulk")
+async def bulk_create_daily_logs(
+    request: Request,
+    user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """
+    Bulk-create daily logs from an NDJSON body (one DailyLogCreate per line)
+    
+    Lines are processed in batches: grouped LLM extraction, one multi-row
+    insert, one embedding call and one multi-point Qdrant upsert per batch.
+    One NDJSON result per input line is streamed back as batches finish.
+    """
+    # Read the whole body first: a streaming response listens for client
+    # disconnects on the same receive channel and would swallow body chunks
+    lines: List[bytes] = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        lines.extend(complete)
+    lines.append(buffer)
+    entries = [(number, line) for number, line in enumerate(lines, start=1) if line.strip()]
+    
+    return StreamingResponse(
+        _bulk_ingest(user_id, entries),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _bulk_ingest(user_id: uuid.UUID, entries: List[Tuple[int, bytes]]) -> AsyncIterator[str]:
+    """Process NDJSON entries batch by batch, yielding one result line per entry"""
+    seen_dates = set()
+    batch_size = settings.bulk_ingest_batch_size
+    group_size = settings.bulk_extraction_group_size
+    
+    for offset in range(0, len(entries), batch_size):
+        results: Dict[int, Dict[str, Any]] = {}
+        valid: List[Tuple[int, DailyLogCreate]] = []
+        
+        for number, line in entries[offset:offset + batch_size]:
+            try:
+                log_data = DailyLogCreate.model_validate_json(line)
+            except ValidationError as e:
+                results[number] = {"line": number, "status": "error", "detail": e.errors(include_url=False)}
+                continue
+            if log_data.log_date in seen_dates:
+                results[number] = {"line": number, "status": "error",
+                                   "detail": f"Duplicate log_date {log_data.log_date} in request"}
+                continue
+            seen_dates.add(log_data.log_date)
+            valid.append((number, log_data))
+        
+        async with AsyncSessionLocal() as db:
+            if valid:
+                existing = await db.execute(
+                    select(DailyLog.log_date).where(
+                        DailyLog.user_id == user_id,
+                        DailyLog.log_date.in_([log_data.log_date for _, log_data in valid])
+                    )
+                )
+                existing_dates = set(existing.scalars().all())
+                for number, log_data in valid:
+                    if log_data.log_date in existing_dates:
+                        results[number] = {"line": number, "status": "error",
+                                           "detail": f"Log for {log_data.log_date} already exists. Use PUT to update."}
+                valid = [(number, log_data) for number, log_data in valid
+                         if log_data.log_date not in existing_dates]
+            
+            if valid:
+                texts = [log_data.raw_text for _, log_data in valid]
+                grouped = await asyncio.gather(*(
+                    extract_log_data_batch(texts[i:i + group_size])
+                    for i in range(0, len(texts), group_size)
+                ))
+                extracted = [data for group in grouped for data in group]
+                
+                logs = []
+                for (number, log_data), structured_data in zip(valid, extracted):
+                    log = DailyLog(
+                        id=uuid.uuid4(),
+                        user_id=user_id,
+                        log_date=log_data.log_date,
+                        raw_text=log_data.raw_text
+                    )
+                    apply_structured_data(log, structured_data)
+                    logs.append(log)
+                
+                # A concurrent POST may have taken a date since the check above
+                inserted = await db.execute(
+                    insert(DailyLog).values([
+                        {
+                            "id": log.id,
+                            "user_id": log.user_id,
+                            "log_date": log.log_date,
+                            "raw_text": log.raw_text,
+                            "structured_data": log.structured_data,
+                            "mood": log.mood,
+                            "difficulty_level": log.difficulty_level
+                        }
+                        for log in logs
+                    ]).on_conflict_do_nothing(
+                        constraint="uq_daily_log_user_date"
+                    ).returning(DailyLog.id)
+                )
+                inserted_ids = set(inserted.scalars().all())
+                for (number, log_data), log in zip(valid, logs):
+                    if log.id not in inserted_ids:
+                        results[number] = {"line": number, "status": "error",
+                                           "detail": f"Log for {log_data.log_date} already exists. Use PUT to update."}
+                kept = [(entry, log) for entry, log in zip(valid, logs) if log.id in inserted_ids]
+                valid = [entry for entry, _ in kept]
+                logs = [log for _, log in kept]
+            
+            if valid:
+                texts = [log.raw_text for log in logs]
+                new_concepts = await materialize_structured_data(db, logs)
+                await invalidate_summaries(db, user_id, [log.log_date for log in logs])
+                await db.commit()
+                for log in logs:
+                    index_log_text(log)
+                
+                embedded = True
+                try:
+                    embeddings = await generate_log_embeddings(texts)
+                    await upsert_log_embeddings(logs, embeddings)
+                except Exception as e:
+                    print(f"⚠️ Failed to store batch embeddings: {e}")
+                    embedded = False
+                
+                try:
+                    await embed_new_concepts(new_concepts)
+                except Exception as e:
+                    print(f"⚠️ Failed to store concept embeddings: {e}")
+                
+                for (number, _), log in zip(valid, logs):
+                    results[number] = {
+                        "line": number,
+                        "status": "created",
+                        "id": str(log.id),
+                        "log_date": str(log.log_date),
+                        "embedded": embedded
+                    }
+        
+        for number in sorted(results):
+            yield json.dumps(results[number], default=str) + "\n"
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: uuid.UUID,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get stage-by-stage status of a background ingestion job"""
+    job = await db.get(IngestionJob, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No job found with id {job_id}"
+        )
+    
+    return job
+
+
+@router.post("/jobs/{job_id}/retry", response_model=IngestionJobResponse)
+async def retry_ingestion_job(
+    job_id: uuid.UUID,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-queue a failed job; stages that already completed are not repeated"""
+    job = await db.get(IngestionJob, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No job found with id {job_id}"
+        )
+    if job.status != "failed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} is {job.status}; only failed jobs can be retried"
+        )
+    
+    job.stages = {
+        stage: "pending" if state == "failed" else state
+        for stage, state in job.stages.items()
+    }
+    job.status = "queued"
+    job.error = None
+    await db.commit()
+    await db.refresh(job)
+    
+    ingestion_workers.enqueue(job.id)
+    return job
+
+
 @router.get("/logs/daily/{log_date}", response_model=DailyLogResponse)
 async def get_daily_log(
     log_date: date,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Get daily log by date"""
-    user_id = await get_or_create_temp_user(db)
-    
     result = await db.execute(
         select(DailyLog).where(
-            DailyLog.user_id == uuid.UUID(user_id),
+            DailyLog.user_id == user_id,
             DailyLog.log_date == log_date
         )
     )
@@ -137,39 +353,94 @@ async def get_daily_log(
     return log
 
 
-@router.get("/logs/daily", response_model=List[DailyLogResponse])
+LIST_FIELDS = tuple(DailyLogListItem.model_fields)
+LIST_KEY_FIELDS = ("id", "log_date")
+
+
+def _encode_cursor(log_date: date, log_id: uuid.UUID) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(f"{log_date.isoformat()}|{log_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, uuid.UUID]:
+    try:
+        log_date, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(log_date), uuid.UUID(log_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Requested columns, always including the cursor keys"""
+    if not fields:
+        return list(LIST_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(LIST_FIELDS)}"
+        )
+    return list(LIST_KEY_FIELDS) + [field for field in requested if field not in LIST_KEY_FIELDS]
+
+
+@router.get(
+    "/logs/daily",
+    response_model=List[DailyLogListItem],
+    response_model_exclude_unset=True
+)
 async def list_daily_logs(
-    skip: int = 0,
-    limit: int = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. log_date,mood"),
+    skip: Optional[int] = Query(None, ge=0, deprecated=True),
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all daily logs with pagination"""
-    user_id = await get_or_create_temp_user(db)
+    """
+    List daily logs, newest first, with keyset pagination on (log_date, id)
     
-    result = await db.execute(
-        select(DailyLog)
-        .where(DailyLog.user_id == uuid.UUID(user_id))
-        .order_by(DailyLog.log_date.desc())
-        .offset(skip)
-        .limit(limit)
+    When more logs remain, the `X-Next-Cursor` response header holds the
+    cursor for the next page. `fields` limits the columns loaded and returned.
+    """
+    columns = _parse_fields(fields)
+    
+    query = (
+        select(*(getattr(DailyLog, column) for column in columns))
+        .where(DailyLog.user_id == user_id)
+        .order_by(DailyLog.log_date.desc(), DailyLog.id.desc())
+        .limit(limit + 1)
     )
-    logs = result.scalars().all()
+    if cursor:
+        query = query.where(tuple_(DailyLog.log_date, DailyLog.id) < _decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.execute(query)
+    rows = result.mappings().all()
     
-    return logs
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1]["log_date"], rows[-1]["id"])
+    
+    return [dict(row) for row in rows]
 
 
 @router.put("/logs/daily/{log_date}", response_model=DailyLogResponse)
 async def update_daily_log(
     log_date: date,
     log_data: DailyLogCreate,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Update an existing daily log"""
-    user_id = await get_or_create_temp_user(db)
-    
     result = await db.execute(
         select(DailyLog).where(
-            DailyLog.user_id == uuid.UUID(user_id),
+            DailyLog.user_id == user_id,
             DailyLog.log_date == log_date
         )
     )
@@ -182,19 +453,30 @@ async def update_daily_log(
         )
     
     # Re-extract structured data
-    try:
-        structured_data = llm_service.extract_structured_data(log_data.raw_text)
-    except Exception as e:
-        print(f"⚠️ LLM extraction failed: {e}")
-        structured_data = log.structured_data or {}
+    structured_data = await extract_log_data(
+        log_data.raw_text, fallback=log.structured_data or {}
+    )
     
     # Update log
     log.raw_text = log_data.raw_text
-    log.structured_data = structured_data
-    log.mood = structured_data.get("mood")
-    log.difficulty_level = structured_data.get("difficulty_level")
+    apply_structured_data(log, structured_data)
+    new_concepts = await materialize_structured_data(db, [log])
+    await invalidate_summaries(db, log.user_id, [log.log_date])
     
     await db.commit()
     await db.refresh(log)
+    index_log_text(log)
+    
+    # Re-embed only if the text changed; the deterministic point id replaces the old vector
+    try:
+        if await refresh_log_embedding(log):
+            print(f"✅ Updated embedding in Qdrant")
+    except Exception as e:
+        print(f"⚠️ Failed to update embedding: {e}")
+    
+    try:
+        await embed_new_concepts(new_concepts)
+    except Exception as e:
+        print(f"⚠️ Failed to store concept embeddings: {e}")
     
     return log
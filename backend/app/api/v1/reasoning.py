@@ -3,134 +3,332 @@ Reasoning API Endpoints
 Handle AI-powered queries, summaries, and explanations
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import Dict, Any
+from sqlalchemy import select, and_, or_
+from typing import Dict, Any, List, Tuple, AsyncIterator, Optional
 from datetime import date, timedelta
+import json
 import uuid
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.api.deps import get_current_user_id
 from app.schemas.common import (
     SummarizeRequest, SummarizeResponse,
     ExplainConceptRequest, ExplainConceptResponse,
     SearchRequest, SearchResponse, SearchResult
 )
-from app.models import DailyLog, Concept
+from app.models import DailyLog, Concept, ConceptRelation, SummaryReport
 from app.services.llm_service import llm_service
-from app.core.embeddings import embedding_generator
-from app.core.vector_store import vector_store
+from app.services.extraction_cache import extraction_cache
+from app.core.embeddings import query_embedding_cache, concept_embedding_cache
+from app.core.vector_store import async_vector_store
+from app.services.lexical_search import hybrid_search
+from app.services.concept_canonicalizer import normalize_concept_name
+from app.services.mastery import mastery_label, average_difficulty
+from app.services.summary_engine import (
+    HierarchicalSummarizer, logs_fingerprint, get_cached_report, store_report
+)
 
 router = APIRouter()
 
-TEMP_USER_ID = "00000000-0000-0000-0000-000000000001"
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_text_events(
+    chunks: AsyncIterator[str],
+    done: Dict[str, Any],
+    failure: str
+) -> AsyncIterator[str]:
+    """Forward LLM chunks as `token` events, then `done` (or `error`)"""
+    try:
+        async for text in chunks:
+            yield _sse("token", {"text": text})
+    except Exception as e:
+        yield _sse("error", {"detail": f"{failure}: {str(e)}"})
+        return
+    yield _sse("done", done)
+
+
+def _resolve_end_date(request: SummarizeRequest) -> date:
+    """Calculate end date from the mode if not provided"""
+    if request.end_date:
+        return request.end_date
+    if request.mode == "weekly":
+        return request.start_date + timedelta(days=6)
+    if request.mode == "monthly":
+        return request.start_date + timedelta(days=29)
+    return request.start_date
+
+
+async def _fetch_range_logs(db: AsyncSession, user_id: uuid.UUID, start: date, end: date) -> List[DailyLog]:
+    """Fetch logs in date range"""
+    result = await db.execute(
+        select(DailyLog).where(
+            and_(
+                DailyLog.user_id == user_id,
+                DailyLog.log_date >= start,
+                DailyLog.log_date <= end
+            )
+        ).order_by(DailyLog.log_date)
+    )
+    return result.scalars().all()
+
+
+def _summary_metadata(logs: List[DailyLog], summarizer: HierarchicalSummarizer) -> Dict[str, Any]:
+    """Metadata reported (and cached) alongside a generated report"""
+    return {
+        "total_days": len(logs),
+        "avg_difficulty": average_difficulty(log.difficulty_level for log in logs),
+        "summaries_generated": summarizer.generated,
+        "summaries_cached": summarizer.cached
+    }
+
+
+async def _check_summary_cache(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    mode: str,
+    start: date,
+    end: date
+) -> Tuple[str, Optional[SummaryReport]]:
+    """Fingerprint the covered logs (404 if none) and look up a current cached report"""
+    log_count, fingerprint = await logs_fingerprint(db, user_id, start, end)
+    if not log_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No logs found between {start} and {end}"
+        )
+    cached_report = await get_cached_report(db, user_id, mode, start, end, fingerprint)
+    return fingerprint, cached_report
 
 
 @router.post("/reasoning/summarize", response_model=SummarizeResponse)
 async def generate_summary(
     request: SummarizeRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Generate VTU diary summary for specified date range
     Modes: daily, weekly, monthly
     """
-    # Calculate end date if not provided
-    end_date = request.end_date
-    if not end_date:
-        if request.mode == "daily":
-            end_date = request.start_date
-        elif request.mode == "weekly":
-            end_date = request.start_date + timedelta(days=6)
-        elif request.mode == "monthly":
-            end_date = request.start_date + timedelta(days=29)
-    
-    # Fetch logs in date range
-    result = await db.execute(
-        select(DailyLog).where(
-            and_(
-                DailyLog.user_id == uuid.UUID(TEMP_USER_ID),
-                DailyLog.log_date >= request.start_date,
-                DailyLog.log_date <= end_date
-            )
-        ).order_by(DailyLog.log_date)
+    end_date = _resolve_end_date(request)
+    date_range = {"start": str(request.start_date), "end": str(end_date)}
+    
+    # Serve from the report cache while the covered logs are unchanged
+    fingerprint, cached_report = await _check_summary_cache(
+        db, user_id, request.mode, request.start_date, end_date
     )
-    logs = result.scalars().all()
+    if cached_report:
+        return SummarizeResponse(
+            summary=cached_report.summary,
+            mode=request.mode,
+            date_range=date_range,
+            metadata={**(cached_report.report_metadata or {}), "cached": True}
+        )
     
+    logs = await _fetch_range_logs(db, user_id, request.start_date, end_date)
     if not logs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No logs found between {request.start_date} and {end_date}"
         )
     
-    # Prepare data for LLM
-    summary_data = {
-        "date_range": {
-            "start": str(request.start_date),
-            "end": str(end_date)
-        },
-        "total_days": len(logs),
-        "logs": [
-            {
-                "date": str(log.log_date),
-                "raw_text": log.raw_text,
-                "structured_data": log.structured_data,
-                "mood": log.mood,
-                "difficulty": log.difficulty_level
-            }
-            for log in logs
-        ]
-    }
+    # Reduce logs to cached day/week/month summaries (map-reduce)
+    summarizer = HierarchicalSummarizer(db, user_id)
     
     # Generate summary using LLM
     try:
-        summary_text = llm_service.generate_summary(summary_data, mode=request.mode)
+        summary_data = await summarizer.build_report_data(logs, request.start_date, end_date, request.mode)
+        summary_text = await llm_service.agenerate_summary(summary_data, mode=request.mode)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate summary: {str(e)}"
         )
     
+    metadata = _summary_metadata(logs, summarizer)
+    await store_report(
+        db, user_id, request.mode, request.start_date, end_date, fingerprint, summary_text, metadata
+    )
+    
     return SummarizeResponse(
         summary=summary_text,
         mode=request.mode,
-        date_range={"start": str(request.start_date), "end": str(end_date)},
-        metadata={
-            "total_days": len(logs),
-            "avg_difficulty": "medium"  # TODO: Calculate from logs
-        }
+        date_range=date_range,
+        metadata={**metadata, "cached": False}
     )
 
 
-@router.post("/reasoning/explain", response_model=ExplainConceptResponse)
-async def explain_concept(
-    request: ExplainConceptRequest,
+@router.post("/reasoning/summarize/stream")
+async def stream_summary(
+    request: SummarizeRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Explain a concept with identity-aware personalization
-    Uses user's learning history for context
+    Streaming variant of /reasoning/summarize (Server-Sent Events)
+    Emits `token` events as the report is written, then `done` with metadata
+    (or `error` if generation fails mid-way)
     """
-    # Get user's learned concepts
-    result = await db.execute(
-        select(Concept.name).where(
-            Concept.user_id == uuid.UUID(TEMP_USER_ID)
+    end_date = _resolve_end_date(request)
+    fingerprint, cached_report = await _check_summary_cache(
+        db, user_id, request.mode, request.start_date, end_date
+    )
+    
+    return StreamingResponse(
+        _summary_events(user_id, request.mode, request.start_date, end_date, fingerprint, cached_report),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
+async def _summary_events(
+    user_id: uuid.UUID,
+    mode: str,
+    start: date,
+    end: date,
+    fingerprint: str,
+    cached_report: Optional[SummaryReport]
+) -> AsyncIterator[str]:
+    """Generate the report as SSE, storing it in the report cache when complete"""
+    date_range = {"start": str(start), "end": str(end)}
+    if cached_report:
+        yield _sse("token", {"text": cached_report.summary})
+        yield _sse("done", {
+            "mode": mode,
+            "date_range": date_range,
+            "metadata": {**(cached_report.report_metadata or {}), "cached": True}
+        })
+        return
+    
+    # The request session is closed once the response starts; use our own
+    async with AsyncSessionLocal() as db:
+        parts: List[str] = []
+        try:
+            logs = await _fetch_range_logs(db, user_id, start, end)
+            summarizer = HierarchicalSummarizer(db, user_id)
+            summary_data = await summarizer.build_report_data(logs, start, end, mode)
+            async for text in llm_service.astream_summary(summary_data, mode=mode):
+                parts.append(text)
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Failed to generate summary: {str(e)}"})
+            return
+        
+        metadata = _summary_metadata(logs, summarizer)
+        await store_report(db, user_id, mode, start, end, fingerprint, "".join(parts), metadata)
+    
+    yield _sse("done", {
+        "mode": mode,
+        "date_range": date_range,
+        "metadata": {**metadata, "cached": False}
+    })
+
+
+async def _related_learned_concepts(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    concept_name: str,
+    target_id: Optional[uuid.UUID],
+    limit: int
+) -> List[str]:
+    """
+    Top learned concepts relevant to the requested one, bounded by `limit`
+    ConceptRelation neighbors of `target_id` (the requested concept's row, if
+    learned) come first, strongest first; then nearest neighbors from the
+    concept vector collection
+    """
+    requested = normalize_concept_name(concept_name)
+    names: List[str] = []
+    
+    def add(name: str):
+        key = normalize_concept_name(name)
+        if key != requested and key not in {normalize_concept_name(n) for n in names}:
+            names.append(name)
+    
+    if target_id:
+        neighbors = await db.execute(
+            select(Concept.name).join(
+                ConceptRelation,
+                or_(
+                    and_(ConceptRelation.concept_a_id == target_id, ConceptRelation.concept_b_id == Concept.id),
+                    and_(ConceptRelation.concept_b_id == target_id, ConceptRelation.concept_a_id == Concept.id)
+                )
+            ).where(Concept.user_id == user_id)
+            .order_by(ConceptRelation.strength.desc())
+            .limit(limit)
+        )
+        for name in neighbors.scalars().all():
+            add(name)
+    
+    if len(names) < limit:
+        try:
+            query_embedding = await concept_embedding_cache.embed(concept_name)
+            # One extra hit in case the requested concept itself comes back
+            hits = await async_vector_store.search_similar_concepts(
+                query_embedding, limit=limit + 1, user_id=str(user_id)
+            )
+            for hit in hits:
+                if hit.get("name"):
+                    add(hit["name"])
+        except Exception as e:
+            print(f"⚠️ Concept vector search failed, using relations only: {e}")
+    
+    return names[:limit]
+
+
+async def _build_explain_context(db: AsyncSession, user_id: uuid.UUID, concept_name: str) -> Dict[str, Any]:
+    """Collect the learning history used to personalize explanations"""
+    # The requested concept's own row (precomputed mastery), if already learned
+    target_result = await db.execute(
+        select(Concept.id, Concept.mastery_level).where(
+            and_(
+                Concept.user_id == user_id,
+                Concept.normalized_name == normalize_concept_name(concept_name)
+            )
         )
     )
-    learned_concepts = [row[0] for row in result.all()]
+    target = target_result.first()
+    
+    # Only the learned concepts relevant to this one (fixed-size context)
+    learned_concepts = await _related_learned_concepts(
+        db, user_id, concept_name, target.id if target else None, settings.explain_context_concepts
+    )
     
     # TODO: Get past mistakes from learning_patterns table
     past_mistakes = []
     
-    # Build user context
-    user_context = {
+    return {
         "learned_concepts": learned_concepts,
         "past_mistakes": past_mistakes,
-        "current_level": "intermediate"  # TODO: Calculate based on mastery levels
+        "current_level": mastery_label(target.mastery_level if target else None)
     }
+
+
+@router.post("/reasoning/explain", response_model=ExplainConceptResponse)
+async def explain_concept(
+    request: ExplainConceptRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Explain a concept with identity-aware personalization
+    Uses user's learning history for context
+    """
+    user_context = await _build_explain_context(db, user_id, request.concept_name)
     
     # Generate personalized explanation
     try:
-        explanation = llm_service.explain_concept(request.concept_name, user_context)
+        explanation = await llm_service.aexplain_concept(request.concept_name, user_context)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -144,16 +342,37 @@ async def explain_concept(
     )
 
 
+@router.post("/reasoning/explain/stream")
+async def stream_explanation(
+    request: ExplainConceptRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Streaming variant of /reasoning/explain (Server-Sent Events)"""
+    user_context = await _build_explain_context(db, user_id, request.concept_name)
+    
+    return StreamingResponse(
+        _stream_text_events(
+            llm_service.astream_explain_concept(request.concept_name, user_context),
+            done={"concept_name": request.concept_name, "personalized": True},
+            failure="Failed to generate explanation"
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @router.post("/reasoning/search", response_model=SearchResponse)
 async def semantic_search(
-    request: SearchRequest
+    request: SearchRequest,
+    user_id: uuid.UUID = Depends(get_current_user_id)
 ):
     """
     Semantic search across concepts or logs using vector similarity
     """
     # Generate query embedding
     try:
-        query_embedding = embedding_generator.generate(request.query)
+        query_embedding = await query_embedding_cache.embed(request.query)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -162,10 +381,35 @@ async def semantic_search(
     
     # Search in appropriate collection
     try:
-        if request.search_type == "concepts":
-            results = vector_store.search_similar_concepts(query_embedding, limit=request.limit)
+        if request.mode == "hybrid" and request.search_type in ("concepts", "logs"):
+            results = await hybrid_search(
+                request.query,
+                query_embedding,
+                search_type=request.search_type,
+                limit=request.limit,
+                user_id=str(user_id),
+                start_date=str(request.start_date) if request.start_date else None,
+                end_date=str(request.end_date) if request.end_date else None,
+                concepts=request.concepts,
+                category=request.category
+            )
+        elif request.search_type == "concepts":
+            results = await async_vector_store.search_similar_concepts(
+                query_embedding,
+                limit=request.limit,
+                user_id=str(user_id),
+                category=request.category,
+                concepts=request.concepts
+            )
         elif request.search_type == "logs":
-            results = vector_store.search_similar_logs(query_embedding, limit=request.limit)
+            results = await async_vector_store.search_similar_logs(
+                query_embedding,
+                limit=request.limit,
+                user_id=str(user_id),
+                start_date=str(request.start_date) if request.start_date else None,
+                end_date=str(request.end_date) if request.end_date else None,
+                concepts=request.concepts
+            )
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -189,24 +433,37 @@ async def semantic_search(
     )
 
 
-@router.get("/reasoning/guidance")
-async def get_learning_guidance(
-    db: AsyncSession = Depends(get_db)
+@router.get("/reasoning/search/cache-stats")
+async def search_cache_stats(
+    user_id: uuid.UUID = Depends(get_current_user_id)
 ):
-    """
-    Get personalized learning guidance based on history
-    """
+    """Hit-rate statistics for the query embedding cache"""
+    return query_embedding_cache.stats()
+
+
+@router.get("/reasoning/extraction/cache-stats")
+async def extraction_cache_stats(
+    user_id: uuid.UUID = Depends(get_current_user_id)
+):
+    """Hit-rate statistics for the structured extraction cache"""
+    if extraction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **extraction_cache.stats()}
+
+
+async def _build_guidance_history(db: AsyncSession, user_id: uuid.UUID) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Collect learning history for guidance, plus the context echoed to the client"""
     # Fetch user's learning history
     logs_result = await db.execute(
         select(DailyLog).where(
-            DailyLog.user_id == uuid.UUID(TEMP_USER_ID)
+            DailyLog.user_id == user_id
         ).order_by(DailyLog.log_date.desc()).limit(10)
     )
     recent_logs = logs_result.scalars().all()
     
     concepts_result = await db.execute(
         select(Concept).where(
-            Concept.user_id == uuid.UUID(TEMP_USER_ID)
+            Concept.user_id == user_id
         ).order_by(Concept.mastery_level.desc())
     )
     concepts = concepts_result.scalars().all()
@@ -222,10 +479,26 @@ async def get_learning_guidance(
             if log.structured_data
         ]
     }
+    context = {
+        "total_concepts_learned": len(concepts),
+        "days_logged": len(recent_logs)
+    }
+    return user_history, context
+
+
+@router.get("/reasoning/guidance")
+async def get_learning_guidance(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get personalized learning guidance based on history
+    """
+    user_history, context = await _build_guidance_history(db, user_id)
     
     # Generate guidance
     try:
-        guidance = llm_service.generate_guidance(user_history)
+        guidance = await llm_service.agenerate_guidance(user_history)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -234,8 +507,24 @@ async def get_learning_guidance(
     
     return {
         "guidance": guidance,
-        "context": {
-            "total_concepts_learned": len(concepts),
-            "days_logged": len(recent_logs)
-        }
+        "context": context
     }
+
+
+@router.get("/reasoning/guidance/stream")
+async def stream_learning_guidance(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Streaming variant of /reasoning/guidance (Server-Sent Events)"""
+    user_history, context = await _build_guidance_history(db, user_id)
+    
+    return StreamingResponse(
+        _stream_text_events(
+            llm_service.astream_guidance(user_history),
+            done={"context": context},
+            failure="Failed to generate guidance"
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -21,12 +21,114 @@ class Settings(BaseSettings):
     # Vector Database
     qdrant_url: str = "http://localhost:6333"
     qdrant_api_key: str = ""
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
+    
+    # Qdrant vector storage: "none", "scalar" (int8, ~4x) or "binary" (~32x) quantization
+    # with original vectors on disk and rescoring of oversampled candidates
+    qdrant_quantization: str = "none"
+    qdrant_quantization_quantile: float = 0.99
+    qdrant_vectors_on_disk: bool = False
+    qdrant_oversampling: float = 2.0
+    qdrant_rescore: bool = True
+    
+    # Vector store backend: "qdrant" (server) or "numpy" (in-process exact search, one worker process)
+    vector_store_backend: str = "qdrant"
+    numpy_vector_store_path: str = "vector_data"
+    numpy_vector_dtype: str = "float32"  # or "float16" to halve memory
+    
+    # Embedding model backend: "torch" or "onnx"
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: str = "models/all-MiniLM-L6-v2-onnx"
+    embedding_onnx_quantized: bool = True
+    embedding_onnx_threads: int = 0  # 0 = ONNX Runtime default
+    
+    # Embedding micro-batching
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 5.0
+    
+    # Search query embedding cache
+    query_embedding_cache_size: int = 1024
+    query_embedding_cache_ttl_seconds: float = 3600.0
+    
+    # Concept name embeddings (reused between canonicalization and indexing of an ingest)
+    concept_embedding_cache_size: int = 2048
+    concept_embedding_cache_ttl_seconds: float = 600.0
+    
+    # Hybrid (BM25 + vector) search
+    hybrid_lexical_candidates: int = 20
+    hybrid_rrf_k: int = 60
+    # Pick up other workers' writes every interval (0 disables); rebuild fully at the longer one
+    lexical_refresh_interval_seconds: float = 30.0
+    lexical_full_rebuild_seconds: float = 3600.0
     
     # AI API Keys
     gemini_api_key: str
     openai_api_key: str = ""
     claude_api_key: str = ""
     
+    # LLM HTTP connection pool (shared by async provider clients)
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    
+    # LLM provider deadlines (seconds), hedging and circuit breaking
+    llm_timeout_gemini: float = 30.0
+    llm_timeout_openai: float = 30.0
+    llm_timeout_claude: float = 30.0
+    llm_hedge_enabled: bool = False
+    llm_hedge_percentile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    llm_hedge_default_delay: float = 5.0
+    llm_breaker_failure_threshold: int = 3
+    llm_breaker_cooldown_seconds: float = 30.0
+    llm_sync_workers: int = 8
+    
+    # Streaming: fail over if no token arrives in time; abort if a started stream stalls
+    llm_stream_first_token_timeout: float = 10.0
+    llm_stream_idle_timeout: float = 30.0
+    
+    # Structured extraction cache (local SQLite, LRU by total payload size)
+    extraction_cache_enabled: bool = True
+    extraction_cache_path: str = "extraction_cache.sqlite3"
+    extraction_cache_max_bytes: int = 50 * 1024 * 1024
+    
+    # Background ingestion workers
+    ingestion_workers: int = 2
+    ingestion_queue_size: int = 1000
+    # A running job whose heartbeat is older than the lease is resumed by another worker;
+    # queued and stale jobs left in the database are picked up every sweep interval
+    ingestion_job_lease_seconds: float = 120.0
+    ingestion_sweep_interval_seconds: float = 30.0
+    
+    # Bulk NDJSON ingestion
+    bulk_ingest_batch_size: int = 32
+    bulk_extraction_group_size: int = 8
+    
+    # Hierarchical diary summaries (day -> week -> month)
+    summary_max_concurrency: int = 4
+    summary_max_weeks_per_report: int = 5
+    
+    # Prompt context budgets (estimated tokens)
+    context_budget_summary_tokens: int = 3000
+    context_budget_guidance_tokens: int = 1200
+    
+    # Learned concepts given to /reasoning/explain (relation neighbors + vector hits)
+    explain_context_concepts: int = 8
+    
+    # Concept canonicalization (cosine similarity) and background merge pass
+    concept_merge_threshold: float = 0.88
+    concept_merge_interval_seconds: float = 3600.0
+    
+    # Mastery scoring: practice half-life and score at which levels saturate
+    mastery_half_life_days: float = 14.0
+    mastery_saturation: float = 4.0
+    mastery_decay_interval_seconds: float = 86400.0  # 0 disables the background decay pass
+    
+    # Authentication: signed access tokens (HS256 with secret_key) and verification cache
+    jwt_algorithm: str = "HS256"
+    access_token_expire_minutes: int = 60 * 24
+    auth_token_cache_size: int = 4096
+    
     # CORS
     allowed_origins: str = "http://localhost:3000"
     
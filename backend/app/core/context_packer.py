@@ -0,0 +1,145 @@
+"""
+Context Packer
+Fit prompt context into a token budget: compact JSON, no structured fields
+that merely repeat the raw text, and entries chosen by priority
+"""
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import json
+import math
+import re
+
+PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate (~4 characters per token, at least one per word/symbol)"""
+    return max(len(PIECE_PATTERN.findall(text)), math.ceil(len(text) / 4))
+
+
+def compact_json(data: Any) -> str:
+    """Serialize without indentation or padding"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def strip_redundant(entry: Dict[str, Any], text_key: str = "raw_text") -> Dict[str, Any]:
+    """
+    Drop structured values already stated verbatim in the entry's raw text
+    String list items found in the text are removed, as are `description`
+    fields of activity-like dicts; empty values are dropped altogether
+    """
+    text = _normalize(entry.get(text_key) or "")
+    
+    def redundant(value: Any) -> bool:
+        return bool(text) and isinstance(value, str) and _normalize(value) in text
+    
+    stripped: Dict[str, Any] = {}
+    for key, value in entry.items():
+        if key != text_key and isinstance(value, list):
+            kept = []
+            for item in value:
+                if isinstance(item, dict):
+                    item = {k: v for k, v in item.items()
+                            if v not in (None, "", []) and not (k == "description" and redundant(v))}
+                    if item:
+                        kept.append(item)
+                elif not redundant(item):
+                    kept.append(item)
+            value = kept
+        if value in (None, "", [], {}):
+            continue
+        stripped[key] = value
+    return stripped
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """First sentence(s) of text within max_chars"""
+    result = ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        candidate = f"{result} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        result = candidate
+    return result or text[:max_chars].rstrip() + "…"
+
+
+def reduce_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cheaper form of an entry: structured highlights (key learnings, concepts)
+    stay whole, while long free text is cut to its opening sentence(s)
+    """
+    reduced = dict(entry)
+    if isinstance(reduced.get("raw_text"), str):
+        reduced["raw_text"] = _truncate(reduced["raw_text"], 160)
+    if isinstance(reduced.get("summary"), str):
+        reduced["summary"] = _truncate(reduced["summary"], 300)
+    return reduced
+
+
+def recency(entry: Dict[str, Any]) -> str:
+    """Default priority: ISO date/period strings sort chronologically"""
+    return str(entry.get("date") or entry.get("period") or "")
+
+
+class ContextPacker:
+    """Pack a list of context entries into a token budget by priority"""
+    
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+    
+    def pack(
+        self,
+        fixed: Dict[str, Any],
+        items_key: str,
+        items: List[Dict[str, Any]],
+        priority: Optional[Callable[[Dict[str, Any]], Any]] = recency,
+        reduce: Callable[[Dict[str, Any]], Dict[str, Any]] = reduce_entry
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Serialize `fixed` plus as many of `items` as fit the budget
+        
+        First every entry (highest priority first) is admitted in reduced form
+        while it fits; then admitted entries are upgraded to their full form in
+        the same order. Entries keep their original order in the output.
+        Returns the compact JSON context and token usage stats.
+        """
+        full = [strip_redundant(item) for item in items]
+        # Reduce before de-duplicating so facts cut from the text survive as structure
+        reduced = [strip_redundant(reduce(item)) for item in items]
+        order = list(range(len(items)))
+        if priority is not None:
+            order.sort(key=lambda i: priority(items[i]), reverse=True)
+        
+        used = estimate_tokens(compact_json({**fixed, items_key: [], "omitted_entries": len(items)}))
+        chosen: Dict[int, Dict[str, Any]] = {}
+        
+        for i in order:
+            cost = estimate_tokens(compact_json(reduced[i])) + 1
+            if used + cost <= self.budget_tokens:
+                chosen[i] = reduced[i]
+                used += cost
+        
+        for i in order:
+            if i not in chosen or full[i] == reduced[i]:
+                continue
+            extra = estimate_tokens(compact_json(full[i])) - estimate_tokens(compact_json(reduced[i]))
+            if used + extra <= self.budget_tokens:
+                chosen[i] = full[i]
+                used += extra
+        
+        context = {**fixed, items_key: [chosen[i] for i in sorted(chosen)]}
+        if len(chosen) < len(items):
+            context["omitted_entries"] = len(items) - len(chosen)
+        text = compact_json(context)
+        
+        return text, {
+            "tokens": estimate_tokens(text),
+            "budget": self.budget_tokens,
+            "entries": len(items),
+            "included": len(chosen),
+            "reduced": sum(1 for i, entry in chosen.items() if entry is reduced[i] and full[i] != reduced[i])
+        }
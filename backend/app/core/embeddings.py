@@ -1,21 +1,46 @@
 """
 Embedding Generation
 Generate vector embeddings for semantic search using Sentence Transformers
+or an exported ONNX Runtime model
 """
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from collections import OrderedDict
+from typing import List, Union, Optional, Tuple, Dict, Any
+import asyncio
+import re
+import time
 import numpy as np
 
+from app.config import settings
+
 
 class EmbeddingGenerator:
     """Generate embeddings for text using sentence transformers"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: str = "torch"):
         """
         Initialize embedding model
         all-MiniLM-L6-v2: Fast, 384 dimensions, good for semantic search
+        backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime, no torch import)
         """
-        self.model = SentenceTransformer(model_name)
+        if backend == "onnx":
+            from app.core.onnx_embeddings import OnnxEmbeddingModel
+            self.model = OnnxEmbeddingModel(
+                settings.embedding_onnx_dir,
+                quantized=settings.embedding_onnx_quantized,
+                num_threads=settings.embedding_onnx_threads
+            )
+        elif backend == "torch":
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ImportError(
+                    "The torch embedding backend needs sentence-transformers: "
+                    "pip install -r requirements-torch.txt (or set EMBEDDING_BACKEND=onnx)"
+                )
+            self.model = SentenceTransformer(model_name)
+        else:
+            raise ValueError(f"Unknown embedding backend: {backend}")
+        self.backend = backend
         self.embedding_dim = 384
     
     def generate(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
@@ -45,5 +70,138 @@ class EmbeddingGenerator:
         return self.generate(raw_text)
 
 
-# Global instance
-embedding_generator = EmbeddingGenerator()
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent single-text embed requests into batched model calls
+    Requests are collected for up to `max_wait_ms` or `max_batch_size` texts,
+    encoded with one `generate(list)` call off the event loop, and each
+    caller's future is resolved with its own vector
+    """
+    
+    def __init__(self, generator: EmbeddingGenerator, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text, sharing a model call with concurrent requests"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+    
+    async def stop(self):
+        """Cancel the batching worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+    
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Callers that gave up while queued don't need encoding
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                vectors = await asyncio.to_thread(
+                    self.generator.generate, [text for text, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU + TTL cache of normalized query text → embedding
+    all-MiniLM-L6-v2 is uncased, so case and whitespace differences map to
+    the same vector and share an entry
+    """
+    
+    def __init__(self, batcher: EmbeddingBatcher, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.batcher = batcher
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip().lower()
+    
+    async def embed(self, query: str) -> List[float]:
+        """Return the cached query vector, embedding it on a miss"""
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        
+        self.misses += 1
+        vector = await self.batcher.embed(key)
+        self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return vector
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+# Global instances
+embedding_generator = EmbeddingGenerator(backend=settings.embedding_backend)
+embedding_batcher = EmbeddingBatcher(
+    embedding_generator,
+    max_batch_size=settings.embedding_batch_max_size,
+    max_wait_ms=settings.embedding_batch_max_wait_ms
+)
+query_embedding_cache = QueryEmbeddingCache(
+    embedding_batcher,
+    max_entries=settings.query_embedding_cache_size,
+    ttl_seconds=settings.query_embedding_cache_ttl_seconds
+)
+# Concept names, kept apart so ingestion doesn't evict search queries or skew their stats
+concept_embedding_cache = QueryEmbeddingCache(
+    embedding_batcher,
+    max_entries=settings.concept_embedding_cache_size,
+    ttl_seconds=settings.concept_embedding_cache_ttl_seconds
+)
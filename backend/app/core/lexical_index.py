@@ -0,0 +1,172 @@
+"""
+Lexical Index
+Incremental in-memory BM25 index over log text and concept names, used to
+catch exact identifiers (JWT, asyncpg, error codes) that embeddings miss
+"""
+from collections import Counter
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import heapq
+import math
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+(?:[.\-/][a-z0-9_]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word/identifier tokens; compounds also yield their parts"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if any(sep in token for sep in ".-/"):
+            tokens.extend(part for part in re.split(r"[.\-/]", token) if part)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 over documents that can be added, replaced and removed"""
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_terms: Dict[str, Counter] = {}
+        self.payloads: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+    
+    def add(self, doc_id: str, text: str, payload: Dict[str, Any]):
+        """Index (or re-index) a document"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.doc_terms[doc_id] = terms
+            self.payloads[doc_id] = payload
+            self.total_length += length
+    
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+    
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+    
+    def _remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.payloads.pop(doc_id, None)
+    
+    def search(self, query: str, limit: int,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """Top `limit` documents by BM25 score that satisfy `predicate`"""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            n = len(self.doc_lengths)
+            if n == 0 or not query_terms:
+                return []
+            avg_length = self.total_length / n
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            
+            candidates = (
+                (score, doc_id) for doc_id, score in scores.items()
+                if predicate is None or predicate(self.payloads[doc_id])
+            )
+            top = heapq.nlargest(limit, candidates)
+            return [(score, self.payloads[doc_id]) for score, doc_id in top]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    """RRF score per id: sum over rankings of 1 / (k + rank)"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class LexicalSearchIndex:
+    """BM25 indexes for daily logs and concepts with the vector search filters"""
+    
+    def __init__(self):
+        self.logs = BM25Index()
+        self.concepts = BM25Index()
+    
+    def index_log(self, log_id: str, user_id: str, log_date: str, raw_text: str, concepts: List[str]):
+        self.logs.add(log_id, f"{raw_text} {' '.join(concepts)}", {
+            "log_id": log_id,
+            "user_id": user_id,
+            "log_date": log_date,
+            "summary": raw_text[:200],
+            "concepts": concepts
+        })
+    
+    def index_concept(self, concept_id: str, user_id: str, name: str,
+                      definition: Optional[str], category: Optional[str]):
+        self.concepts.add(concept_id, f"{name} {name} {definition or ''}", {
+            "concept_id": concept_id,
+            "user_id": user_id,
+            "name": name,
+            "definition": definition,
+            "category": category
+        })
+    
+    def remove_concept(self, concept_id: str):
+        self.concepts.remove(concept_id)
+    
+    def replace(self, other: "LexicalSearchIndex"):
+        """Swap in a freshly built index so searches never see a half-loaded one"""
+        self.logs, self.concepts = other.logs, other.concepts
+    
+    def search_logs(self, query: str, limit: int, user_id: Optional[str] = None,
+                    start_date: Optional[str] = None, end_date: Optional[str] = None,
+                    concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        def predicate(payload: Dict[str, Any]) -> bool:
+            if user_id and payload["user_id"] != user_id:
+                return False
+            # ISO dates compare correctly as strings
+            if start_date and payload["log_date"] < start_date:
+                return False
+            if end_date and payload["log_date"] > end_date:
+                return False
+            if concepts and not set(concepts) & set(payload["concepts"]):
+                return False
+            return True
+        return [{"score": score, **payload} for score, payload in self.logs.search(query, limit, predicate)]
+    
+    def search_concepts(self, query: str, limit: int, user_id: Optional[str] = None,
+                        category: Optional[str] = None,
+                        concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        def predicate(payload: Dict[str, Any]) -> bool:
+            if user_id and payload["user_id"] != user_id:
+                return False
+            if category and payload["category"] != category:
+                return False
+            if concepts and payload["name"] not in concepts:
+                return False
+            return True
+        return [{"score": score, **payload} for score, payload in self.concepts.search(query, limit, predicate)]
+
+
+# Global instance
+lexical_index = LexicalSearchIndex()
@@ -0,0 +1,482 @@
+"""
+NumPy Vector Store
+In-process exact-search backend behind the QdrantVectorStore interface
+for single-box deployments, small tenants and CI. Indexes live in the memory
+of the process that opened them, so only one process may use a store directory
+at a time (run uvicorn with a single worker); a second opener fails fast.
+"""
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterable
+import asyncio
+import json
+import os
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, keep to one process by hand
+    fcntl = None
+
+from app.core.vector_store_base import BaseQdrantVectorStore, point_id, date_ordinal
+
+INT_MISSING = np.iinfo(np.int64).min
+SEARCH_CHUNK_ROWS = 65536
+
+
+class NumpyVectorIndex:
+    """
+    One collection: L2-normalized vectors in a memory-mapped float32/float16
+    matrix plus an append-only JSONL payload sidecar
+    
+    Files in `directory`:
+    - vectors.bin   row-major (capacity × dim) matrix, grown by doubling
+    - payloads.jsonl  {"row", "id", "payload"} or {"row", "deleted"} records,
+                      replayed on open (last record per row wins); rows are
+                      only recorded after their vectors are flushed, so the
+                      sidecar also defines how many rows are in use
+    - meta.json     dim and dtype, written once on creation
+    - .lock         held exclusively while open; concurrent writers would
+                    interleave rows and never see each other's points
+    """
+    
+    def __init__(self, directory: str, dim: int = 384, dtype: str = "float32",
+                 keyword_fields: Iterable[str] = (), integer_fields: Iterable[str] = (),
+                 initial_capacity: int = 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock_file = self._lock_directory()
+        self.vectors_path = os.path.join(directory, "vectors.bin")
+        self.payloads_path = os.path.join(directory, "payloads.jsonl")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.RLock()
+        
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            dim, dtype = meta["dim"], meta["dtype"]
+        else:
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": dim, "dtype": np.dtype(dtype).name}, f)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        
+        self.keyword_fields = list(keyword_fields)
+        self.integer_fields = list(integer_fields)
+        self.ids: List[Optional[str]] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.rows: Dict[str, int] = {}
+        self.keyword_index: Dict[str, Dict[Any, Set[int]]] = {f: {} for f in self.keyword_fields}
+        
+        row_bytes = self.dim * self.dtype.itemsize
+        existing = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        self.integer_values: Dict[str, np.ndarray] = {f: np.zeros(0, dtype=np.int64) for f in self.integer_fields}
+        self._resize(max(existing, initial_capacity))
+        
+        self._replay()
+        self._sidecar = open(self.payloads_path, "a")
+    
+    # ----- storage -----
+    
+    def _lock_directory(self):
+        lock_file = open(os.path.join(self.directory, ".lock"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                raise RuntimeError(
+                    f"{self.directory} is already open in another process; the numpy "
+                    "vector store supports a single worker process"
+                )
+        return lock_file
+    
+    def _resize(self, capacity: int):
+        row_bytes = self.dim * self.dtype.itemsize
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * row_bytes)
+        self.matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        
+        grow = capacity - self.capacity
+        self.alive = np.concatenate([self.alive, np.zeros(grow, dtype=bool)])
+        for field in self.integer_fields:
+            self.integer_values[field] = np.concatenate(
+                [self.integer_values[field], np.full(grow, INT_MISSING, dtype=np.int64)]
+            )
+        self.ids.extend([None] * grow)
+        self.payloads.extend([None] * grow)
+        self.capacity = capacity
+    
+    def _replay(self):
+        if not os.path.exists(self.payloads_path):
+            return
+        with open(self.payloads_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from an interrupted write
+                    continue
+                if record["row"] >= self.capacity:
+                    self._resize(max(record["row"] + 1, self.capacity * 2))
+                self.count = max(self.count, record["row"] + 1)
+                if record.get("deleted"):
+                    self._unindex(record["row"])
+                else:
+                    self._index(record["row"], record["id"], record["payload"])
+    
+    # ----- payload indexes -----
+    
+    def _keyword_values(self, payload: Dict[str, Any], field: str) -> List[Any]:
+        """Index keys for a field; None stands for missing/null/[] like Qdrant's is_empty"""
+        value = payload.get(field)
+        if isinstance(value, list):
+            return value or [None]
+        return [value]
+    
+    def _index(self, row: int, pid: str, payload: Dict[str, Any]):
+        self._unindex(row)
+        self.ids[row] = pid
+        self.payloads[row] = payload
+        self.rows[pid] = row
+        self.alive[row] = True
+        for field in self.keyword_fields:
+            for value in self._keyword_values(payload, field):
+                self.keyword_index[field].setdefault(value, set()).add(row)
+        for field in self.integer_fields:
+            value = payload.get(field)
+            self.integer_values[field][row] = value if value is not None else INT_MISSING
+    
+    def _unindex(self, row: int):
+        payload = self.payloads[row]
+        if payload is None:
+            return
+        for field in self.keyword_fields:
+            for value in self._keyword_values(payload, field):
+                self.keyword_index[field].get(value, set()).discard(row)
+        for field in self.integer_fields:
+            self.integer_values[field][row] = INT_MISSING
+        self.rows.pop(self.ids[row], None)
+        self.ids[row] = None
+        self.payloads[row] = None
+        self.alive[row] = False
+    
+    # ----- public API -----
+    
+    def upsert(self, points: List[Tuple[str, List[float], Dict[str, Any]]]):
+        """Insert or replace points (id, vector, payload); new ids are appended"""
+        # A repeated id in one batch would get two rows; the last write wins
+        points = list({pid: (pid, vector, payload) for pid, vector, payload in points}.values())
+        if not points:
+            return
+        with self._lock:
+            vectors = np.asarray([vector for _, vector, _ in points], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+            
+            rows = []
+            next_row = self.count
+            for pid, _, _ in points:
+                if pid in self.rows:
+                    rows.append(self.rows[pid])
+                else:
+                    rows.append(next_row)
+                    next_row += 1
+            if next_row > self.capacity:
+                self._resize(max(next_row, self.capacity * 2))
+            
+            self.matrix[rows] = vectors.astype(self.dtype)
+            self.matrix.flush()
+            for row, (pid, _, payload) in zip(rows, points):
+                self._sidecar.write(json.dumps({"row": row, "id": pid, "payload": payload}) + "\n")
+            self._sidecar.flush()
+            
+            self.count = next_row
+            for row, (pid, _, payload) in zip(rows, points):
+                self._index(row, pid, payload)
+    
+    def delete(self, point_ids: Iterable[str]):
+        with self._lock:
+            for pid in point_ids:
+                row = self.rows.get(pid)
+                if row is None:
+                    continue
+                self._sidecar.write(json.dumps({"row": row, "deleted": True}) + "\n")
+                self._unindex(row)
+            self._sidecar.flush()
+    
+    def set_payloads(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """Replace the payload of existing points, keeping their vectors"""
+        with self._lock:
+            for pid, payload in updates:
+                row = self.rows.get(pid)
+                if row is None:
+                    continue
+                self._sidecar.write(json.dumps({"row": row, "id": pid, "payload": payload}) + "\n")
+                self._index(row, pid, payload)
+            self._sidecar.flush()
+    
+    def get(self, pid: str) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(pid)
+        return self.payloads[row] if row is not None else None
+    
+    def get_vector(self, pid: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self.rows.get(pid)
+            return np.array(self.matrix[row], dtype=np.float32) if row is not None else None
+    
+    def rows_matching(self, field: str, values: Iterable[Any]) -> Set[int]:
+        """Rows whose keyword field holds any of `values` (None = missing/empty)"""
+        matched: Set[int] = set()
+        for value in values:
+            matched |= self.keyword_index[field].get(value, set())
+        return matched
+    
+    def search(self, query: List[float], limit: int,
+               keyword_filters: Optional[Dict[str, List[Any]]] = None,
+               range_filters: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None
+               ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Exact cosine top-k: one matrix-vector product over candidate rows
+        then argpartition. Keyword filters are any-of per field (fields ANDed);
+        range filters are inclusive bounds on integer fields
+        """
+        with self._lock:
+            n = self.count
+            if n == 0:
+                return []
+            q = np.asarray(query, dtype=np.float32)
+            q = q / max(float(np.linalg.norm(q)), 1e-12)
+            
+            mask = self.alive[:n].copy()
+            for field, values in (keyword_filters or {}).items():
+                field_mask = np.zeros(n, dtype=bool)
+                field_mask[list(self.rows_matching(field, values))] = True
+                mask &= field_mask
+            for field, (gte, lte) in (range_filters or {}).items():
+                column = self.integer_values[field][:n]
+                mask &= column != INT_MISSING
+                if gte is not None:
+                    mask &= column >= gte
+                if lte is not None:
+                    mask &= column <= lte
+            
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+            
+            if candidates.size == n:
+                scores = np.empty(n, dtype=np.float32)
+                for start in range(0, n, SEARCH_CHUNK_ROWS):
+                    block = self.matrix[start:min(start + SEARCH_CHUNK_ROWS, n)]
+                    scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ q
+            else:
+                scores = np.empty(candidates.size, dtype=np.float32)
+                for start in range(0, candidates.size, SEARCH_CHUNK_ROWS):
+                    rows = candidates[start:start + SEARCH_CHUNK_ROWS]
+                    scores[start:start + len(rows)] = self.matrix[rows].astype(np.float32, copy=False) @ q
+            
+            k = min(limit, scores.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            rows = top if candidates.size == n else candidates[top]
+            return [(float(scores[i]), self.payloads[row]) for i, row in zip(top, rows)]
+    
+    def close(self):
+        with self._lock:
+            self._sidecar.close()
+            self.matrix.flush()
+            self._lock_file.close()  # Releases the directory lock
+
+
+class NumpyVectorStore(BaseQdrantVectorStore):
+    """Drop-in, server-less replacement for QdrantVectorStore"""
+    
+    def __init__(self, path: str, dtype: str = "float32"):
+        self.path = path
+        self.dtype = dtype
+        self.indexes: Dict[str, NumpyVectorIndex] = {}
+        self.initialize_collections()
+    
+    def initialize_collections(self):
+        """Open (or create) the on-disk index for each collection"""
+        for collection, fields in self._payload_indexes().items():
+            if collection in self.indexes:
+                continue
+            keyword_fields = [f for f, schema in fields.items() if schema.value == "keyword"]
+            integer_fields = [f for f, schema in fields.items() if schema.value == "integer"]
+            if collection == self.log_collection:
+                keyword_fields.append("log_id")
+            self.indexes[collection] = NumpyVectorIndex(
+                os.path.join(self.path, collection),
+                dim=self._vectors_config().size,
+                dtype=self.dtype,
+                keyword_fields=keyword_fields,
+                integer_fields=integer_fields
+            )
+    
+    def create_payload_indexes(self):
+        """Payload indexes are always maintained in memory"""
+    
+    def _upsert(self, collection: str, points):
+        self.indexes[collection].upsert([(str(p.id), p.vector, p.payload) for p in points])
+    
+    def add_concept_embedding(self, concept_id: str, embedding: List[float],
+                              name: str, definition: str, category: str, user_id: str = ""):
+        """Store concept embedding"""
+        self._upsert(self.concept_collection, [
+            self._concept_point(concept_id, embedding, name, definition, category, user_id)
+        ])
+    
+    def add_concept_embeddings(self, items: List[Dict[str, Any]]):
+        """Store many concept embeddings in one append"""
+        self._upsert(self.concept_collection, [self._concept_point(**item) for item in items])
+    
+    def add_log_embedding(self, log_id: str, embedding: List[float],
+                          log_date: str, summary: str, concepts: List[str],
+                          content_hash: str = "", user_id: str = ""):
+        """Store (or replace) daily log embedding"""
+        self._upsert(self.log_collection, [
+            self._log_point(log_id, embedding, log_date, summary, concepts, content_hash, user_id)
+        ])
+    
+    def add_log_embeddings(self, items: List[Dict[str, Any]]):
+        """Store many daily log embeddings in one append"""
+        self._upsert(self.log_collection, [self._log_point(**item) for item in items])
+    
+    def get_log_content_hash(self, log_id: str) -> Optional[str]:
+        """Content hash stored with a log's point, None if it has no point yet"""
+        payload = self.indexes[self.log_collection].get(point_id("log", log_id))
+        if payload is None:
+            return None
+        return payload.get("content_hash") or None
+    
+    def delete_stale_log_points(self, log_id: str):
+        """Remove points for a log other than its deterministic one"""
+        index = self.indexes[self.log_collection]
+        keep = point_id("log", log_id)
+        stale = [index.ids[row] for row in index.rows_matching("log_id", [log_id]) if index.ids[row] != keep]
+        index.delete(stale)
+    
+    def delete_concept_embeddings(self, concept_ids: List[str]):
+        """Remove the points of deleted (e.g. merged) concepts"""
+        self.indexes[self.concept_collection].delete([point_id("concept", cid) for cid in concept_ids])
+    
+    def get_concept_vectors(self, concept_ids: List[str]) -> Dict[str, List[float]]:
+        """Stored vectors of the concepts that have a point, keyed by concept id"""
+        index = self.indexes[self.concept_collection]
+        vectors = {}
+        for cid in concept_ids:
+            vector = index.get_vector(point_id("concept", cid))
+            if vector is not None:
+                vectors[cid] = vector.tolist()
+        return vectors
+    
+    def ownerless_points(self, collection: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """(point id, payload) of every point without an owner"""
+        index = self.indexes[collection]
+        rows = sorted(index.rows_matching("user_id", [None, ""]))
+        return [(index.ids[row], index.payloads[row]) for row in rows]
+    
+    def set_point_owner(self, collection: str, user_id: str, point_ids: List[str]):
+        """Set user_id on existing points"""
+        index = self.indexes[collection]
+        index.set_payloads([
+            (pid, {**index.get(pid), "user_id": user_id}) for pid in point_ids if index.get(pid) is not None
+        ])
+    
+    def delete_points(self, collection: str, point_ids: List[str]):
+        self.indexes[collection].delete(point_ids)
+    
+    def _keyword_filters(self, user_id: Optional[str], concept_field: str,
+                         concepts: Optional[List[str]], category: Optional[str]) -> Dict[str, List[Any]]:
+        filters: Dict[str, List[Any]] = {}
+        if user_id:
+            filters["user_id"] = [user_id]
+        if concepts:
+            filters[concept_field] = list(concepts)
+        if category:
+            filters["category"] = [category]
+        return filters
+    
+    def search_similar_concepts(self, query_embedding: List[float], limit: int = 5,
+                                user_id: Optional[str] = None, category: Optional[str] = None,
+                                concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search for similar concepts using exact cosine similarity"""
+        hits = self.indexes[self.concept_collection].search(
+            query_embedding, limit,
+            keyword_filters=self._keyword_filters(user_id, "name", concepts, category)
+        )
+        return [{"score": score, **payload} for score, payload in hits]
+    
+    def search_similar_logs(self, query_embedding: List[float], limit: int = 5,
+                            user_id: Optional[str] = None, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search for similar daily logs using exact cosine similarity"""
+        range_filters = {}
+        if start_date or end_date:
+            range_filters["log_date_ordinal"] = (
+                date_ordinal(start_date) if start_date else None,
+                date_ordinal(end_date) if end_date else None
+            )
+        hits = self.indexes[self.log_collection].search(
+            query_embedding, limit,
+            keyword_filters=self._keyword_filters(user_id, "concepts", concepts, None),
+            range_filters=range_filters
+        )
+        return [{"score": score, **payload} for score, payload in hits]
+    
+    def close(self):
+        for index in self.indexes.values():
+            index.close()
+
+
+class AsyncNumpyVectorStore:
+    """Coroutine facade over NumpyVectorStore matching AsyncQdrantVectorStore"""
+    
+    def __init__(self, store: NumpyVectorStore):
+        self.store = store
+    
+    async def close(self):
+        self.store.close()
+    
+    async def initialize_collections(self):
+        self.store.initialize_collections()
+    
+    async def create_payload_indexes(self):
+        self.store.create_payload_indexes()
+    
+    async def add_concept_embedding(self, *args, **kwargs):
+        await asyncio.to_thread(self.store.add_concept_embedding, *args, **kwargs)
+    
+    async def add_concept_embeddings(self, items: List[Dict[str, Any]]):
+        await asyncio.to_thread(self.store.add_concept_embeddings, items)
+    
+    async def add_log_embedding(self, *args, **kwargs):
+        await asyncio.to_thread(self.store.add_log_embedding, *args, **kwargs)
+    
+    async def add_log_embeddings(self, items: List[Dict[str, Any]]):
+        await asyncio.to_thread(self.store.add_log_embeddings, items)
+    
+    async def get_log_content_hash(self, log_id: str) -> Optional[str]:
+        return self.store.get_log_content_hash(log_id)
+    
+    async def delete_stale_log_points(self, log_id: str):
+        await asyncio.to_thread(self.store.delete_stale_log_points, log_id)
+    
+    async def get_concept_vectors(self, concept_ids: List[str]) -> Dict[str, List[float]]:
+        return await asyncio.to_thread(self.store.get_concept_vectors, concept_ids)
+    
+    async def delete_concept_embeddings(self, concept_ids: List[str]):
+        await asyncio.to_thread(self.store.delete_concept_embeddings, concept_ids)
+    
+    async def search_similar_concepts(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.search_similar_concepts, *args, **kwargs)
+    
+    async def search_similar_logs(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.search_similar_logs, *args, **kwargs)
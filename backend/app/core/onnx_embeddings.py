@@ -0,0 +1,119 @@
+"""
+ONNX Embedding Backend
+Run all-MiniLM-L6-v2 with ONNX Runtime (optionally int8-quantized) without torch
+"""
+from typing import List, Union
+import os
+import numpy as np
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class OnnxEmbeddingModel:
+    """
+    Drop-in replacement for SentenceTransformer.encode
+    Reproduces the all-MiniLM-L6-v2 pipeline: tokenize → transformer →
+    mean pooling over the attention mask → L2 normalization
+    """
+    
+    def __init__(self, model_dir: str, quantized: bool = True, max_seq_length: int = 256,
+                 num_threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}. "
+                f"Run: python -m scripts.export_onnx_embeddings"
+            )
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    
+    def encode(self, text: Union[str, List[str]], convert_to_numpy: bool = True, batch_size: int = 32) -> np.ndarray:
+        """Encode one text (→ 1-D array) or a list of texts (→ 2-D array)"""
+        single = isinstance(text, str)
+        texts = [text] if single else list(text)
+        
+        batches = [
+            self._encode_batch(texts[i:i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ]
+        embeddings = np.vstack(batches) if batches else np.zeros((0, 384), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+    
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        
+        token_embeddings = self.session.run(None, feeds)[0]
+        
+        # Mean pooling over real (non-padding) tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled = summed / counts
+        
+        norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return (pooled / norms).astype(np.float32)
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True):
+    """
+    Export a sentence-transformers checkpoint to ONNX (needs torch + transformers)
+    Writes model.onnx, tokenizer.json and, if `quantize`, model_int8.onnx with
+    dynamic int8 weight quantization
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    
+    if "/" not in model_name:
+        model_name = f"sentence-transformers/{model_name}"
+    os.makedirs(output_dir, exist_ok=True)
+    
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+    tokenizer.save_pretrained(output_dir)
+    
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+    
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(
+            model_path,
+            os.path.join(output_dir, QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8
+        )
@@ -0,0 +1,93 @@
+"""
+Security
+Password hashing and signed access tokens carrying the user id, with a
+verification cache so authenticated requests need no database lookup
+"""
+from jose import jwt, JWTError
+from passlib.context import CryptContext
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import time
+import uuid
+
+from app.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: Optional[str]) -> bool:
+    """False for accounts without a password (e.g. the legacy MVP user)"""
+    return bool(hashed_password) and pwd_context.verify(password, hashed_password)
+
+
+def create_access_token(user_id: uuid.UUID) -> Tuple[str, int]:
+    """Signed token for the user; returns (token, lifetime in seconds)"""
+    lifetime = timedelta(minutes=settings.access_token_expire_minutes)
+    now = datetime.now(timezone.utc)
+    token = jwt.encode(
+        {"sub": str(user_id), "iat": now, "exp": now + lifetime},
+        settings.secret_key,
+        algorithm=settings.jwt_algorithm
+    )
+    return token, int(lifetime.total_seconds())
+
+
+class InvalidTokenError(Exception):
+    """Access token is malformed, forged or expired"""
+
+
+class TokenVerifier:
+    """
+    Verify access tokens, caching the decoded user id per token
+    
+    A cached token skips signature checking and claim parsing; entries
+    expire with the token itself and the cache is LRU-bounded.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[uuid.UUID, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def verify(self, token: str) -> uuid.UUID:
+        """User id carried by a valid token; raises InvalidTokenError otherwise"""
+        entry = self._entries.get(token)
+        if entry is not None:
+            if entry[1] > time.time():
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return entry[0]
+            del self._entries[token]
+        
+        self.misses += 1
+        try:
+            claims = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+            user_id = uuid.UUID(claims["sub"])
+            expires_at = float(claims["exp"])
+        except (JWTError, KeyError, ValueError, TypeError) as e:
+            raise InvalidTokenError(str(e))
+        
+        self._entries[token] = (user_id, expires_at)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return user_id
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries
+        }
+
+
+# Global instance
+token_verifier = TokenVerifier(settings.auth_token_cache_size)
@@ -2,109 +2,341 @@
 Qdrant Vector Store Setup
 Initialize and manage Qdrant collections for semantic search
 """
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from typing import List, Dict, Any
-import uuid
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import VectorParamsDiff, Disabled, PointIdsList
+from typing import List, Dict, Any, Optional, Tuple
 
 from app.config import settings
+from app.core.vector_store_base import BaseQdrantVectorStore, point_id
 
 
-class QdrantVectorStore:
+class QdrantVectorStore(BaseQdrantVectorStore):
     """Manage Qdrant vector database for semantic search"""
     
     def __init__(self):
-        self.client = QdrantClient(
-            url=settings.qdrant_url,
-            api_key=settings.qdrant_api_key if settings.qdrant_api_key else None
-        )
-        self.concept_collection = "concept_embeddings"
-        self.log_collection = "log_embeddings"
+        self.client = QdrantClient(**self._client_kwargs())
         
     def initialize_collections(self):
         """Create Qdrant collections if they don't exist"""
-        # Concept embeddings collection (384 dim for all-MiniLM-L6-v2)
-        if not self.client.collection_exists(self.concept_collection):
-            self.client.create_collection(
-                collection_name=self.concept_collection,
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE)
-            )
-            print(f"✅ Created collection: {self.concept_collection}")
+        existing = {c.name for c in self.client.get_collections().collections}
+        for collection in (self.concept_collection, self.log_collection):
+            if collection not in existing:
+                self.client.create_collection(
+                    collection_name=collection,
+                    vectors_config=self._vectors_config(),
+                    quantization_config=self._quantization_config()
+                )
+                print(f"✅ Created collection: {collection}")
         
-        # Log embeddings collection
-        if not self.client.collection_exists(self.log_collection):
-            self.client.create_collection(
-                collection_name=self.log_collection,
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE)
+        self.create_payload_indexes()
+    
+    def create_payload_indexes(self):
+        """Index payload fields used by search filters (safe to re-run)"""
+        for collection, fields in self._payload_indexes().items():
+            for field_name, schema in fields.items():
+                self.client.create_payload_index(
+                    collection_name=collection,
+                    field_name=field_name,
+                    field_schema=schema
+                )
+        print("✅ Payload indexes ready")
+    
+    def apply_storage_settings(self):
+        """
+        Apply the configured on-disk / quantization settings to existing collections
+        Qdrant rebuilds quantized segments in the background
+        """
+        for collection in (self.concept_collection, self.log_collection):
+            self.client.update_collection(
+                collection_name=collection,
+                vectors_config={"": VectorParamsDiff(on_disk=settings.qdrant_vectors_on_disk)},
+                quantization_config=self._quantization_config() or Disabled.DISABLED
             )
-            print(f"✅ Created collection: {self.log_collection}")
+            print(f"✅ Updated storage settings: {collection} "
+                  f"(quantization={settings.qdrant_quantization}, on_disk={settings.qdrant_vectors_on_disk})")
     
     def add_concept_embedding(self, concept_id: str, embedding: List[float], 
-                            name: str, definition: str, category: str):
+                            name: str, definition: str, category: str, user_id: str = ""):
         """Store concept embedding in Qdrant"""
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=embedding,
-            payload={
-                "concept_id": concept_id,
-                "name": name,
-                "definition": definition,
-                "category": category
-            }
-        )
+        point = self._concept_point(concept_id, embedding, name, definition, category, user_id)
         self.client.upsert(
             collection_name=self.concept_collection,
             points=[point]
         )
     
-    def add_log_embedding(self, log_id: str, embedding: List[float],
-                        log_date: str, summary: str, concepts: List[str]):
-        """Store daily log embedding in Qdrant"""
-        point = PointStruct(
-            id=str(uuid.uuid4()),
-            vector=embedding,
-            payload={
-                "log_id": log_id,
-                "log_date": log_date,
-                "summary": summary,
-                "concepts": concepts
-            }
+    def add_concept_embeddings(self, items: List[Dict[str, Any]]):
+        """
+        Store many concept embeddings in a single upsert
+        items: [{concept_id, embedding, name, definition, category, user_id}, ...]
+        """
+        if not items:
+            return
+        self.client.upsert(
+            collection_name=self.concept_collection,
+            points=[self._concept_point(**item) for item in items]
         )
+    
+    def add_log_embedding(self, log_id: str, embedding: List[float],
+                        log_date: str, summary: str, concepts: List[str],
+                        content_hash: str = "", user_id: str = ""):
+        """Store (or replace) daily log embedding in Qdrant"""
+        point = self._log_point(log_id, embedding, log_date, summary, concepts, content_hash, user_id)
         self.client.upsert(
             collection_name=self.log_collection,
             points=[point]
         )
     
-    def search_similar_concepts(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+    def add_log_embeddings(self, items: List[Dict[str, Any]]):
+        """
+        Store many daily log embeddings in a single upsert
+        items: [{log_id, embedding, log_date, summary, concepts, content_hash, user_id}, ...]
+        """
+        if not items:
+            return
+        self.client.upsert(
+            collection_name=self.log_collection,
+            points=[self._log_point(**item) for item in items]
+        )
+    
+    def get_log_content_hash(self, log_id: str) -> Optional[str]:
+        """Content hash stored with a log's point, None if it has no point yet"""
+        points = self.client.retrieve(
+            collection_name=self.log_collection,
+            ids=[point_id("log", log_id)],
+            with_payload=["content_hash"],
+            with_vectors=False
+        )
+        if not points:
+            return None
+        return points[0].payload.get("content_hash") or None
+    
+    def delete_stale_log_points(self, log_id: str):
+        """Remove legacy random-id points for a log, keeping its deterministic point"""
+        self.client.delete(
+            collection_name=self.log_collection,
+            points_selector=self._stale_log_selector(log_id)
+        )
+    
+    def delete_concept_embeddings(self, concept_ids: List[str]):
+        """Remove the points of deleted (e.g. merged) concepts"""
+        if not concept_ids:
+            return
+        self.client.delete(
+            collection_name=self.concept_collection,
+            points_selector=PointIdsList(points=[point_id("concept", cid) for cid in concept_ids])
+        )
+    
+    def ownerless_points(self, collection: str, batch_size: int = 256) -> List[Tuple[str, Dict[str, Any]]]:
+        """(point id, payload) of every point without an owner"""
+        points: List[Tuple[str, Dict[str, Any]]] = []
+        offset = None
+        while True:
+            batch, offset = self.client.scroll(
+                collection_name=collection,
+                scroll_filter=self._ownerless_filter(),
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            points.extend((str(point.id), point.payload or {}) for point in batch)
+            if offset is None:
+                return points
+    
+    def set_point_owner(self, collection: str, user_id: str, point_ids: List[str]):
+        """Set user_id on existing points"""
+        if point_ids:
+            self.client.set_payload(collection_name=collection, payload={"user_id": user_id}, points=point_ids)
+    
+    def delete_points(self, collection: str, point_ids: List[str]):
+        if point_ids:
+            self.client.delete(collection_name=collection, points_selector=PointIdsList(points=point_ids))
+    
+    def search_similar_concepts(self, query_embedding: List[float], limit: int = 5,
+                                user_id: Optional[str] = None, category: Optional[str] = None,
+                                concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Search for similar concepts using vector similarity"""
         results = self.client.search(
             collection_name=self.concept_collection,
             query_vector=query_embedding,
+            search_params=self._search_params(),
+            query_filter=self._build_filter(
+                user_id=user_id, concepts=concepts, concept_field="name", category=category
+            ),
             limit=limit
         )
-        return [
-            {
-                "score": hit.score,
-                **hit.payload
-            }
-            for hit in results
-        ]
+        return self._format_hits(results)
     
-    def search_similar_logs(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+    def search_similar_logs(self, query_embedding: List[float], limit: int = 5,
+                            user_id: Optional[str] = None, start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Search for similar daily logs using vector similarity"""
         results = self.client.search(
             collection_name=self.log_collection,
             query_vector=query_embedding,
+            search_params=self._search_params(),
+            query_filter=self._build_filter(
+                user_id=user_id, start_date=start_date, end_date=end_date, concepts=concepts
+            ),
+            limit=limit
+        )
+        return self._format_hits(results)
+
+
+class AsyncQdrantVectorStore(BaseQdrantVectorStore):
+    """
+    Coroutine version of QdrantVectorStore for use inside async endpoints
+    One AsyncQdrantClient (REST or gRPC via `qdrant_prefer_grpc`) is reused
+    for every call
+    """
+    
+    def __init__(self):
+        self.client = AsyncQdrantClient(**self._client_kwargs())
+    
+    async def close(self):
+        """Close the underlying client connections"""
+        await self.client.close()
+    
+    async def initialize_collections(self):
+        """Create Qdrant collections if they don't exist"""
+        existing = {c.name for c in (await self.client.get_collections()).collections}
+        for collection in (self.concept_collection, self.log_collection):
+            if collection not in existing:
+                await self.client.create_collection(
+                    collection_name=collection,
+                    vectors_config=self._vectors_config(),
+                    quantization_config=self._quantization_config()
+                )
+                print(f"✅ Created collection: {collection}")
+        
+        await self.create_payload_indexes()
+    
+    async def create_payload_indexes(self):
+        """Index payload fields used by search filters (safe to re-run)"""
+        for collection, fields in self._payload_indexes().items():
+            for field_name, schema in fields.items():
+                await self.client.create_payload_index(
+                    collection_name=collection,
+                    field_name=field_name,
+                    field_schema=schema
+                )
+        print("✅ Payload indexes ready")
+    
+    async def add_concept_embedding(self, concept_id: str, embedding: List[float],
+                                    name: str, definition: str, category: str, user_id: str = ""):
+        """Store concept embedding in Qdrant"""
+        point = self._concept_point(concept_id, embedding, name, definition, category, user_id)
+        await self.client.upsert(
+            collection_name=self.concept_collection,
+            points=[point]
+        )
+    
+    async def add_concept_embeddings(self, items: List[Dict[str, Any]]):
+        """Store many concept embeddings in a single upsert"""
+        if not items:
+            return
+        await self.client.upsert(
+            collection_name=self.concept_collection,
+            points=[self._concept_point(**item) for item in items]
+        )
+    
+    async def add_log_embedding(self, log_id: str, embedding: List[float],
+                                log_date: str, summary: str, concepts: List[str],
+                                content_hash: str = "", user_id: str = ""):
+        """Store (or replace) daily log embedding in Qdrant"""
+        point = self._log_point(log_id, embedding, log_date, summary, concepts, content_hash, user_id)
+        await self.client.upsert(
+            collection_name=self.log_collection,
+            points=[point]
+        )
+    
+    async def add_log_embeddings(self, items: List[Dict[str, Any]]):
+        """Store many daily log embeddings in a single upsert"""
+        if not items:
+            return
+        await self.client.upsert(
+            collection_name=self.log_collection,
+            points=[self._log_point(**item) for item in items]
+        )
+    
+    async def get_log_content_hash(self, log_id: str) -> Optional[str]:
+        """Content hash stored with a log's point, None if it has no point yet"""
+        points = await self.client.retrieve(
+            collection_name=self.log_collection,
+            ids=[point_id("log", log_id)],
+            with_payload=["content_hash"],
+            with_vectors=False
+        )
+        if not points:
+            return None
+        return points[0].payload.get("content_hash") or None
+    
+    async def delete_stale_log_points(self, log_id: str):
+        """Remove legacy random-id points for a log, keeping its deterministic point"""
+        await self.client.delete(
+            collection_name=self.log_collection,
+            points_selector=self._stale_log_selector(log_id)
+        )
+    
+    async def get_concept_vectors(self, concept_ids: List[str]) -> Dict[str, List[float]]:
+        """Stored vectors of the concepts that have a point, keyed by concept id"""
+        if not concept_ids:
+            return {}
+        points = await self.client.retrieve(
+            collection_name=self.concept_collection,
+            ids=[point_id("concept", cid) for cid in concept_ids],
+            with_payload=["concept_id"],
+            with_vectors=True
+        )
+        return {point.payload["concept_id"]: point.vector for point in points if point.vector}
+    
+    async def delete_concept_embeddings(self, concept_ids: List[str]):
+        """Remove the points of deleted (e.g. merged) concepts"""
+        if not concept_ids:
+            return
+        await self.client.delete(
+            collection_name=self.concept_collection,
+            points_selector=PointIdsList(points=[point_id("concept", cid) for cid in concept_ids])
+        )
+    
+    async def search_similar_concepts(self, query_embedding: List[float], limit: int = 5,
+                                      user_id: Optional[str] = None, category: Optional[str] = None,
+                                      concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search for similar concepts using vector similarity"""
+        results = await self.client.search(
+            collection_name=self.concept_collection,
+            query_vector=query_embedding,
+            search_params=self._search_params(),
+            query_filter=self._build_filter(
+                user_id=user_id, concepts=concepts, concept_field="name", category=category
+            ),
+            limit=limit
+        )
+        return self._format_hits(results)
+    
+    async def search_similar_logs(self, query_embedding: List[float], limit: int = 5,
+                                  user_id: Optional[str] = None, start_date: Optional[str] = None,
+                                  end_date: Optional[str] = None,
+                                  concepts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search for similar daily logs using vector similarity"""
+        results = await self.client.search(
+            collection_name=self.log_collection,
+            query_vector=query_embedding,
+            search_params=self._search_params(),
+            query_filter=self._build_filter(
+                user_id=user_id, start_date=start_date, end_date=end_date, concepts=concepts
+            ),
             limit=limit
         )
-        return [
-            {
-                "score": hit.score,
-                **hit.payload
-            }
-            for hit in results
-        ]
+        return self._format_hits(results)
 
 
-# Global instance
-vector_store = QdrantVectorStore()
+# Global instances
+if settings.vector_store_backend == "numpy":
+    from app.core.numpy_vector_store import NumpyVectorStore, AsyncNumpyVectorStore
+    vector_store = NumpyVectorStore(settings.numpy_vector_store_path, dtype=settings.numpy_vector_dtype)
+    async_vector_store = AsyncNumpyVectorStore(vector_store)
+else:
+    vector_store = QdrantVectorStore()
+    async_vector_store = AsyncQdrantVectorStore()
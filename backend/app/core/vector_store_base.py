@@ -0,0 +1,182 @@
+"""
+Vector Store Base
+Point ids, payload layout and filters shared by every vector store backend
+"""
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct,
+    Filter, FieldCondition, MatchValue, MatchAny, Range, HasIdCondition,
+    FilterSelector, IsEmptyCondition, PayloadField, PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    BinaryQuantization, BinaryQuantizationConfig,
+    SearchParams, QuantizationSearchParams
+)
+from typing import List, Dict, Any, Optional
+from datetime import date
+import hashlib
+import uuid
+
+from app.config import settings
+
+# Namespace for deriving stable point ids from database ids
+POINT_ID_NAMESPACE = uuid.UUID("6f1c3a52-2d4e-4b8a-9f0e-5c7d8e9a1b2c")
+
+
+def point_id(kind: str, entity_id: str) -> str:
+    """Deterministic Qdrant point id for a log or concept row"""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{kind}:{entity_id}"))
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text an embedding was generated from"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def date_ordinal(value: str) -> int:
+    """Integer day number for a YYYY-MM-DD date (Qdrant range filters need numbers)"""
+    return date.fromisoformat(value).toordinal()
+
+
+class BaseQdrantVectorStore:
+    """Collection layout, point construction and filters shared by sync and async stores"""
+    
+    concept_collection = "concept_embeddings"
+    log_collection = "log_embeddings"
+    
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "url": settings.qdrant_url,
+            "api_key": settings.qdrant_api_key if settings.qdrant_api_key else None,
+            "prefer_grpc": settings.qdrant_prefer_grpc,
+            "grpc_port": settings.qdrant_grpc_port,
+        }
+    
+    def _vectors_config(self) -> VectorParams:
+        # 384 dim for all-MiniLM-L6-v2
+        return VectorParams(
+            size=384,
+            distance=Distance.COSINE,
+            on_disk=settings.qdrant_vectors_on_disk
+        )
+    
+    def _quantization_config(self):
+        """Scalar (int8) or binary quantization kept in RAM, or None"""
+        if settings.qdrant_quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=settings.qdrant_quantization_quantile,
+                    always_ram=True
+                )
+            )
+        if settings.qdrant_quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+    
+    def _search_params(self) -> Optional[SearchParams]:
+        """Oversample quantized candidates and rescore them with original vectors"""
+        if settings.qdrant_quantization not in ("scalar", "binary"):
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=settings.qdrant_rescore,
+                oversampling=settings.qdrant_oversampling
+            )
+        )
+    
+    def _payload_indexes(self) -> Dict[str, Dict[str, PayloadSchemaType]]:
+        """Payload fields used by search filters, per collection"""
+        return {
+            self.concept_collection: {
+                "user_id": PayloadSchemaType.KEYWORD,
+                "category": PayloadSchemaType.KEYWORD,
+                "name": PayloadSchemaType.KEYWORD,
+            },
+            self.log_collection: {
+                "user_id": PayloadSchemaType.KEYWORD,
+                "log_date": PayloadSchemaType.KEYWORD,
+                "log_date_ordinal": PayloadSchemaType.INTEGER,
+                "concepts": PayloadSchemaType.KEYWORD,
+            },
+        }
+    
+    def _concept_point(self, concept_id: str, embedding: List[float], name: str,
+                       definition: str, category: str, user_id: str = "") -> PointStruct:
+        text = f"{name}. {definition}" if definition else name
+        return PointStruct(
+            id=point_id("concept", concept_id),
+            vector=embedding,
+            payload={
+                "concept_id": concept_id,
+                "name": name,
+                "definition": definition,
+                "category": category,
+                "user_id": user_id,
+                "content_hash": content_hash(text)
+            }
+        )
+    
+    def _log_point(self, log_id: str, embedding: List[float], log_date: str,
+                   summary: str, concepts: List[str], content_hash: str = "",
+                   user_id: str = "") -> PointStruct:
+        return PointStruct(
+            id=point_id("log", log_id),
+            vector=embedding,
+            payload={
+                "log_id": log_id,
+                "user_id": user_id,
+                "log_date": log_date,
+                "log_date_ordinal": date_ordinal(log_date),
+                "summary": summary,
+                "concepts": concepts,
+                "content_hash": content_hash
+            }
+        )
+    
+    def _stale_log_selector(self, log_id: str) -> FilterSelector:
+        """Points for a log other than its deterministic one"""
+        return FilterSelector(
+            filter=Filter(
+                must=[FieldCondition(key="log_id", match=MatchValue(value=log_id))],
+                must_not=[HasIdCondition(has_id=[point_id("log", log_id)])]
+            )
+        )
+    
+    def _ownerless_filter(self) -> Filter:
+        """Points written before user_id was stored (missing, null or empty owner)"""
+        return Filter(should=[
+            IsEmptyCondition(is_empty=PayloadField(key="user_id")),
+            FieldCondition(key="user_id", match=MatchValue(value="")),
+        ])
+    
+    def _build_filter(self, user_id: Optional[str] = None, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, concepts: Optional[List[str]] = None,
+                      concept_field: str = "concepts", category: Optional[str] = None) -> Optional[Filter]:
+        """Translate optional search filters into a Qdrant payload filter"""
+        must = []
+        if user_id:
+            # Strict tenancy: ownerless legacy points are backfilled by scripts.migrate_vector_owners
+            must.append(FieldCondition(key="user_id", match=MatchValue(value=user_id)))
+        if start_date or end_date:
+            must.append(FieldCondition(
+                key="log_date_ordinal",
+                range=Range(
+                    gte=date_ordinal(start_date) if start_date else None,
+                    lte=date_ordinal(end_date) if end_date else None
+                )
+            ))
+        if concepts:
+            must.append(FieldCondition(key=concept_field, match=MatchAny(any=concepts)))
+        if category:
+            must.append(FieldCondition(key="category", match=MatchValue(value=category)))
+        return Filter(must=must) if must else None
+    
+    def _format_hits(self, results) -> List[Dict[str, Any]]:
+        return [
+            {
+                "score": hit.score,
+                **hit.payload
+            }
+            for hit in results
+        ]
@@ -8,6 +8,13 @@ from contextlib import asynccontextmanager
 
 from app.config import settings
 from app.database import init_db, close_db
+from app.services.llm_service import llm_service
+from app.services.ingestion_jobs import ingestion_workers
+from app.core.embeddings import embedding_batcher
+from app.core.vector_store import async_vector_store
+from app.services.lexical_search import lexical_refresher
+from app.services.concept_canonicalizer import concept_merger
+from app.services.mastery import mastery_decayer
 
 
 @asynccontextmanager
@@ -20,12 +27,32 @@ async def lifespan(app: FastAPI):
     await init_db()
     print("✅ Database initialized")
     
+    await ingestion_workers.start()
+    print("✅ Ingestion workers started")
+    
+    await lexical_refresher.rebuild()
+    lexical_refresher.start()
+    print("✅ Lexical search index loaded")
+    
+    concept_merger.start()
+    mastery_decayer.start()
+    
     yield
     
     # Shutdown
     print("👋 Shutting down Intern_AI Backend...")
+    await ingestion_workers.stop()
+    print("✅ Ingestion workers stopped")
+    await concept_merger.stop()
+    await mastery_decayer.stop()
+    await lexical_refresher.stop()
+    await embedding_batcher.stop()
     await close_db()
     print("✅ Database connections closed")
+    
+    await llm_service.aclose()
+    await async_vector_store.close()
+    print("✅ LLM and vector store connections closed")
 
 
 # Create FastAPI application
@@ -44,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -68,12 +96,13 @@ async def health_check():
 
 
 # API Router registration
-from app.api.v1 import ingestion, reasoning
+from app.api.v1 import auth, ingestion, reasoning, analytics
 
+app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
 app.include_router(ingestion.router, prefix="/api/v1", tags=["ingestion"])
 app.include_router(reasoning.router, prefix="/api/v1", tags=["reasoning"])
 # app.include_router(memory.router, prefix="/api/v1", tags=["memory"])
-# app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
 
 
 if __name__ == "__main__":
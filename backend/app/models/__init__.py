@@ -2,9 +2,11 @@
 Models package - SQLAlchemy ORM Models
 """
 from app.models.user import User
-from app.models.episodic import DailyLog, Activity, Assignment, Project
+from app.models.episodic import DailyLog, Activity, Assignment, Project, DiarySummary, SummaryReport
 from app.models.semantic import Concept, ConceptRelation, LogConcept
 from app.models.procedural import LearningPattern, PatternInstance
+from app.models.jobs import IngestionJob
+from app.models.analytics import AnalyticsRollup
 
 __all__ = [
     "User",
@@ -12,10 +14,14 @@ __all__ = [
     "Activity",
     "Assignment",
     "Project",
+    "DiarySummary",
+    "SummaryReport",
     "Concept",
     "ConceptRelation",
     "LogConcept",
     "LearningPattern",
     "PatternInstance",
+    "IngestionJob",
+    "AnalyticsRollup",
 ]
 
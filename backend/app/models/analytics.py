@@ -0,0 +1,35 @@
+"""
+Analytics Models - SQLAlchemy ORM
+Per-day, per-week and per-month rollups maintained on ingest for dashboards
+"""
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
+from sqlalchemy.sql import func
+import uuid
+
+from app.database import Base
+
+
+class AnalyticsRollup(Base):
+    """Aggregated activity, mood, difficulty and concept counts for one period"""
+    __tablename__ = "analytics_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "period_start", name="uq_analytics_rollup_period"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    period = Column(String(10), nullable=False)  # 'day', 'week', 'month', 'total' (one all-time row)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    log_count = Column(Integer, nullable=False, default=0)
+    activity_minutes = Column(JSONB, nullable=False, default=dict)  # {activity_type: minutes}
+    total_minutes = Column(Integer, nullable=False, default=0)
+    activity_count = Column(Integer, nullable=False, default=0)
+    assignment_count = Column(Integer, nullable=False, default=0)
+    mood_counts = Column(JSONB, nullable=False, default=dict)  # {mood: days}
+    difficulty_counts = Column(JSONB, nullable=False, default=dict)  # {difficulty: days}
+    concept_count = Column(Integer, nullable=False, default=0)  # distinct concepts practised
+    new_concept_count = Column(Integer, nullable=False, default=0)  # concepts first learned
+    streak_days = Column(Integer)  # day rows: consecutive logged days ending here; total row: longest streak
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
@@ -2,7 +2,7 @@
 Episodic Memory Models - SQLAlchemy ORM
 Represents daily logs, activities, assignments, and projects
 """
-from sqlalchemy import Column, String, Text, Integer, Date, ForeignKey, ARRAY
+from sqlalchemy import Column, String, Text, Integer, Date, ForeignKey, ARRAY, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -14,6 +14,10 @@ from app.database import Base
 class DailyLog(Base):
     """Daily log entries with raw and structured data"""
     __tablename__ = "daily_logs"
+    __table_args__ = (
+        # One log per user per day; also serves keyset pagination over (user_id, log_date)
+        UniqueConstraint("user_id", "log_date", name="uq_daily_log_user_date"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -49,6 +53,9 @@ class Activity(Base):
 class Assignment(Base):
     """Tasks and assignments"""
     __tablename__ = "assignments"
+    __table_args__ = (
+        UniqueConstraint("log_id", "title", name="uq_assignment_log_title"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     log_id = Column(UUID(as_uuid=True), ForeignKey("daily_logs.id", ondelete="SET NULL"))
@@ -79,3 +86,39 @@ class Project(Base):
     status = Column(String(20), default='active')
     repo_url = Column(String(500))
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class DiarySummary(Base):
+    """Cached day/week/month summaries used to build diary reports hierarchically"""
+    __tablename__ = "diary_summaries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "level", "period_start", "period_end", name="uq_diary_summary_period"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    level = Column(String(10), nullable=False)  # 'day', 'week', 'month'
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    summary = Column(Text, nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class SummaryReport(Base):
+    """Final diary reports cached per request, valid while the log fingerprint matches"""
+    __tablename__ = "summary_reports"
+    __table_args__ = (
+        UniqueConstraint("user_id", "mode", "period_start", "period_end", name="uq_summary_report_request"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    mode = Column(String(20), nullable=False)
+    period_start = Column(Date, nullable=False)
+    period_end = Column(Date, nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # log count + max updated_at
+    summary = Column(Text, nullable=False)
+    report_metadata = Column(JSONB)
+    created_at = Column(TIMESTAMP, server_default=func.now())
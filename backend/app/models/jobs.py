@@ -0,0 +1,25 @@
+"""
+Job Models - SQLAlchemy ORM
+Tracks background ingestion jobs and their per-stage progress
+"""
+from sqlalchemy import Column, String, Text, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TIMESTAMP
+from sqlalchemy.sql import func
+import uuid
+
+from app.database import Base
+
+
+class IngestionJob(Base):
+    """Background processing of a persisted daily log"""
+    __tablename__ = "ingestion_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    log_id = Column(UUID(as_uuid=True), ForeignKey("daily_logs.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default='queued', index=True)  # 'queued', 'running', 'completed', 'failed'
+    stages = Column(JSONB, nullable=False)  # {stage_name: 'pending'|'running'|'completed'|'failed'|'skipped'}
+    error = Column(Text)
+    heartbeat_at = Column(TIMESTAMP)  # Lease: refreshed by the worker running the job
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
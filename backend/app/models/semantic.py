@@ -2,7 +2,7 @@
 Semantic Memory Models - SQLAlchemy ORM
 Represents concepts learned and their relationships
 """
-from sqlalchemy import Column, String, Text, Integer, Date, Float, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, Date, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -14,10 +14,14 @@ from app.database import Base
 class Concept(Base):
     """Concepts learned during internship"""
     __tablename__ = "concepts"
+    __table_args__ = (
+        UniqueConstraint("user_id", "normalized_name", name="uq_concept_user_normalized_name"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     name = Column(String(255), nullable=False, index=True)
+    normalized_name = Column(String(255), nullable=False)  # lowercased, whitespace-collapsed
     definition = Column(Text)
     category = Column(String(100))  # 'programming', 'framework', 'algorithm', 'database'
     first_learned_date = Column(Date)
@@ -16,6 +16,7 @@ class User(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
+    hashed_password = Column(String(255))
     full_name = Column(String(255))
     internship_start_date = Column(Date)
     internship_end_date = Column(Date)
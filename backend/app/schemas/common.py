@@ -2,11 +2,37 @@
 Pydantic Schemas for API Request/Response Validation
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import date, datetime
 from uuid import UUID
 
 
+# ===== Auth Schemas =====
+
+class UserCreate(BaseModel):
+    """Account registration"""
+    email: str = Field(..., max_length=255, pattern=r"^[^@\s]+@[^@\s]+$")
+    password: str = Field(..., min_length=8, max_length=128)
+    full_name: Optional[str] = Field(None, max_length=255)
+
+
+class UserResponse(BaseModel):
+    """User profile"""
+    id: UUID
+    email: str
+    full_name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class TokenResponse(BaseModel):
+    """OAuth2 bearer access token"""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
 # ===== Daily Log Schemas =====
 
 class ActivityCreate(BaseModel):
@@ -53,6 +79,38 @@ class DailyLogResponse(BaseModel):
         from_attributes = True
 
 
+class DailyLogListItem(BaseModel):
+    """
+    Daily log in list responses; only the requested `fields` are set
+    (id and log_date are always present)
+    """
+    id: UUID
+    log_date: date
+    user_id: Optional[UUID] = None
+    raw_text: Optional[str] = None
+    structured_data: Optional[Dict[str, Any]] = None
+    mood: Optional[str] = None
+    difficulty_level: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+# ===== Ingestion Job Schemas =====
+
+class IngestionJobResponse(BaseModel):
+    """Background ingestion job status"""
+    id: UUID
+    log_id: UUID
+    status: str
+    stages: Dict[str, str]
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # ===== Concept Schemas =====
 
 class ConceptCreate(BaseModel):
@@ -119,6 +177,11 @@ class SearchRequest(BaseModel):
     query: str
     limit: int = Field(default=5, ge=1, le=20)
     search_type: str = Field(default="concepts", description="concepts or logs")
+    mode: Literal["vector", "hybrid"] = Field(default="vector", description="vector, or hybrid (BM25 + vector with reciprocal rank fusion)")
+    start_date: Optional[date] = Field(default=None, description="Logs only: earliest log date")
+    end_date: Optional[date] = Field(default=None, description="Logs only: latest log date")
+    concepts: Optional[List[str]] = Field(default=None, description="Match any of these concept tags (concept names for concept search)")
+    category: Optional[str] = Field(default=None, description="Concepts only: concept category")
 
 
 class SearchResult(BaseModel):
@@ -144,3 +207,30 @@ class AnalyticsResponse(BaseModel):
     learning_streak: int
     most_common_difficulties: List[str]
     top_concepts: List[Dict[str, Any]]
+
+
+class AnalyticsPeriodResponse(BaseModel):
+    """Rollup of one day, week or month"""
+    period: str
+    period_start: date
+    period_end: date
+    log_count: int
+    activity_minutes: Dict[str, int]
+    total_minutes: int
+    activity_count: int
+    assignment_count: int
+    mood_counts: Dict[str, int]
+    difficulty_counts: Dict[str, int]
+    concept_count: int
+    new_concept_count: int
+    streak_days: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class StreakResponse(BaseModel):
+    """Consecutive-day logging streaks"""
+    current_streak: int
+    longest_streak: int
+    last_logged_date: Optional[date] = None
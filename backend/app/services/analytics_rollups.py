@@ -0,0 +1,282 @@
+"""
+Analytics Rollups
+Keep per-day/week/month rollup rows current as logs are ingested or edited,
+recomputing only the periods that contain the changed dates
+"""
+from sqlalchemy import select, update, func, and_, exists, values, column, String, Date
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from datetime import date, timedelta
+import uuid
+
+from app.models import AnalyticsRollup, DailyLog, Activity, Assignment, Concept, LogConcept
+
+ROLLUP_PERIODS = ("day", "week", "month")
+# One all-time row per user, holding the longest streak; its key dates are fixed
+TOTAL_PERIOD = "total"
+TOTAL_PERIOD_START = date.min
+TOTAL_PERIOD_END = date.max
+
+PeriodKey = Tuple[str, date]
+
+
+def rollup_periods(day: date) -> List[Tuple[str, date, date]]:
+    """The day itself, its ISO week (Mon-Sun) and its calendar month"""
+    week_start = day - timedelta(days=day.weekday())
+    month_start = day.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return [
+        ("day", day, day),
+        ("week", week_start, week_start + timedelta(days=6)),
+        ("month", month_start, next_month - timedelta(days=1)),
+    ]
+
+
+async def refresh_rollups(db: AsyncSession, user_id: uuid.UUID, dates: Iterable[date]):
+    """
+    Recompute the rollup rows of every period containing one of `dates`
+    
+    All affected periods are aggregated together: one grouped query each for
+    log moods/difficulties, activities, assignments, distinct concepts and
+    newly learned concepts, then a single upsert. Day-row streaks are renumbered
+    only across the runs the changed days belong to.
+    """
+    periods = sorted({period for day in set(dates) for period in rollup_periods(day)})
+    if not periods:
+        return
+    
+    period_table = values(
+        column("period", String), column("period_start", Date), column("period_end", Date),
+        name="periods"
+    ).data(periods)
+    period_cols = (period_table.c.period, period_table.c.period_start)
+    logs_in_period = and_(
+        DailyLog.user_id == user_id,
+        DailyLog.log_date >= period_table.c.period_start,
+        DailyLog.log_date <= period_table.c.period_end
+    )
+    
+    rows: Dict[PeriodKey, Dict[str, Any]] = {
+        (period, start): {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "period": period,
+            "period_start": start,
+            "period_end": end,
+            "log_count": 0,
+            "activity_minutes": {},
+            "total_minutes": 0,
+            "activity_count": 0,
+            "assignment_count": 0,
+            "mood_counts": {},
+            "difficulty_counts": {},
+            "concept_count": 0,
+            "new_concept_count": 0
+        }
+        for period, start, end in periods
+    }
+    
+    result = await db.execute(
+        select(*period_cols, DailyLog.mood, DailyLog.difficulty_level, func.count())
+        .select_from(period_table)
+        .join(DailyLog, logs_in_period)
+        .group_by(*period_cols, DailyLog.mood, DailyLog.difficulty_level)
+    )
+    for period, start, mood, difficulty, count in result.all():
+        row = rows[(period, start)]
+        row["log_count"] += count
+        if mood:
+            row["mood_counts"][mood] = row["mood_counts"].get(mood, 0) + count
+        if difficulty:
+            row["difficulty_counts"][difficulty] = row["difficulty_counts"].get(difficulty, 0) + count
+    
+    result = await db.execute(
+        select(
+            *period_cols, Activity.activity_type,
+            func.count(), func.coalesce(func.sum(Activity.duration_minutes), 0)
+        )
+        .select_from(period_table)
+        .join(DailyLog, logs_in_period)
+        .join(Activity, Activity.log_id == DailyLog.id)
+        .group_by(*period_cols, Activity.activity_type)
+    )
+    for period, start, activity_type, count, minutes in result.all():
+        row = rows[(period, start)]
+        row["activity_count"] += count
+        # Untyped activities share "other" with ones literally typed that way
+        key = activity_type or "other"
+        row["activity_minutes"][key] = row["activity_minutes"].get(key, 0) + int(minutes)
+        row["total_minutes"] += int(minutes)
+    
+    result = await db.execute(
+        select(*period_cols, func.count(Assignment.id))
+        .select_from(period_table)
+        .join(DailyLog, logs_in_period)
+        .join(Assignment, Assignment.log_id == DailyLog.id)
+        .group_by(*period_cols)
+    )
+    for period, start, count in result.all():
+        rows[(period, start)]["assignment_count"] = count
+    
+    result = await db.execute(
+        select(*period_cols, func.count(func.distinct(LogConcept.concept_id)))
+        .select_from(period_table)
+        .join(DailyLog, logs_in_period)
+        .join(LogConcept, LogConcept.log_id == DailyLog.id)
+        .group_by(*period_cols)
+    )
+    for period, start, count in result.all():
+        rows[(period, start)]["concept_count"] = count
+    
+    result = await db.execute(
+        select(*period_cols, func.count(Concept.id))
+        .select_from(period_table)
+        .join(Concept, and_(
+            Concept.user_id == user_id,
+            Concept.first_learned_date >= period_table.c.period_start,
+            Concept.first_learned_date <= period_table.c.period_end
+        ))
+        .group_by(*period_cols)
+    )
+    for period, start, count in result.all():
+        rows[(period, start)]["new_concept_count"] = count
+    
+    stmt = insert(AnalyticsRollup).values(list(rows.values()))
+    await db.execute(stmt.on_conflict_do_update(
+        constraint="uq_analytics_rollup_period",
+        set_={
+            name: stmt.excluded[name]
+            for name in (
+                "period_end", "log_count", "activity_minutes", "total_minutes", "activity_count",
+                "assignment_count", "mood_counts", "difficulty_counts", "concept_count",
+                "new_concept_count"
+            )
+        } | {"updated_at": func.now()}
+    ))
+    
+    changed_days = [start for period, start, _ in periods if period == "day"]
+    if changed_days:
+        await _renumber_streaks(db, user_id, changed_days)
+
+
+def number_streaks(days: List[date], previous_day: Optional[date] = None,
+                   previous_streak: int = 0) -> List[int]:
+    """
+    Position of each of the ascending logged `days` within its consecutive run,
+    continuing from `previous_streak` when the first day follows `previous_day`
+    """
+    streaks: List[int] = []
+    streak, previous = previous_streak, previous_day
+    for day in days:
+        streak = streak + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        streaks.append(streak)
+        previous = day
+    return streaks
+
+
+async def _renumber_streaks(db: AsyncSession, user_id: uuid.UUID, changed_days: List[date]):
+    """
+    Renumber day-row streaks from the first changed day to the end of the run
+    that follows the last one; earlier rows and later runs are unaffected.
+    The user's total row keeps the longest streak.
+    """
+    first, last = min(changed_days), max(changed_days)
+    logged_days = and_(
+        AnalyticsRollup.user_id == user_id,
+        AnalyticsRollup.period == "day",
+        AnalyticsRollup.log_count > 0
+    )
+    
+    # A changed day shifts the numbering of the consecutive days after it, up to the next gap
+    run_end = last
+    following = aliased(AnalyticsRollup)
+    if await db.scalar(select(exists().where(logged_days, AnalyticsRollup.period_start == last + timedelta(days=1)))):
+        run_end = await db.scalar(
+            select(func.min(AnalyticsRollup.period_start)).where(
+                logged_days,
+                AnalyticsRollup.period_start > last,
+                ~exists().where(
+                    following.user_id == user_id,
+                    following.period == "day",
+                    following.log_count > 0,
+                    following.period_start == AnalyticsRollup.period_start + 1
+                )
+            )
+        )
+    
+    result = await db.execute(
+        select(AnalyticsRollup.id, AnalyticsRollup.period_start, AnalyticsRollup.streak_days)
+        .where(
+            logged_days,
+            AnalyticsRollup.period_start >= first - timedelta(days=1),
+            AnalyticsRollup.period_start <= run_end
+        )
+        .order_by(AnalyticsRollup.period_start)
+    )
+    rows = result.all()
+    previous_day, previous_streak = None, 0
+    if rows and rows[0].period_start < first:
+        previous_day, previous_streak = rows[0].period_start, rows[0].streak_days or 0
+        rows = rows[1:]
+    
+    streaks = number_streaks([row.period_start for row in rows], previous_day, previous_streak)
+    changed = [
+        {"id": row.id, "streak_days": streak}
+        for row, streak in zip(rows, streaks) if row.streak_days != streak
+    ]
+    if changed:
+        # Bulk UPDATE by primary key
+        await db.execute(update(AnalyticsRollup), changed)
+    
+    cleared = await db.execute(
+        update(AnalyticsRollup)
+        .where(
+            AnalyticsRollup.user_id == user_id,
+            AnalyticsRollup.period == "day",
+            AnalyticsRollup.period_start.in_(changed_days),
+            AnalyticsRollup.log_count == 0,
+            AnalyticsRollup.streak_days.isnot(None)
+        )
+        .values(streak_days=None)
+        .returning(AnalyticsRollup.id)
+        .execution_options(synchronize_session=False)
+    )
+    
+    longest = max(streaks, default=0)
+    rescanned = cleared.first() is not None
+    if rescanned:
+        # A logged day went away and may have split the longest run: rescan (write path only)
+        longest = await db.scalar(
+            select(func.coalesce(func.max(AnalyticsRollup.streak_days), 0)).where(logged_days)
+        )
+    stmt = insert(AnalyticsRollup).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        period=TOTAL_PERIOD,
+        period_start=TOTAL_PERIOD_START,
+        period_end=TOTAL_PERIOD_END,
+        streak_days=longest
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        constraint="uq_analytics_rollup_period",
+        set_={
+            "streak_days": stmt.excluded.streak_days if rescanned
+            else func.greatest(AnalyticsRollup.streak_days, stmt.excluded.streak_days),
+            "updated_at": func.now()
+        }
+    ))
+
+
+async def refresh_rollups_for_concepts(db: AsyncSession, user_id: uuid.UUID, concept_ids: Iterable[uuid.UUID]):
+    """Refresh every period in which the given concepts were practised"""
+    ids = list(set(concept_ids))
+    if not ids:
+        return
+    result = await db.execute(
+        select(DailyLog.log_date).distinct()
+        .join(LogConcept, LogConcept.log_id == DailyLog.id)
+        .where(LogConcept.concept_id.in_(ids))
+    )
+    await refresh_rollups(db, user_id, result.scalars().all())
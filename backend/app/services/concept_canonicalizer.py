@@ -0,0 +1,285 @@
+"""
+Concept Canonicalization
+Map near-duplicate concept names ("FastAPI routes", "fastapi router") onto one
+canonical Concept: at ingest time against the user's concept vectors, and in a
+periodic background pass that merges historical duplicates
+"""
+from sqlalchemy import select, update, delete, literal, func
+from sqlalchemy.dialects.postgresql import insert, UUID
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import uuid
+
+import numpy as np
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models import Concept, ConceptRelation, LogConcept
+from app.core.embeddings import embedding_generator, concept_embedding_cache
+from app.core.lexical_index import lexical_index
+from app.core.vector_store import async_vector_store
+from app.services.mastery import update_mastery
+from app.services.analytics_rollups import refresh_rollups_for_concepts
+
+
+# Application-wide advisory lock key: one merge pass at a time across workers
+MERGE_LOCK_KEY = 4_210_021
+# Merge gives way to a contending ingest well before deadlock detection (1s) could pick the ingest
+MERGE_LOCK_TIMEOUT = "500ms"
+
+
+def normalize_concept_name(name: str) -> str:
+    """Case- and whitespace-insensitive concept key (matches Concept.normalized_name)"""
+    return " ".join(name.lower().split())[:255]
+
+
+def _unit(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    return array / max(float(np.linalg.norm(array)), 1e-12)
+
+
+async def canonicalize_concept_names(user_id: uuid.UUID, names: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+    """
+    Map concepts the user has not seen before (normalized key → display name)
+    to (canonical key, canonical name)
+    
+    A name within the similarity threshold of one of the user's existing
+    concept vectors, or of an earlier new name in the same batch, maps to it;
+    anything else maps to itself
+    """
+    keys = list(names)
+    embeddings = await asyncio.gather(*(concept_embedding_cache.embed(names[key]) for key in keys))
+    searches = await asyncio.gather(*(
+        async_vector_store.search_similar_concepts(embedding, limit=1, user_id=str(user_id))
+        for embedding in embeddings
+    ), return_exceptions=True)
+    
+    threshold = settings.concept_merge_threshold
+    mapping: Dict[str, Tuple[str, str]] = {}
+    batch_canonicals: List[Tuple[str, np.ndarray]] = []
+    for key, embedding, hits in zip(keys, embeddings, searches):
+        if isinstance(hits, Exception):
+            print(f"⚠️ Concept vector search failed for '{names[key]}': {hits}")
+            hits = []
+        if hits and hits[0].get("name") and hits[0]["score"] >= threshold:
+            mapping[key] = (normalize_concept_name(hits[0]["name"]), hits[0]["name"])
+            continue
+        
+        vector = _unit(embedding)
+        match = next((canonical for canonical, other in batch_canonicals
+                      if float(other @ vector) >= threshold), None)
+        if match is None:
+            batch_canonicals.append((key, vector))
+            match = key
+        mapping[key] = (match, names[match])
+    
+    aliased = sum(1 for key, (canonical, _) in mapping.items() if canonical != key)
+    if aliased:
+        print(f"🔗 Mapped {aliased} new concept name(s) onto existing concepts")
+    return mapping
+
+
+async def _merge_into(db: AsyncSession, duplicate: Concept, canonical: Concept):
+    """Move a duplicate concept's links and relations onto the canonical row, then delete it"""
+    await db.execute(
+        insert(LogConcept).from_select(
+            ["log_id", "concept_id", "context"],
+            select(
+                LogConcept.log_id,
+                literal(canonical.id, type_=UUID(as_uuid=True)),
+                LogConcept.context
+            ).where(LogConcept.concept_id == duplicate.id)
+        ).on_conflict_do_nothing()
+    )
+    await db.execute(
+        update(ConceptRelation)
+        .where(ConceptRelation.concept_a_id == duplicate.id)
+        .values(concept_a_id=canonical.id)
+    )
+    await db.execute(
+        update(ConceptRelation)
+        .where(ConceptRelation.concept_b_id == duplicate.id)
+        .values(concept_b_id=canonical.id)
+    )
+    
+    canonical.definition = canonical.definition or duplicate.definition
+    canonical.category = canonical.category or duplicate.category
+    
+    # Core delete: the remaining log links go with it via ON DELETE CASCADE
+    await db.execute(delete(Concept).where(Concept.id == duplicate.id))
+
+
+def _plan_merges(vectors: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """
+    (duplicate row, canonical row) pairs for unit vectors in canonical-preference
+    order: each row joins its most similar earlier canonical row at or above
+    `threshold`, otherwise it becomes canonical itself
+    """
+    canonical_rows: List[int] = []
+    merges: List[Tuple[int, int]] = []
+    for i in range(len(vectors)):
+        if canonical_rows:
+            similarities = vectors[canonical_rows] @ vectors[i]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                merges.append((i, canonical_rows[best]))
+                continue
+        canonical_rows.append(i)
+    return merges
+
+
+async def _concept_vectors(concepts: List[Concept]) -> np.ndarray:
+    """Unit name vectors, read from the concept collection; only concepts without a point are embedded"""
+    vectors = await async_vector_store.get_concept_vectors([str(c.id) for c in concepts])
+    missing = [c for c in concepts if str(c.id) not in vectors]
+    if missing:
+        embedded = await asyncio.to_thread(embedding_generator.generate, [c.name for c in missing])
+        vectors.update(zip((str(c.id) for c in missing), embedded))
+    matrix = np.asarray([vectors[str(c.id)] for c in concepts], dtype=np.float32)
+    matrix /= np.clip(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12, None)
+    return matrix
+
+
+async def merge_duplicate_concepts(db: AsyncSession, user_id: uuid.UUID) -> int:
+    """
+    Consolidate a user's near-duplicate concepts; returns how many were merged
+    The earliest-learned concept of each cluster stays canonical
+    
+    The merged rows are locked before their links move: an ingest that already
+    upserted one of them finishes linking first, and one that arrives later
+    waits, finds the duplicate gone and re-creates it instead of linking to a
+    deleted row. The lock wait is short so the merge, not the ingest, gives up
+    (raising DBAPIError) when the two contend.
+    """
+    result = await db.execute(
+        select(Concept).where(Concept.user_id == user_id)
+        .order_by(Concept.first_learned_date.asc().nulls_last(), Concept.created_at)
+    )
+    concepts = result.scalars().all()
+    if len(concepts) < 2:
+        return 0
+    
+    vectors = await _concept_vectors(concepts)
+    merges = [
+        (concepts[duplicate], concepts[canonical])
+        for duplicate, canonical in _plan_merges(vectors, settings.concept_merge_threshold)
+    ]
+    if not merges:
+        return 0
+    
+    await db.execute(select(func.set_config("lock_timeout", MERGE_LOCK_TIMEOUT, True)))
+    locked = await db.execute(
+        select(Concept.id)
+        .where(Concept.id.in_({concept.id for pair in merges for concept in pair}))
+        .order_by(Concept.id)
+        .with_for_update()
+    )
+    locked_ids = set(locked.scalars().all())
+    merges = [(duplicate, canonical) for duplicate, canonical in merges
+              if duplicate.id in locked_ids and canonical.id in locked_ids]
+    
+    for duplicate, canonical in merges:
+        await _merge_into(db, duplicate, canonical)
+    await db.execute(
+        delete(ConceptRelation).where(ConceptRelation.concept_a_id == ConceptRelation.concept_b_id)
+    )
+    # Practice counts and dates now span the merged links
+    await db.flush()
+    canonical_ids = {canonical.id for _, canonical in merges}
+    await update_mastery(db, canonical_ids)
+    # Distinct and new concept counts shrink wherever the duplicates were practised
+    await refresh_rollups_for_concepts(db, user_id, canonical_ids)
+    await db.commit()
+    
+    merged_ids = [str(duplicate.id) for duplicate, _ in merges]
+    for concept_id in merged_ids:
+        lexical_index.remove_concept(concept_id)
+    await async_vector_store.delete_concept_embeddings(merged_ids)
+    
+    print(f"🔗 Merged {len(merges)} duplicate concept(s) for user {user_id}")
+    return len(merges)
+
+
+async def run_merge_pass(since: Optional[datetime] = None) -> Optional[int]:
+    """
+    Merge duplicate concepts for every user with a concept created since `since`
+    (every user when None); returns how many were merged, or None when another
+    worker holds the merge lock
+    
+    Concepts older than the last pass were already compared with each other,
+    so users without new concepts have nothing to merge
+    """
+    async with engine.connect() as lock_conn:
+        acquired = await lock_conn.scalar(select(func.pg_try_advisory_lock(MERGE_LOCK_KEY)))
+        # Session-level lock: it outlives this transaction, which is ended so the connection isn't idle in one
+        await lock_conn.commit()
+        if not acquired:
+            print("⏭️ Concept merge pass already running on another worker")
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                query = select(Concept.user_id).distinct()
+                if since is not None:
+                    query = query.where(Concept.created_at >= since)
+                result = await db.execute(query)
+                user_ids = result.scalars().all()
+                total = 0
+                for user_id in user_ids:
+                    try:
+                        total += await merge_duplicate_concepts(db, user_id)
+                    except DBAPIError as e:
+                        await db.rollback()
+                        print(f"⚠️ Concept merge for user {user_id} deferred to the next pass: {e.orig}")
+            return total
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(MERGE_LOCK_KEY)))
+            await lock_conn.commit()
+
+
+class ConceptMergeScheduler:
+    """Run the duplicate-concept merge pass periodically in the background"""
+    
+    # now() is the transaction start time, so concepts can commit stamped a little before a pass
+    CREATED_AT_SLACK = timedelta(minutes=5)
+    
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.task: Optional[asyncio.Task] = None
+        self.last_pass_at: Optional[datetime] = None
+    
+    def start(self):
+        """Start the periodic pass (disabled when the interval is 0)"""
+        if self.interval_seconds > 0:
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+    
+    async def run_once(self) -> Optional[int]:
+        """One pass over the users with concepts created since this worker's last pass"""
+        async with AsyncSessionLocal() as db:
+            # Database clock, matching Concept.created_at
+            started_at = await db.scalar(select(func.localtimestamp()))
+        since = self.last_pass_at - self.CREATED_AT_SLACK if self.last_pass_at else None
+        merged = await run_merge_pass(since)
+        if merged is not None:
+            self.last_pass_at = started_at
+        return merged
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"⚠️ Concept merge pass failed: {e}")
+
+
+# Global instance
+concept_merger = ConceptMergeScheduler(settings.concept_merge_interval_seconds)
@@ -0,0 +1,134 @@
+"""
+Extraction Cache
+Content-addressed SQLite cache for LLM structured-data extraction results
+"""
+from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+
+
+class ExtractionCache:
+    """Persistent LRU cache keyed by normalized log text + prompt/model version"""
+    
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS extraction_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_extraction_cache_last_access "
+            "ON extraction_cache (last_access)"
+        )
+        # Running totals so a write only scans the table when it crosses the budget
+        self._entries, self._total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extraction_cache"
+        ).fetchone()
+    
+    @staticmethod
+    def make_key(raw_text: str, version: str) -> str:
+        """Hash of whitespace-normalized text plus prompt/model version"""
+        normalized = re.sub(r"\s+", " ", raw_text).strip()
+        return hashlib.sha256(f"{version}\n{normalized}".encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached extraction and bump its recency, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE extraction_cache SET last_access = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store an extraction, evicting least recently used entries over budget"""
+        payload = json.dumps(value)
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+            if previous is None:
+                self._entries += 1
+                self._total_bytes += size
+            else:
+                self._total_bytes += size - previous[0]
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+    
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """`get` on a worker thread, keeping SQLite I/O off the event loop"""
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, value: Dict[str, Any]):
+        """`set` on a worker thread, keeping SQLite I/O off the event loop"""
+        await asyncio.to_thread(self.set, key, value)
+    
+    def _evict(self):
+        # Other processes may share the file, so resync before choosing victims
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extraction_cache"
+        ).fetchone()
+        self._entries, self._total_bytes = entries, total
+        if total <= self.max_bytes:
+            return
+        
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM extraction_cache ORDER BY last_access"
+        ):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM extraction_cache WHERE key = ?", victims)
+        self._entries -= len(victims)
+        self._total_bytes -= freed
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current cache size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "size_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+
+# Global instance
+extraction_cache = ExtractionCache(
+    settings.extraction_cache_path,
+    settings.extraction_cache_max_bytes
+) if settings.extraction_cache_enabled else None
@@ -0,0 +1,250 @@
+"""
+Background Ingestion Jobs
+In-process worker pool that runs extraction, normalization, embedding and
+vector upsert for logs persisted by the job-mode ingestion endpoint
+"""
+from sqlalchemy import select, update, or_, and_, func
+from typing import Dict, List, Optional, Set
+from datetime import timedelta
+import asyncio
+import uuid
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import DailyLog, IngestionJob
+from app.services.llm_service import llm_service
+from app.services.ingestion_pipeline import (
+    apply_structured_data,
+    materialize_structured_data, embed_new_concepts,
+    generate_log_embedding, upsert_log_embedding
+)
+from app.services.lexical_search import index_log_text
+from app.services.summary_engine import invalidate_summaries
+
+JOB_STAGES = ["persist", "extraction", "normalization", "embedding", "vector_upsert"]
+
+
+def initial_stages() -> Dict[str, str]:
+    """Stage map for a job whose raw log has just been persisted"""
+    stages = {stage: "pending" for stage in JOB_STAGES}
+    stages["persist"] = "completed"
+    return stages
+
+
+class IngestionWorkerPool:
+    """
+    Queue of job ids consumed by a fixed number of asyncio workers
+    
+    The queue is only a hint: a worker runs a job after claiming it in the
+    database (queued, or running with an expired lease), and refreshes the
+    job's heartbeat while it works. Any number of processes can share the
+    jobs table; a periodic sweep picks up jobs that were never queued here
+    (queue full, other process died).
+    """
+    
+    def __init__(self, num_workers: int, max_queue_size: int,
+                 lease_seconds: float, sweep_interval_seconds: float):
+        self.num_workers = num_workers
+        self.lease_seconds = lease_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.pending: Set[uuid.UUID] = set()
+        self.workers: List[asyncio.Task] = []
+        self.sweeper: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start workers and pick up queued jobs and jobs whose worker died"""
+        self.workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.num_workers)
+        ]
+        await self.sweep()
+        if self.sweep_interval_seconds > 0:
+            self.sweeper = asyncio.create_task(self._sweep_periodically())
+    
+    async def stop(self):
+        """Cancel workers; unfinished jobs are resumed once their lease expires"""
+        tasks = self.workers + ([self.sweeper] if self.sweeper else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.sweeper = None
+    
+    def enqueue(self, job_id: uuid.UUID) -> bool:
+        """
+        Queue a job without blocking
+        Returns False if the queue is full; the job stays queued in the
+        database and is picked up by a later sweep
+        """
+        if job_id in self.pending:
+            return True
+        try:
+            self.queue.put_nowait(job_id)
+        except asyncio.QueueFull:
+            return False
+        self.pending.add(job_id)
+        return True
+    
+    def _stale_before(self):
+        return func.now() - timedelta(seconds=self.lease_seconds)
+    
+    def _claimable(self):
+        """Jobs nobody is working on: queued, or running with an expired lease"""
+        return or_(
+            IngestionJob.status == "queued",
+            and_(
+                IngestionJob.status == "running",
+                or_(
+                    IngestionJob.heartbeat_at.is_(None),
+                    IngestionJob.heartbeat_at < self._stale_before()
+                )
+            )
+        )
+    
+    async def sweep(self) -> int:
+        """Queue claimable jobs from the database, as many as fit; returns how many"""
+        free = self.queue.maxsize - self.queue.qsize() if self.queue.maxsize > 0 else 1000
+        if free <= 0:
+            return 0
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJob.id)
+                .where(self._claimable())
+                .order_by(IngestionJob.created_at)
+                .limit(free + len(self.pending))
+            )
+            job_ids = [job_id for job_id in result.scalars().all() if job_id not in self.pending]
+        queued = 0
+        for job_id in job_ids:
+            if not self.enqueue(job_id):
+                break
+            queued += 1
+        return queued
+    
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                queued = await self.sweep()
+                if queued:
+                    print(f"🔁 Picked up {queued} ingestion job(s)")
+            except Exception as e:
+                print(f"⚠️ Ingestion job sweep failed: {e}")
+    
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"⚠️ Ingestion worker {index} crashed on job {job_id}: {e}")
+            finally:
+                self.pending.discard(job_id)
+                self.queue.task_done()
+    
+    async def _claim(self, db, job_id: uuid.UUID) -> bool:
+        """Atomically mark the job running under this worker's lease"""
+        result = await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, self._claimable())
+            .values(status="running", heartbeat_at=func.now())
+            .returning(IngestionJob.id)
+        )
+        claimed = result.scalar_one_or_none() is not None
+        await db.commit()
+        return claimed
+    
+    async def _heartbeat(self, job_id: uuid.UUID):
+        """Keep the lease fresh while the job runs (own session; the job's is busy)"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(IngestionJob)
+                        .where(IngestionJob.id == job_id, IngestionJob.status == "running")
+                        .values(heartbeat_at=func.now())
+                    )
+                    await db.commit()
+            except Exception as e:
+                print(f"⚠️ Heartbeat for ingestion job {job_id} failed: {e}")
+    
+    async def _set_stage(self, db, job: IngestionJob, stage: str, state: str):
+        # Reassign so SQLAlchemy notices the JSONB change
+        job.stages = {**job.stages, stage: state}
+        await db.commit()
+    
+    async def _run_job(self, job_id: uuid.UUID):
+        async with AsyncSessionLocal() as db:
+            if not await self._claim(db, job_id):
+                return  # Finished, or another worker holds the lease
+            job = await db.get(IngestionJob, job_id)
+            log = await db.get(DailyLog, job.log_id)
+            if log is None:
+                job.status = "failed"
+                job.error = "Daily log no longer exists"
+                await db.commit()
+                return
+            
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                await self._run_stages(db, job, log)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+    
+    async def _run_stages(self, db, job: IngestionJob, log: DailyLog):
+        job_id = job.id
+        current: Optional[str] = None
+        try:
+            current = "extraction"
+            if job.stages.get(current) != "completed":
+                await self._set_stage(db, job, current, "running")
+                # Unlike inline ingestion, an LLM outage fails the stage so the job can be retried
+                print("🤖 Extracting structured data from log...")
+                structured_data = await llm_service.aextract_structured_data(log.raw_text)
+                apply_structured_data(log, structured_data)
+                await invalidate_summaries(db, log.user_id, [log.log_date])
+                await self._set_stage(db, job, current, "completed")
+            index_log_text(log)
+            
+            current = "normalization"
+            if job.stages.get(current) != "completed":
+                await self._set_stage(db, job, current, "running")
+                new_concepts = await materialize_structured_data(db, [log])
+                await self._set_stage(db, job, current, "completed")
+                try:
+                    await embed_new_concepts(new_concepts)
+                except Exception as e:
+                    print(f"⚠️ Failed to store concept embeddings: {e}")
+            
+            current = "embedding"
+            await self._set_stage(db, job, current, "running")
+            embedding = await generate_log_embedding(log.raw_text)
+            await self._set_stage(db, job, current, "completed")
+            
+            current = "vector_upsert"
+            await self._set_stage(db, job, current, "running")
+            await upsert_log_embedding(log, embedding)
+            await self._set_stage(db, job, current, "completed")
+            
+            job.status = "completed"
+            await db.commit()
+            print(f"✅ Ingestion job {job_id} completed")
+        except Exception as e:
+            print(f"⚠️ Ingestion job {job_id} failed at {current}: {e}")
+            await db.rollback()
+            await db.refresh(job)
+            job.stages = {**job.stages, current: "failed"}
+            job.status = "failed"
+            job.error = f"{current}: {e}"
+            await db.commit()
+
+
+# Global instance
+ingestion_workers = IngestionWorkerPool(
+    settings.ingestion_workers,
+    settings.ingestion_queue_size,
+    settings.ingestion_job_lease_seconds,
+    settings.ingestion_sweep_interval_seconds
+)
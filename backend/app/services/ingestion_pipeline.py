@@ -0,0 +1,325 @@
+"""
+Ingestion Pipeline
+Processing stages shared by inline and background daily log ingestion
+"""
+from sqlalchemy import select, delete, func, literal_column, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date
+import asyncio
+import uuid
+
+from app.models import DailyLog, Activity, Assignment, Concept, LogConcept
+from app.services.llm_service import llm_service
+from app.services.lexical_search import index_concept_text
+from app.services.concept_canonicalizer import normalize_concept_name, canonicalize_concept_names
+from app.services.mastery import update_mastery
+from app.services.analytics_rollups import refresh_rollups
+from app.core.embeddings import embedding_generator, embedding_batcher, concept_embedding_cache
+from app.core.vector_store import async_vector_store
+from app.core.vector_store_base import content_hash
+
+
+async def extract_log_data(raw_text: str, fallback: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Extract structured data, falling back to `fallback` (or {}) on failure"""
+    print(f"🤖 Extracting structured data from log...")
+    try:
+        return await llm_service.aextract_structured_data(raw_text)
+    except Exception as e:
+        print(f"⚠️ LLM extraction failed: {e}")
+        return fallback if fallback is not None else {}
+
+
+async def extract_log_data_batch(raw_texts: List[str]) -> List[Dict[str, Any]]:
+    """Extract structured data for a group of logs, {} for each on failure"""
+    try:
+        return await llm_service.aextract_structured_data_batch(raw_texts)
+    except Exception as e:
+        print(f"⚠️ Batch LLM extraction failed: {e}")
+        return [{} for _ in raw_texts]
+
+
+def apply_structured_data(log: DailyLog, structured_data: Dict[str, Any]):
+    """Copy extraction results onto the log row"""
+    log.structured_data = structured_data
+    log.mood = structured_data.get("mood")
+    log.difficulty_level = structured_data.get("difficulty_level")
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _apply_canonical_names(
+    db: AsyncSession,
+    concept_rows: Dict[Tuple[uuid.UUID, str], Dict[str, Any]],
+    mentions: List[Tuple[DailyLog, str]]
+) -> List[Tuple[DailyLog, str]]:
+    """
+    Fold concept names the user has never used into their canonical concept
+    Rewrites `concept_rows` in place and returns `mentions` re-keyed to match
+    """
+    result = await db.execute(
+        select(Concept.user_id, Concept.normalized_name).where(
+            tuple_(Concept.user_id, Concept.normalized_name).in_(list(concept_rows))
+        )
+    )
+    known = {tuple(row) for row in result.all()}
+    
+    unseen: Dict[uuid.UUID, Dict[str, str]] = {}
+    for (user_id, key), row in concept_rows.items():
+        if (user_id, key) not in known:
+            unseen.setdefault(user_id, {})[key] = row["name"]
+    
+    aliases: Dict[Tuple[uuid.UUID, str], str] = {}
+    for user_id, names in unseen.items():
+        mapping = await canonicalize_concept_names(user_id, names)
+        for key, (canonical_key, canonical_name) in mapping.items():
+            if canonical_key == key:
+                continue
+            aliases[(user_id, key)] = canonical_key
+            row = concept_rows.pop((user_id, key))
+            target = concept_rows.setdefault((user_id, canonical_key), {
+                **row, "id": uuid.uuid4(), "name": canonical_name, "normalized_name": canonical_key
+            })
+            target["first_learned_date"] = min(target["first_learned_date"], row["first_learned_date"])
+            target["last_reviewed_date"] = max(target["last_reviewed_date"], row["last_reviewed_date"])
+    
+    return [(log, aliases.get((log.user_id, key), key)) for log, key in mentions]
+
+
+async def materialize_structured_data(db: AsyncSession, logs: List[DailyLog]) -> List[Concept]:
+    """
+    Normalize extraction results into Concept, Activity, Assignment and LogConcept rows
+    
+    One bulk statement per table for the whole batch: concepts are upserted on
+    (user, normalized name); a log's activities, concept links and still-pending
+    assignments are replaced, so re-extraction is idempotent. Mastery of every
+    concept gaining or losing a link is then recomputed, followed by the
+    analytics rollups of the affected periods. Returns the concepts this call
+    created (not yet embedded).
+    """
+    if not logs:
+        return []
+    await db.flush()
+    log_ids = [log.id for log in logs]
+    
+    # Concepts: one upsert, reporting which rows were newly inserted
+    concept_rows: Dict[Tuple[uuid.UUID, str], Dict[str, Any]] = {}
+    mentions: List[Tuple[DailyLog, str]] = []
+    for log in logs:
+        for name in (log.structured_data or {}).get("concepts") or []:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            key = normalize_concept_name(name)
+            row = concept_rows.setdefault((log.user_id, key), {
+                "id": uuid.uuid4(),
+                "user_id": log.user_id,
+                "name": name.strip()[:255],
+                "normalized_name": key,
+                "first_learned_date": log.log_date,
+                "last_reviewed_date": log.log_date
+            })
+            row["first_learned_date"] = min(row["first_learned_date"], log.log_date)
+            row["last_reviewed_date"] = max(row["last_reviewed_date"], log.log_date)
+            mentions.append((log, key))
+    
+    if concept_rows:
+        mentions = await _apply_canonical_names(db, concept_rows, mentions)
+    
+    concept_ids: Dict[Tuple[uuid.UUID, str], uuid.UUID] = {}
+    new_concepts: List[Concept] = []
+    if concept_rows:
+        stmt = insert(Concept).values(list(concept_rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_concept_user_normalized_name",
+            set_={
+                "first_learned_date": func.least(Concept.first_learned_date, stmt.excluded.first_learned_date),
+                "last_reviewed_date": func.greatest(Concept.last_reviewed_date, stmt.excluded.last_reviewed_date)
+            }
+        ).returning(
+            Concept.id, Concept.user_id, Concept.name, Concept.normalized_name,
+            literal_column("xmax = 0").label("inserted")
+        )
+        result = await db.execute(stmt)
+        for row in result.all():
+            concept_ids[(row.user_id, row.normalized_name)] = row.id
+            if row.inserted:
+                new_concepts.append(Concept(
+                    id=row.id, user_id=row.user_id, name=row.name, normalized_name=row.normalized_name
+                ))
+    
+    # Log-concept links
+    unlinked = await db.execute(
+        delete(LogConcept).where(LogConcept.log_id.in_(log_ids)).returning(LogConcept.concept_id)
+    )
+    touched_concepts = set(unlinked.scalars().all())
+    links = {(log.id, concept_ids[(log.user_id, key)]) for log, key in mentions}
+    touched_concepts.update(concept_id for _, concept_id in links)
+    if links:
+        await db.execute(
+            insert(LogConcept).values([
+                {"log_id": log_id, "concept_id": concept_id} for log_id, concept_id in links
+            ]).on_conflict_do_nothing()
+        )
+    
+    # Activities
+    await db.execute(delete(Activity).where(Activity.log_id.in_(log_ids)))
+    activity_rows = [
+        {
+            "id": uuid.uuid4(),
+            "log_id": log.id,
+            "activity_type": str(activity["type"])[:50] if activity.get("type") else None,
+            "description": activity["description"],
+            "duration_minutes": _parse_int(activity.get("duration_minutes"))
+        }
+        for log in logs
+        for activity in (log.structured_data or {}).get("activities") or []
+        if isinstance(activity, dict) and activity.get("description")
+    ]
+    if activity_rows:
+        await db.execute(insert(Activity).values(activity_rows))
+    
+    # Assignments: keep ones the user has progressed, refresh the rest
+    await db.execute(
+        delete(Assignment).where(
+            Assignment.log_id.in_(log_ids),
+            Assignment.status == "pending"
+        )
+    )
+    assignment_rows: Dict[Tuple[uuid.UUID, str], Dict[str, Any]] = {}
+    for log in logs:
+        for assignment in (log.structured_data or {}).get("assignments") or []:
+            if not isinstance(assignment, dict) or not assignment.get("title"):
+                continue
+            title = str(assignment["title"]).strip()[:255]
+            assignment_rows[(log.id, title)] = {
+                "id": uuid.uuid4(),
+                "log_id": log.id,
+                "title": title,
+                "description": assignment.get("description"),
+                "assigned_date": log.log_date,
+                "due_date": _parse_date(assignment.get("due_date"))
+            }
+    if assignment_rows:
+        stmt = insert(Assignment).values(list(assignment_rows.values()))
+        await db.execute(stmt.on_conflict_do_update(
+            constraint="uq_assignment_log_title",
+            set_={"description": stmt.excluded.description, "due_date": stmt.excluded.due_date}
+        ))
+    
+    await update_mastery(db, touched_concepts)
+    
+    # Rollups: the logs' own periods, plus wherever a touched concept's first date now falls
+    rollup_dates: Dict[uuid.UUID, set] = {}
+    for log in logs:
+        rollup_dates.setdefault(log.user_id, set()).add(log.log_date)
+    if touched_concepts:
+        result = await db.execute(
+            select(Concept.user_id, Concept.first_learned_date).where(
+                Concept.id.in_(touched_concepts),
+                Concept.first_learned_date.isnot(None)
+            )
+        )
+        for user_id, first_date in result.all():
+            rollup_dates.setdefault(user_id, set()).add(first_date)
+    for user_id, dates in rollup_dates.items():
+        await refresh_rollups(db, user_id, dates)
+    
+    return new_concepts
+
+
+async def embed_new_concepts(concepts: List[Concept]):
+    """Batch-embed newly created concepts into the concept collection and lexical index"""
+    if not concepts:
+        return
+    for concept in concepts:
+        index_concept_text(concept)
+    
+    # Names were just embedded for canonicalization, so these are cache hits
+    embeddings = await asyncio.gather(*(
+        concept_embedding_cache.embed(concept.name) for concept in concepts
+    ))
+    await async_vector_store.add_concept_embeddings([
+        {
+            "concept_id": str(concept.id),
+            "embedding": embedding,
+            "name": concept.name,
+            "definition": concept.definition,
+            "category": concept.category,
+            "user_id": str(concept.user_id)
+        }
+        for concept, embedding in zip(concepts, embeddings)
+    ])
+
+
+async def generate_log_embedding(raw_text: str) -> List[float]:
+    """Embed log text via the micro-batcher, off the event loop"""
+    return await embedding_batcher.embed(raw_text)
+
+
+async def generate_log_embeddings(raw_texts: List[str]) -> List[List[float]]:
+    """Embed many log texts with one model call off the event loop"""
+    if not raw_texts:
+        return []
+    return await asyncio.to_thread(embedding_generator.generate, raw_texts)
+
+
+async def upsert_log_embedding(log: DailyLog, embedding: List[float]):
+    """Store the log vector in Qdrant"""
+    structured_data = log.structured_data or {}
+    await async_vector_store.add_log_embedding(
+        log_id=str(log.id),
+        embedding=embedding,
+        log_date=str(log.log_date),
+        summary=log.raw_text[:200],  # First 200 chars as summary
+        concepts=structured_data.get("concepts", []),
+        content_hash=content_hash(log.raw_text),
+        user_id=str(log.user_id)
+    )
+
+
+async def refresh_log_embedding(log: DailyLog) -> bool:
+    """
+    Re-embed and upsert a log only if its text changed since it was embedded
+    Returns True if a new vector was written
+    """
+    new_hash = content_hash(log.raw_text)
+    stored_hash = await async_vector_store.get_log_content_hash(str(log.id))
+    if stored_hash == new_hash:
+        return False
+    
+    embedding = await generate_log_embedding(log.raw_text)
+    await upsert_log_embedding(log, embedding)
+    if stored_hash is None:
+        # Logs embedded before ids were deterministic may have duplicate points
+        await async_vector_store.delete_stale_log_points(str(log.id))
+    return True
+
+
+async def upsert_log_embeddings(logs: List[DailyLog], embeddings: List[List[float]]):
+    """Store many log vectors in Qdrant with one multi-point upsert"""
+    items = [
+        {
+            "log_id": str(log.id),
+            "embedding": embedding,
+            "log_date": str(log.log_date),
+            "summary": log.raw_text[:200],
+            "concepts": (log.structured_data or {}).get("concepts", []),
+            "content_hash": content_hash(log.raw_text),
+            "user_id": str(log.user_id)
+        }
+        for log, embedding in zip(logs, embeddings)
+    ]
+    await async_vector_store.add_log_embeddings(items)
@@ -0,0 +1,202 @@
+"""
+Lexical Search Service
+Keep the BM25 index in sync with the database (including other workers'
+writes) and fuse lexical and vector rankings for hybrid search
+"""
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import time
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import DailyLog, Concept
+from app.core.lexical_index import LexicalSearchIndex, lexical_index, reciprocal_rank_fusion
+from app.core.vector_store import async_vector_store
+
+
+def index_log_text(log: DailyLog, index: LexicalSearchIndex = lexical_index):
+    """Add or refresh a log in the lexical index"""
+    index.index_log(
+        log_id=str(log.id),
+        user_id=str(log.user_id),
+        log_date=str(log.log_date),
+        raw_text=log.raw_text,
+        concepts=(log.structured_data or {}).get("concepts", [])
+    )
+
+
+def index_concept_text(concept: Concept, index: LexicalSearchIndex = lexical_index):
+    """Add or refresh a concept in the lexical index"""
+    index.index_concept(
+        concept_id=str(concept.id),
+        user_id=str(concept.user_id),
+        name=concept.name,
+        definition=concept.definition,
+        category=concept.category
+    )
+
+
+async def _index_logs(db: AsyncSession, index: LexicalSearchIndex, since: Optional[datetime] = None):
+    query = select(DailyLog.id, DailyLog.user_id, DailyLog.log_date,
+                   DailyLog.raw_text, DailyLog.structured_data)
+    if since is not None:
+        query = query.where(DailyLog.updated_at >= since)
+    async for log in await db.stream(query):
+        index_log_text(log, index)
+
+
+async def _index_concepts(db: AsyncSession, index: LexicalSearchIndex, since: Optional[datetime] = None):
+    query = select(Concept.id, Concept.user_id, Concept.name,
+                   Concept.definition, Concept.category)
+    if since is not None:
+        query = query.where(Concept.created_at >= since)
+    async for concept in await db.stream(query):
+        index_concept_text(concept, index)
+
+
+async def _watermark(db: AsyncSession, column) -> Tuple[int, Optional[datetime]]:
+    """(row count, latest timestamp) of the column's table"""
+    result = await db.execute(select(func.count(), func.max(column)).select_from(column.table))
+    return tuple(result.one())
+
+
+async def rebuild_lexical_index():
+    """Load every log and concept into a fresh index and swap it in"""
+    fresh = LexicalSearchIndex()
+    async with AsyncSessionLocal() as db:
+        await _index_logs(db, fresh)
+        await _index_concepts(db, fresh)
+    lexical_index.replace(fresh)
+
+
+class LexicalIndexRefresher:
+    """
+    Keep this worker's in-memory index in step with writes made by other workers
+    
+    Every interval the (row count, max timestamp) watermark of daily_logs
+    (updated_at) and concepts (created_at) is compared with the last one seen;
+    rows stamped since then are re-indexed in place. If the index and table
+    sizes still disagree (deletes, concept merges) the index is rebuilt, and it
+    is rebuilt unconditionally every `full_rebuild_seconds` to catch edits the
+    watermark cannot see, which bounds staleness for every kind of change
+    """
+    
+    # now() is the transaction start time, so rows can commit stamped a little in the past
+    LATE_COMMIT_SLACK = timedelta(seconds=60)
+    
+    def __init__(self, interval_seconds: float, full_rebuild_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.full_rebuild_seconds = full_rebuild_seconds
+        self.marks: Dict[str, Tuple[int, Optional[datetime]]] = {}
+        self.rebuilt_at = 0.0
+        self.task: Optional[asyncio.Task] = None
+    
+    async def rebuild(self):
+        """Full reload; the watermark is read first so concurrent writes are re-checked"""
+        async with AsyncSessionLocal() as db:
+            self.marks["logs"] = await _watermark(db, DailyLog.updated_at)
+            self.marks["concepts"] = await _watermark(db, Concept.created_at)
+        await rebuild_lexical_index()
+        self.rebuilt_at = time.monotonic()
+    
+    async def refresh(self):
+        """Apply changes since the last poll; returns after a rebuild if one was needed"""
+        if time.monotonic() - self.rebuilt_at >= self.full_rebuild_seconds:
+            await self.rebuild()
+            return
+        
+        async with AsyncSessionLocal() as db:
+            tables = (
+                ("logs", DailyLog.updated_at, _index_logs, lexical_index.logs),
+                ("concepts", Concept.created_at, _index_concepts, lexical_index.concepts),
+            )
+            for name, column, load, bm25 in tables:
+                mark = await _watermark(db, column)
+                previous = self.marks.get(name)
+                if mark == previous:
+                    continue
+                since = previous[1] - self.LATE_COMMIT_SLACK if previous and previous[1] else None
+                await load(db, lexical_index, since)
+                self.marks[name] = mark
+                if len(bm25) != mark[0]:
+                    print(f"🔄 Lexical {name} index out of step ({len(bm25)} vs {mark[0]} rows), rebuilding")
+                    await self.rebuild()
+                    return
+    
+    def start(self):
+        """Start polling (disabled when the interval is 0)"""
+        if self.interval_seconds > 0:
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ Lexical index refresh failed: {e}")
+
+
+async def hybrid_search(query: str, query_embedding: List[float], search_type: str,
+                        limit: int, user_id: str, start_date: Optional[str] = None,
+                        end_date: Optional[str] = None, concepts: Optional[List[str]] = None,
+                        category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Fuse a small vector top-k with a BM25 top-k using reciprocal rank fusion
+    Each result carries the fused score plus its vector and lexical scores
+    (None when it was found by only one side)
+    """
+    lexical_limit = max(limit, settings.hybrid_lexical_candidates)
+    if search_type == "concepts":
+        key = "concept_id"
+        vector_hits = await async_vector_store.search_similar_concepts(
+            query_embedding, limit=limit, user_id=user_id, category=category, concepts=concepts
+        )
+        lexical_hits = lexical_index.search_concepts(
+            query, lexical_limit, user_id=user_id, category=category, concepts=concepts
+        )
+    else:
+        key = "log_id"
+        vector_hits = await async_vector_store.search_similar_logs(
+            query_embedding, limit=limit, user_id=user_id,
+            start_date=start_date, end_date=end_date, concepts=concepts
+        )
+        lexical_hits = lexical_index.search_logs(
+            query, lexical_limit, user_id=user_id,
+            start_date=start_date, end_date=end_date, concepts=concepts
+        )
+    
+    vector_by_id = {hit[key]: hit for hit in vector_hits}
+    lexical_by_id = {hit[key]: hit for hit in lexical_hits}
+    fused = reciprocal_rank_fusion(
+        [[hit[key] for hit in vector_hits], [hit[key] for hit in lexical_hits]],
+        k=settings.hybrid_rrf_k
+    )
+    
+    results = []
+    for item_id, score in sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        vector_hit = vector_by_id.get(item_id)
+        lexical_hit = lexical_by_id.get(item_id)
+        results.append({
+            **(vector_hit or lexical_hit),
+            "score": score,
+            "vector_score": vector_hit["score"] if vector_hit else None,
+            "lexical_score": lexical_hit["score"] if lexical_hit else None
+        })
+    return results
+
+
+# Global instance
+lexical_refresher = LexicalIndexRefresher(
+    settings.lexical_refresh_interval_seconds,
+    settings.lexical_full_rebuild_seconds
+)
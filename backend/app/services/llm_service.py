@@ -3,12 +3,84 @@ LLM Service - Gemini Integration with Fallback
 Handle all LLM interactions with automatic failover
 """
 import google.generativeai as genai
-from openai import OpenAI
-from anthropic import Anthropic
-from typing import Dict, Any, Optional, List
+from openai import OpenAI, AsyncOpenAI
+from anthropic import Anthropic, AsyncAnthropic
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, AsyncIterator
+import asyncio
+import httpx
 import json
+import time
 
 from app.config import settings
+from app.services.extraction_cache import extraction_cache
+from app.core.context_packer import ContextPacker, compact_json, strip_redundant
+
+# Bump when the extraction prompt or primary model changes to invalidate cached results
+EXTRACTION_PROMPT_VERSION = "1"
+# Bump when the diary report prompts change to invalidate cached reports
+REPORT_PROMPT_VERSION = "1"
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+
+# Entry lists a summary request may carry (raw logs or intermediate summaries)
+SUMMARY_ENTRY_KEYS = ("logs", "daily_summaries", "weekly_summaries", "monthly_summaries")
+# Guidance only needs the strongest concepts' mastery levels
+GUIDANCE_MAX_MASTERY_ENTRIES = 25
+
+EXTRACTION_SCHEMA = """{
+  "concepts": ["concept1", "concept2", ...],
+  "activities": [
+    {"type": "coding/debugging/learning/meeting", "description": "...", "duration_minutes": 60}
+  ],
+  "assignments": [
+    {"title": "...", "description": "...", "due_date": "YYYY-MM-DD or null"}
+  ],
+  "mood": "positive/neutral/negative/frustrated/excited",
+  "difficulty_level": "easy/medium/hard",
+  "key_learnings": ["learning1", "learning2", ...]
+}"""
+
+
+class CircuitBreaker:
+    """Skip a provider for a cooldown period after repeated failures"""
+    
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+    
+    def allow(self) -> bool:
+        """Closed, or open long enough with no half-open trial call already in flight"""
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.cooldown_seconds:
+            return False
+        # A trial that never reported back (e.g. a cancelled hedge) frees the slot after another cooldown
+        return self.trial_started_at is None or now - self.trial_started_at >= self.cooldown_seconds
+    
+    def try_acquire(self) -> bool:
+        """allow(), claiming the single trial slot when half-open"""
+        if not self.allow():
+            return False
+        if self.opened_at is not None:
+            self.trial_started_at = time.monotonic()
+        return True
+    
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+    
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.trial_started_at = None
+        if self.consecutive_failures >= self.failure_threshold:
+            # (Re)open: a failed half-open trial restarts the cooldown
+            self.opened_at = time.monotonic()
 
 
 class LLMService:
@@ -17,11 +89,96 @@ class LLMService:
     def __init__(self):
         # Configure Gemini (primary)
         genai.configure(api_key=settings.gemini_api_key)
-        self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+        self.gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
         
         # Configure fallbacks
         self.openai_client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
         self.claude_client = Anthropic(api_key=settings.claude_api_key) if settings.claude_api_key else None
+        
+        # Async clients share one keep-alive connection pool
+        self.http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections
+            )
+        )
+        self.async_openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=self.http_client
+        ) if settings.openai_api_key else None
+        self.async_claude_client = AsyncAnthropic(
+            api_key=settings.claude_api_key,
+            http_client=self.http_client
+        ) if settings.claude_api_key else None
+        
+        # Per-provider deadlines, circuit breakers and latency history (for hedging)
+        self.provider_order = ["gemini", "openai", "claude"]
+        self.provider_timeouts = {
+            "gemini": settings.llm_timeout_gemini,
+            "openai": settings.llm_timeout_openai,
+            "claude": settings.llm_timeout_claude,
+        }
+        self.breakers = {
+            name: CircuitBreaker(
+                settings.llm_breaker_failure_threshold,
+                settings.llm_breaker_cooldown_seconds
+            )
+            for name in self.provider_order
+        }
+        self.latencies = {name: deque(maxlen=200) for name in self.provider_order}
+        self._executor = ThreadPoolExecutor(max_workers=settings.llm_sync_workers)
+        
+        # Token-budgeted prompt context
+        self.summary_packer = ContextPacker(settings.context_budget_summary_tokens)
+        self.guidance_packer = ContextPacker(settings.context_budget_guidance_tokens)
+    
+    async def aclose(self):
+        """Close shared HTTP connections"""
+        await self.http_client.aclose()
+        self._executor.shutdown(wait=False)
+    
+    def _is_configured(self, provider: str) -> bool:
+        if provider == "openai":
+            return self.openai_client is not None
+        if provider == "claude":
+            return self.claude_client is not None
+        return True
+    
+    def _available_providers(self) -> List[str]:
+        """Configured providers whose circuit breaker currently allows calls"""
+        providers = [
+            name for name in self.provider_order
+            if self._is_configured(name) and self.breakers[name].allow()
+        ]
+        if not providers:
+            # Every breaker is open: try everything rather than fail without a call
+            providers = [name for name in self.provider_order if self._is_configured(name)]
+        return providers
+    
+    def _acquire(self, provider: str) -> bool:
+        """
+        Claim a call on the provider's breaker right before making it
+        While half-open only one trial call passes; when no breaker allows
+        calls at all, everything is tried (as in _available_providers)
+        """
+        if self.breakers[provider].try_acquire():
+            return True
+        return not any(
+            self.breakers[name].allow() for name in self.provider_order if self._is_configured(name)
+        )
+    
+    def _record_latency(self, provider: str, seconds: float):
+        self.latencies[provider].append(seconds)
+        self.breakers[provider].record_success()
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """Latency percentile after which a hedged request is started"""
+        samples = sorted(self.latencies[provider])
+        if len(samples) < settings.llm_hedge_min_samples:
+            return settings.llm_hedge_default_delay
+        index = min(int(len(samples) * settings.llm_hedge_percentile), len(samples) - 1)
+        return samples[index]
     
     def _call_gemini(self, prompt: str, temperature: float = 0.7) -> str:
         """Call Gemini API"""
@@ -58,50 +215,284 @@ class LLMService:
         )
         return response.content[0].text
     
+    async def _acall_gemini(self, prompt: str, temperature: float = 0.7) -> str:
+        """Call Gemini API asynchronously"""
+        response = await self.gemini_model.generate_content_async(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=temperature,
+            )
+        )
+        return response.text
+    
+    async def _acall_openai(self, prompt: str, temperature: float = 0.7) -> str:
+        """Call OpenAI API asynchronously as fallback"""
+        if not self.async_openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        response = await self.async_openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature
+        )
+        return response.choices[0].message.content
+    
+    async def _acall_claude(self, prompt: str, temperature: float = 0.7) -> str:
+        """Call Claude API asynchronously as fallback"""
+        if not self.async_claude_client:
+            raise Exception("Claude API key not configured")
+        
+        response = await self.async_claude_client.messages.create(
+            model="claude-3-opus-20240229",
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature
+        )
+        return response.content[0].text
+    
+    async def _astream_gemini(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream Gemini output chunks"""
+        response = await self.gemini_model.generate_content_async(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=temperature,
+            ),
+            stream=True
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+    
+    async def _astream_openai(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream OpenAI output chunks as fallback"""
+        if not self.async_openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        stream = await self.async_openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def _astream_claude(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream Claude output chunks as fallback"""
+        if not self.async_claude_client:
+            raise Exception("Claude API key not configured")
+        
+        async with self.async_claude_client.messages.stream(
+            model="claude-3-opus-20240229",
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+    
     def generate(self, prompt: str, temperature: float = 0.7) -> str:
         """
         Generate text with automatic fallback
-        Tries: Gemini → OpenAI → Claude
+        Tries: Gemini → OpenAI → Claude, each bounded by its deadline
+        and skipped while its circuit breaker is open
         """
-        try:
-            return self._call_gemini(prompt, temperature)
-        except Exception as e:
-            print(f"⚠️ Gemini failed: {e}. Trying OpenAI...")
+        return self._generate(prompt, temperature)[1]
+    
+    def _generate(self, prompt: str, temperature: float) -> Tuple[str, str]:
+        """`generate`, also returning which provider answered"""
+        calls = {
+            "gemini": self._call_gemini,
+            "openai": self._call_openai,
+            "claude": self._call_claude,
+        }
+        errors = []
+        for provider in self._available_providers():
+            if not self._acquire(provider):
+                errors.append(f"{provider}: circuit half-open, trial call in flight")
+                continue
+            started = time.monotonic()
+            future = self._executor.submit(calls[provider], prompt, temperature)
             try:
-                return self._call_openai(prompt, temperature)
-            except Exception as e2:
-                print(f"⚠️ OpenAI failed: {e2}. Trying Claude...")
-                return self._call_claude(prompt, temperature)
+                result = future.result(timeout=self.provider_timeouts[provider])
+            except FutureTimeoutError:
+                # The worker thread finishes in the background; we stop waiting
+                self.breakers[provider].record_failure()
+                errors.append(f"{provider}: timed out after {self.provider_timeouts[provider]}s")
+                print(f"⚠️ {provider} timed out. Trying next provider...")
+                continue
+            except Exception as e:
+                self.breakers[provider].record_failure()
+                errors.append(f"{provider}: {e}")
+                print(f"⚠️ {provider} failed: {e}. Trying next provider...")
+                continue
+            self._record_latency(provider, time.monotonic() - started)
+            return provider, result
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
     
-    def extract_structured_data(self, raw_text: str) -> Dict[str, Any]:
+    async def _attempt(self, provider: str, call: Callable[[str, float], Awaitable[str]],
+                       prompt: str, temperature: float) -> str:
+        """Run one provider call under its deadline, updating breaker and latency stats"""
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                call(prompt, temperature),
+                timeout=self.provider_timeouts[provider]
+            )
+        except asyncio.CancelledError:
+            # Lost a hedge race - not the provider's fault
+            raise
+        except asyncio.TimeoutError:
+            self.breakers[provider].record_failure()
+            raise Exception(f"{provider} timed out after {self.provider_timeouts[provider]}s")
+        except Exception:
+            self.breakers[provider].record_failure()
+            raise
+        self._record_latency(provider, time.monotonic() - started)
+        return result
+    
+    async def agenerate(self, prompt: str, temperature: float = 0.7) -> str:
         """
-        Extract structured data from daily log text
-        Returns: concepts, activities, assignments, mood, difficulty
+        Generate text asynchronously with automatic fallback
+        Tries: Gemini → OpenAI → Claude, each bounded by its deadline.
+        With hedging enabled, the next provider is started once the running
+        one exceeds its latency percentile; the first answer wins.
         """
-        prompt = f"""Extract structured information from this internship daily log:
+        return (await self._agenerate(prompt, temperature))[1]
+    
+    async def _agenerate(self, prompt: str, temperature: float) -> Tuple[str, str]:
+        """`agenerate`, also returning which provider answered"""
+        calls = {
+            "gemini": self._acall_gemini,
+            "openai": self._acall_openai,
+            "claude": self._acall_claude,
+        }
+        remaining = deque(self._available_providers())
+        pending: Dict[asyncio.Task, str] = {}
+        errors = []
+        
+        def launch() -> Optional[str]:
+            while remaining:
+                provider = remaining.popleft()
+                if not self._acquire(provider):
+                    errors.append(f"{provider}: circuit half-open, trial call in flight")
+                    continue
+                task = asyncio.create_task(self._attempt(provider, calls[provider], prompt, temperature))
+                pending[task] = provider
+                return provider
+            return None
+        
+        latest = launch()
+        try:
+            while pending:
+                timeout = None
+                if settings.llm_hedge_enabled and remaining:
+                    timeout = self._hedge_delay(latest)
+                
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    print(f"⏱️ {latest} slower than hedge threshold. Hedging...")
+                    latest = launch() or latest
+                    continue
+                
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        return provider, task.result()
+                    errors.append(f"{provider}: {task.exception()}")
+                    print(f"⚠️ {provider} failed: {task.exception()}")
+                    if remaining:
+                        latest = launch() or latest
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    async def astream(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """
+        Stream generated text with automatic fallback
+        Tries: Gemini → OpenAI → Claude. A provider that errors or produces no
+        token within the first-token deadline is abandoned for the next one;
+        once tokens have been forwarded the stream is committed to that provider.
+        """
+        streams = {
+            "gemini": self._astream_gemini,
+            "openai": self._astream_openai,
+            "claude": self._astream_claude,
+        }
+        errors = []
+        for provider in self._available_providers():
+            if not self._acquire(provider):
+                errors.append(f"{provider}: circuit half-open, trial call in flight")
+                continue
+            chunks = streams[provider](prompt, temperature)
+            try:
+                first = await asyncio.wait_for(
+                    chunks.__anext__(), timeout=settings.llm_stream_first_token_timeout
+                )
+            except (Exception, asyncio.TimeoutError) as e:
+                await chunks.aclose()
+                self.breakers[provider].record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    e = f"no token after {settings.llm_stream_first_token_timeout}s"
+                elif isinstance(e, StopAsyncIteration):
+                    e = "empty response"
+                errors.append(f"{provider}: {e}")
+                print(f"⚠️ {provider} stream failed: {e}. Trying next provider...")
+                continue
+            
+            self.breakers[provider].record_success()
+            try:
+                yield first
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            chunks.__anext__(), timeout=settings.llm_stream_idle_timeout
+                        )
+                    except StopAsyncIteration:
+                        return
+                    except asyncio.TimeoutError:
+                        self.breakers[provider].record_failure()
+                        raise Exception(f"{provider} stream stalled for {settings.llm_stream_idle_timeout}s")
+                    yield chunk
+            finally:
+                await chunks.aclose()
+        
+        raise Exception(f"All LLM providers failed: {'; '.join(errors)}")
+    
+    def _build_extraction_prompt(self, raw_text: str) -> str:
+        """Build prompt for structured data extraction"""
+        return f"""Extract structured information from this internship daily log:
 
 TEXT:
 {raw_text}
 
 Extract and return ONLY a valid JSON object with this structure:
-{{
-  "concepts": ["concept1", "concept2", ...],
-  "activities": [
-    {{"type": "coding/debugging/learning/meeting", "description": "...", "duration_minutes": 60}}
-  ],
-  "assignments": [
-    {{"title": "...", "description": "...", "due_date": "YYYY-MM-DD or null"}}
-  ],
-  "mood": "positive/neutral/negative/frustrated/excited",
-  "difficulty_level": "easy/medium/hard",
-  "key_learnings": ["learning1", "learning2", ...]
-}}
+{EXTRACTION_SCHEMA}
 
 Be precise and extract only what's clearly mentioned. Return ONLY the JSON, no other text."""
+    
+    def _build_batch_extraction_prompt(self, raw_texts: List[str]) -> str:
+        """Build one prompt extracting structured data from several logs"""
+        logs = "\n\n".join(
+            f"LOG {i}:\n{text}" for i, text in enumerate(raw_texts, start=1)
+        )
+        return f"""Extract structured information from each of these {len(raw_texts)} internship daily logs:
 
-        response = self.generate(prompt, temperature=0.3)
-        
-        # Parse JSON response
+{logs}
+
+Return ONLY a valid JSON array with exactly {len(raw_texts)} objects, one per log in the same order, each with this structure:
+{EXTRACTION_SCHEMA}
+
+Be precise and extract only what's clearly mentioned in each log. Return ONLY the JSON array, no other text."""
+    
+    def _parse_structured_data(self, response: str) -> Optional[Dict[str, Any]]:
+        """Parse JSON object out of an extraction response, None if unparseable"""
         try:
             # Extract JSON from response (in case there's extra text)
             start = response.find('{')
@@ -110,26 +501,145 @@ Be precise and extract only what's clearly mentioned. Return ONLY the JSON, no o
             return json.loads(json_str)
         except json.JSONDecodeError as e:
             print(f"⚠️ Failed to parse JSON: {e}")
-            # Return default structure
-            return {
-                "concepts": [],
-                "activities": [],
-                "assignments": [],
-                "mood": "neutral",
-                "difficulty_level": "medium",
-                "key_learnings": []
-            }
+            return None
     
-    def generate_summary(self, data: Dict[str, Any], mode: str = "daily") -> str:
+    def _parse_structured_data_batch(self, response: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """Parse a JSON array of `count` extraction objects, None if unusable"""
+        try:
+            start = response.find('[')
+            end = response.rfind(']') + 1
+            items = json.loads(response[start:end])
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Failed to parse JSON array: {e}")
+            return None
+        if not isinstance(items, list) or len(items) != count or not all(isinstance(i, dict) for i in items):
+            print(f"⚠️ Batch extraction returned {len(items) if isinstance(items, list) else 'no'} items, expected {count}")
+            return None
+        return items
+    
+    def _default_structured_data(self) -> Dict[str, Any]:
+        """Default structure when extraction output cannot be parsed"""
+        return {
+            "concepts": [],
+            "activities": [],
+            "assignments": [],
+            "mood": "neutral",
+            "difficulty_level": "medium",
+            "key_learnings": []
+        }
+    
+    def _extraction_cache_key(self, raw_text: str) -> Optional[str]:
+        if extraction_cache is None:
+            return None
+        return extraction_cache.make_key(
+            raw_text, f"{EXTRACTION_PROMPT_VERSION}:{GEMINI_MODEL_NAME}"
+        )
+    
+    def _cacheable(self, cache_key: Optional[str], provider: str) -> bool:
+        """Keys name the primary model, so fallback answers are never stored under them"""
+        return cache_key is not None and provider == self.provider_order[0]
+    
+    def _cached_extraction(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if cache_key is None:
+            return None
+        return extraction_cache.get(cache_key)
+    
+    async def _acached_extraction(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if cache_key is None:
+            return None
+        return await extraction_cache.aget(cache_key)
+    
+    def _parse_extraction(self, response: str) -> Tuple[Dict[str, Any], bool]:
+        """Parsed extraction, and whether it parsed cleanly (only those are cached)"""
+        data = self._parse_structured_data(response)
+        if data is None:
+            return self._default_structured_data(), False
+        return data, True
+    
+    def extract_structured_data(self, raw_text: str) -> Dict[str, Any]:
         """
-        Generate summaries for VTU diary
-        Modes: daily, weekly, monthly
+        Extract structured data from daily log text
+        Returns: concepts, activities, assignments, mood, difficulty
+        Identical (whitespace-normalized) text is served from the extraction cache
+        """
+        cache_key = self._extraction_cache_key(raw_text)
+        cached = self._cached_extraction(cache_key)
+        if cached is not None:
+            return cached
+        
+        provider, response = self._generate(self._build_extraction_prompt(raw_text), temperature=0.3)
+        data, parsed = self._parse_extraction(response)
+        if parsed and self._cacheable(cache_key, provider):
+            extraction_cache.set(cache_key, data)
+        return data
+    
+    async def aextract_structured_data(self, raw_text: str) -> Dict[str, Any]:
+        """Async version of extract_structured_data"""
+        cache_key = self._extraction_cache_key(raw_text)
+        cached = await self._acached_extraction(cache_key)
+        if cached is not None:
+            return cached
+        
+        provider, response = await self._agenerate(self._build_extraction_prompt(raw_text), temperature=0.3)
+        data, parsed = self._parse_extraction(response)
+        if parsed and self._cacheable(cache_key, provider):
+            await extraction_cache.aset(cache_key, data)
+        return data
+    
+    async def aextract_structured_data_batch(self, raw_texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract structured data for several logs with a single LLM call
+        Cached texts are skipped; falls back to per-log extraction if the
+        grouped response cannot be matched up with its inputs
         """
+        cache_keys = [self._extraction_cache_key(text) for text in raw_texts]
+        results: List[Optional[Dict[str, Any]]] = list(
+            await asyncio.gather(*(self._acached_extraction(key) for key in cache_keys))
+        )
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if len(missing) == 1:
+            results[missing[0]] = await self.aextract_structured_data(raw_texts[missing[0]])
+        elif missing:
+            prompt = self._build_batch_extraction_prompt([raw_texts[i] for i in missing])
+            provider, response = await self._agenerate(prompt, temperature=0.3)
+            items = self._parse_structured_data_batch(response, len(missing))
+            if items is None:
+                extracted = await asyncio.gather(
+                    *(self.aextract_structured_data(raw_texts[i]) for i in missing)
+                )
+                for i, data in zip(missing, extracted):
+                    results[i] = data
+            else:
+                for i, data in zip(missing, items):
+                    if self._cacheable(cache_keys[i], provider):
+                        await extraction_cache.aset(cache_keys[i], data)
+                    results[i] = data
+        
+        return results
+    
+    def _log_context_stats(self, kind: str, stats: Dict[str, int]):
+        print(
+            f"📦 {kind} context: {stats['tokens']}/{stats['budget']} tokens, "
+            f"{stats['included']}/{stats['entries']} entries ({stats['reduced']} reduced)"
+        )
+    
+    def _pack_summary_data(self, data: Dict[str, Any]) -> str:
+        """Compact, de-duplicated summary data within the summary token budget"""
+        items_key = next((key for key in SUMMARY_ENTRY_KEYS if key in data), "logs")
+        fixed = {key: value for key, value in data.items() if key != items_key}
+        context, stats = self.summary_packer.pack(fixed, items_key, data.get(items_key, []))
+        self._log_context_stats("Summary", stats)
+        return context
+    
+    def _build_summary_prompt(self, data: Dict[str, Any], mode: str = "daily") -> str:
+        """Build VTU diary prompt for the given mode"""
+        context = self._pack_summary_data(data)
         if mode == "weekly":
-            prompt = f"""Generate a professional weekly internship diary entry for VTU submission.
+            return f"""Generate a professional weekly internship diary entry for VTU submission.
 
 DATA:
-{json.dumps(data, indent=2)}
+{context}
 
 Write in first-person, past tense, formal academic tone. Include:
 - Overview of the week
@@ -141,10 +651,10 @@ Write in first-person, past tense, formal academic tone. Include:
 Length: 300-400 words. Make it sound human-written, not AI-generated."""
         
         elif mode == "daily":
-            prompt = f"""Generate a professional daily internship diary entry for VTU submission.
+            return f"""Generate a professional daily internship diary entry for VTU submission.
 
 DATA:
-{json.dumps(data, indent=2)}
+{context}
 
 Write in first-person, past tense, formal tone. Include:
 - What I worked on
@@ -154,10 +664,10 @@ Write in first-person, past tense, formal tone. Include:
 Length: 150-200 words."""
         
         else:  # monthly
-            prompt = f"""Generate a professional monthly internship report for VTU submission.
+            return f"""Generate a professional monthly internship report for VTU submission.
 
 DATA:
-{json.dumps(data, indent=2)}
+{context}
 
 Write in first-person, formal academic tone. Include:
 - Monthly overview
@@ -167,20 +677,56 @@ Write in first-person, formal academic tone. Include:
 - Future goals
 
 Length: 500-600 words."""
-        
-        return self.generate(prompt, temperature=0.7)
     
-    def explain_concept(self, concept_name: str, user_context: Dict[str, Any]) -> str:
+    def generate_summary(self, data: Dict[str, Any], mode: str = "daily") -> str:
         """
-        Explain a concept with identity-aware personalization
-        user_context: {learned_concepts: [], past_mistakes: [], current_level: ""}
+        Generate summaries for VTU diary
+        Modes: daily, weekly, monthly
         """
+        return self.generate(self._build_summary_prompt(data, mode), temperature=0.7)
+    
+    async def agenerate_summary(self, data: Dict[str, Any], mode: str = "daily") -> str:
+        """Async version of generate_summary"""
+        return await self.agenerate(self._build_summary_prompt(data, mode), temperature=0.7)
+    
+    def astream_summary(self, data: Dict[str, Any], mode: str = "daily") -> AsyncIterator[str]:
+        """Streaming version of generate_summary"""
+        return self.astream(self._build_summary_prompt(data, mode), temperature=0.7)
+    
+    def _build_period_summary_prompt(self, level: str, material: Any) -> str:
+        """Build prompt condensing one day/week/month into an intermediate summary"""
+        if level == "day":
+            instructions = """Condense this internship daily log into 3-5 short factual bullet points:
+work done, concepts learned, challenges and how they were handled. Keep tool and
+technology names exactly as written."""
+        elif level == "week":
+            instructions = """Condense these daily notes from one week of an internship into a factual
+summary of at most 120 words: main work, concepts learned, challenges, progress."""
+        else:  # month
+            instructions = """Condense these weekly summaries from one month of an internship into a
+factual summary of at most 200 words: main projects, skills acquired, achievements, challenges."""
+        
+        return f"""{instructions}
+
+DATA:
+{compact_json(strip_redundant(material) if isinstance(material, dict) else material)}
+
+Return only the summary text."""
+    
+    async def agenerate_period_summary(self, level: str, material: Any) -> str:
+        """Summarize one day, week or month for hierarchical diary reports"""
+        return await self.agenerate(self._build_period_summary_prompt(level, material), temperature=0.3)
+    
+    def _build_explain_prompt(self, concept_name: str, user_context: Dict[str, Any]) -> str:
+        """Build personalized concept explanation prompt"""
         learned = user_context.get("learned_concepts", [])
         mistakes = user_context.get("past_mistakes", [])
+        level = user_context.get("current_level", "beginner")
         
-        prompt = f"""Explain the concept "{concept_name}" to an intern learning it.
+        return f"""Explain the concept "{concept_name}" to an intern learning it.
 
 IMPORTANT CONTEXT:
+- Their current level with this concept: {level}
 - They already know: {', '.join(learned) if learned else 'basic programming'}
 - Common mistakes they make: {', '.join(mistakes) if mistakes else 'none recorded'}
 
@@ -191,17 +737,44 @@ Provide:
 4. Common pitfalls (especially relevant to their past mistakes)
 
 Keep it conversational, encouraging, and practical. Maximum 250 words."""
-        
-        return self.generate(prompt, temperature=0.7)
     
-    def generate_guidance(self, user_history: Dict[str, Any]) -> str:
+    def explain_concept(self, concept_name: str, user_context: Dict[str, Any]) -> str:
         """
-        Generate learning guidance and next steps
+        Explain a concept with identity-aware personalization
+        user_context: {learned_concepts: [], past_mistakes: [], current_level: ""}
         """
-        prompt = f"""Based on this learner's internship history, suggest what they should learn next.
+        return self.generate(self._build_explain_prompt(concept_name, user_context), temperature=0.7)
+    
+    async def aexplain_concept(self, concept_name: str, user_context: Dict[str, Any]) -> str:
+        """Async version of explain_concept"""
+        return await self.agenerate(self._build_explain_prompt(concept_name, user_context), temperature=0.7)
+    
+    def astream_explain_concept(self, concept_name: str, user_context: Dict[str, Any]) -> AsyncIterator[str]:
+        """Streaming version of explain_concept"""
+        return self.astream(self._build_explain_prompt(concept_name, user_context), temperature=0.7)
+    
+    def _pack_guidance_history(self, user_history: Dict[str, Any]) -> str:
+        """Compact learning history within the guidance token budget, recent activity first"""
+        fixed = {key: value for key, value in user_history.items() if key != "recent_activities"}
+        if isinstance(fixed.get("mastery_levels"), dict):
+            fixed["mastery_levels"] = dict(list(fixed["mastery_levels"].items())[:GUIDANCE_MAX_MASTERY_ENTRIES])
+        activities = [
+            activity
+            for log_activities in user_history.get("recent_activities", [])
+            for activity in log_activities
+            if isinstance(activity, dict)
+        ]
+        # Activities arrive most recent first, so list order is the priority
+        context, stats = self.guidance_packer.pack(fixed, "recent_activities", activities, priority=None)
+        self._log_context_stats("Guidance", stats)
+        return context
+    
+    def _build_guidance_prompt(self, user_history: Dict[str, Any]) -> str:
+        """Build learning guidance prompt"""
+        return f"""Based on this learner's internship history, suggest what they should learn next.
 
 HISTORY:
-{json.dumps(user_history, indent=2)}
+{self._pack_guidance_history(user_history)}
 
 Provide:
 1. Assessment of current progress
@@ -210,8 +783,20 @@ Provide:
 4. Specific resources or practice suggestions
 
 Be encouraging and specific. Maximum 200 words."""
-        
-        return self.generate(prompt, temperature=0.7)
+    
+    def generate_guidance(self, user_history: Dict[str, Any]) -> str:
+        """
+        Generate learning guidance and next steps
+        """
+        return self.generate(self._build_guidance_prompt(user_history), temperature=0.7)
+    
+    async def agenerate_guidance(self, user_history: Dict[str, Any]) -> str:
+        """Async version of generate_guidance"""
+        return await self.agenerate(self._build_guidance_prompt(user_history), temperature=0.7)
+    
+    def astream_guidance(self, user_history: Dict[str, Any]) -> AsyncIterator[str]:
+        """Streaming version of generate_guidance"""
+        return self.astream(self._build_guidance_prompt(user_history), temperature=0.7)
 
 
 # Global instance
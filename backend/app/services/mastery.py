@@ -0,0 +1,213 @@
+"""
+Mastery Scoring
+Derive Concept.mastery_level, times_practiced and review dates from the logs
+that mention each concept, with set-based SQL over log_concepts
+"""
+from sqlalchemy import select, update, func, case, cast, exists, and_, Integer, Float
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, Optional, Tuple
+import asyncio
+import math
+import uuid
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models import Concept, DailyLog, LogConcept
+
+DIFFICULTY_SCORES = {"easy": 1, "medium": 2, "hard": 3}
+# Per-mention weights; anything unlisted weighs 1.0
+DIFFICULTY_WEIGHTS = {"hard": 1.3, "easy": 0.8}
+MOOD_WEIGHTS = {"positive": 1.1, "excited": 1.1, "negative": 0.8, "frustrated": 0.8}
+DECAY_BATCH_SIZE = 500
+# Application-wide advisory lock key: one decay pass at a time across workers
+DECAY_LOCK_KEY = 4_210_022
+
+
+def mastery_label(level: Optional[int]) -> str:
+    """Human-readable level for prompts (1-2 beginner, 3 intermediate, 4-5 advanced)"""
+    if not level or level <= 2:
+        return "beginner"
+    if level == 3:
+        return "intermediate"
+    return "advanced"
+
+
+def average_difficulty(levels: Iterable[Optional[str]]) -> Optional[str]:
+    """Mean of easy/medium/hard labels, rounded back to a label (None if no data)"""
+    scores = [DIFFICULTY_SCORES[level] for level in levels if level in DIFFICULTY_SCORES]
+    if not scores:
+        return None
+    mean = sum(scores) / len(scores)
+    if mean < 1.5:
+        return "easy"
+    if mean < 2.5:
+        return "medium"
+    return "hard"
+
+
+def mention_weight(difficulty: Optional[str], mood: Optional[str], age_days: int) -> float:
+    """
+    A log mention's contribution: difficulty and mood weights, halved for
+    every `mastery_half_life_days` of age (future-dated logs count as today's)
+    """
+    weight = DIFFICULTY_WEIGHTS.get(difficulty, 1.0) * MOOD_WEIGHTS.get(mood, 1.0)
+    return weight * 0.5 ** (max(age_days, 0) / settings.mastery_half_life_days)
+
+
+def mastery_level(score: float) -> int:
+    """Saturate a decayed score onto 1-5: 1 + round(4 * (1 - exp(-score / saturation)))"""
+    level = 1 + round(4 * (1 - math.exp(-score / settings.mastery_saturation)))
+    return min(5, max(1, level))
+
+
+def score_mastery(mentions: Iterable[Tuple[Optional[str], Optional[str], int]]) -> int:
+    """Level for (difficulty, mood, age_days) mentions; update_mastery does the same in SQL"""
+    return mastery_level(sum(mention_weight(*mention) for mention in mentions))
+
+
+def _weight_case(column, weights):
+    by_weight = {}
+    for label, weight in weights.items():
+        by_weight.setdefault(weight, []).append(label)
+    return case(
+        *((column.in_(labels), weight) for weight, labels in by_weight.items()),
+        else_=1.0
+    )
+
+
+async def update_mastery(db: AsyncSession, concept_ids: Iterable[uuid.UUID]):
+    """
+    Recompute mastery for the given concepts in one UPDATE ... FROM
+    
+    The SQL form of score_mastery: each mention contributes a weight for
+    the log's difficulty and mood, halved for every `mastery_half_life_days`
+    between the log and today, so a concept left unpractised fades
+    (decay_mastery keeps those current). The decayed total saturates onto
+    the 1-5 scale.
+    """
+    ids = list(set(concept_ids))
+    if not ids:
+        return
+    
+    difficulty_weight = _weight_case(DailyLog.difficulty_level, DIFFICULTY_WEIGHTS)
+    mood_weight = _weight_case(DailyLog.mood, MOOD_WEIGHTS)
+    # Future-dated logs count as today's
+    age_days = func.greatest(func.current_date() - DailyLog.log_date, 0)
+    mentions = (
+        select(
+            LogConcept.concept_id.label("concept_id"),
+            DailyLog.log_date.label("log_date"),
+            (difficulty_weight * mood_weight).label("weight"),
+            age_days.label("age_days")
+        )
+        .join(DailyLog, DailyLog.id == LogConcept.log_id)
+        .where(LogConcept.concept_id.in_(ids))
+        .subquery()
+    )
+    decayed = mentions.c.weight * func.power(
+        0.5, cast(mentions.c.age_days, Float) / settings.mastery_half_life_days
+    )
+    score = func.sum(decayed)
+    stats = (
+        select(
+            mentions.c.concept_id,
+            func.count().label("practiced"),
+            func.min(mentions.c.log_date).label("first_date"),
+            func.max(mentions.c.log_date).label("last_date"),
+            cast(
+                1 + func.round(4 * (1 - func.exp(-score / settings.mastery_saturation))),
+                Integer
+            ).label("level")
+        )
+        .group_by(mentions.c.concept_id)
+        .subquery()
+    )
+    
+    await db.execute(
+        update(Concept)
+        .where(Concept.id == stats.c.concept_id)
+        .values(
+            times_practiced=stats.c.practiced,
+            first_learned_date=stats.c.first_date,
+            last_reviewed_date=stats.c.last_date,
+            mastery_level=func.least(5, func.greatest(1, stats.c.level))
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    # Concepts no log mentions any more (e.g. after re-extraction) reset to unpractised
+    await db.execute(
+        update(Concept)
+        .where(
+            and_(
+                Concept.id.in_(ids),
+                ~exists().where(LogConcept.concept_id == Concept.id)
+            )
+        )
+        .values(times_practiced=0, mastery_level=1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def decay_mastery() -> Optional[int]:
+    """
+    Recompute practised concepts not reviewed today, so stored levels fade
+    between ingests; returns how many were recomputed, or None when another
+    worker holds the decay lock
+    """
+    async with engine.connect() as lock_conn:
+        acquired = await lock_conn.scalar(select(func.pg_try_advisory_lock(DECAY_LOCK_KEY)))
+        # Session-level lock: it outlives this transaction, which is ended so the connection isn't idle in one
+        await lock_conn.commit()
+        if not acquired:
+            print("⏭️ Mastery decay pass already running on another worker")
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Concept.id).where(
+                        Concept.times_practiced > 0,
+                        Concept.last_reviewed_date < func.current_date()
+                    )
+                )
+                ids = result.scalars().all()
+                for start in range(0, len(ids), DECAY_BATCH_SIZE):
+                    await update_mastery(db, ids[start:start + DECAY_BATCH_SIZE])
+                    await db.commit()
+            return len(ids)
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(DECAY_LOCK_KEY)))
+            await lock_conn.commit()
+
+
+class MasteryDecayScheduler:
+    """Run the mastery decay pass periodically in the background"""
+    
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the periodic pass (disabled when the interval is 0)"""
+        if self.interval_seconds > 0:
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                decayed = await decay_mastery()
+                if decayed is not None:
+                    print(f"📉 Recomputed mastery for {decayed} concept(s)")
+            except Exception as e:
+                print(f"⚠️ Mastery decay pass failed: {e}")
+
+
+# Global instance
+mastery_decayer = MasteryDecayScheduler(settings.mastery_decay_interval_seconds)
@@ -0,0 +1,290 @@
+"""
+Hierarchical Summary Engine
+Build diary reports map-reduce style: per-day summaries, reduced into weekly
+summaries, reduced into monthly summaries, each cached in the database
+"""
+from sqlalchemy import select, delete, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Tuple, Iterable, Optional
+from datetime import date, timedelta
+import asyncio
+import uuid
+
+from app.config import settings
+from app.models import DailyLog, DiarySummary, SummaryReport
+from app.services.llm_service import llm_service, REPORT_PROMPT_VERSION
+
+# Bump when intermediate summary prompts change so cached rows are regenerated
+SUMMARY_PROMPT_VERSION = "1"
+
+# Cached final reports depend on both the report and the intermediate prompts
+REPORT_CACHE_VERSION = f"{REPORT_PROMPT_VERSION}.{SUMMARY_PROMPT_VERSION}"
+
+Period = Tuple[date, date]
+
+
+def _week_periods(days: Iterable[date], start: date, end: date) -> Dict[Period, List[date]]:
+    """Group days into ISO weeks (Mon-Sun) clipped to the requested range"""
+    periods: Dict[Period, List[date]] = {}
+    for day in sorted(days):
+        week_start = day - timedelta(days=day.weekday())
+        period = (max(week_start, start), min(week_start + timedelta(days=6), end))
+        periods.setdefault(period, []).append(day)
+    return periods
+
+
+def _month_periods(weeks: Iterable[Period]) -> Dict[Period, List[Period]]:
+    """
+    Group week periods into calendar months by week start
+    A month's period spans its weeks exactly, so date-based invalidation of a
+    day always reaches every summary built from it
+    """
+    months: Dict[date, List[Period]] = {}
+    for week in sorted(weeks):
+        months.setdefault(week[0].replace(day=1), []).append(week)
+    return {(month_weeks[0][0], month_weeks[-1][1]): month_weeks for month_weeks in months.values()}
+
+
+def _day_material(log: DailyLog) -> Dict[str, Any]:
+    """Compact input for a day summary"""
+    data = log.structured_data or {}
+    return {
+        "date": str(log.log_date),
+        "raw_text": log.raw_text,
+        "concepts": data.get("concepts", []),
+        "key_learnings": data.get("key_learnings", []),
+        "challenges": data.get("challenges", []),
+        "mood": log.mood,
+        "difficulty": log.difficulty_level
+    }
+
+
+class HierarchicalSummarizer:
+    """Resolve cached period summaries for one request, generating only what is missing"""
+    
+    def __init__(self, db: AsyncSession, user_id: uuid.UUID):
+        self.db = db
+        self.user_id = user_id
+        self.generated = 0
+        self.cached = 0
+    
+    async def _ensure(self, level: str, materials: Dict[Period, Any]) -> Dict[Period, str]:
+        """Return summaries for every period, generating missing ones in parallel"""
+        if not materials:
+            return {}
+        
+        result = await self.db.execute(
+            select(DiarySummary).where(
+                and_(
+                    DiarySummary.user_id == self.user_id,
+                    DiarySummary.level == level,
+                    DiarySummary.prompt_version == SUMMARY_PROMPT_VERSION,
+                    DiarySummary.period_start.in_([period[0] for period in materials])
+                )
+            )
+        )
+        summaries = {
+            (row.period_start, row.period_end): row.summary
+            for row in result.scalars().all()
+            if (row.period_start, row.period_end) in materials
+        }
+        self.cached += len(summaries)
+        
+        missing = [period for period in materials if period not in summaries]
+        if not missing:
+            return summaries
+        
+        semaphore = asyncio.Semaphore(settings.summary_max_concurrency)
+        
+        async def summarize(period: Period) -> str:
+            async with semaphore:
+                return await llm_service.agenerate_period_summary(level, materials[period])
+        
+        texts = await asyncio.gather(*(summarize(period) for period in missing))
+        
+        stmt = insert(DiarySummary).values([
+            {
+                "id": uuid.uuid4(),
+                "user_id": self.user_id,
+                "level": level,
+                "period_start": period[0],
+                "period_end": period[1],
+                "summary": text,
+                "prompt_version": SUMMARY_PROMPT_VERSION
+            }
+            for period, text in zip(missing, texts)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_diary_summary_period",
+            set_={"summary": stmt.excluded.summary, "prompt_version": stmt.excluded.prompt_version}
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+        
+        self.generated += len(missing)
+        summaries.update(zip(missing, texts))
+        return summaries
+    
+    async def build_report_data(
+        self,
+        logs: List[DailyLog],
+        start: date,
+        end: date,
+        mode: str
+    ) -> Dict[str, Any]:
+        """
+        Reduce logs to the smallest set of summaries that still covers the range
+        Daily mode keeps the raw log; weekly feeds day summaries; longer ranges
+        feed week summaries, or month summaries once there are too many weeks
+        """
+        data: Dict[str, Any] = {
+            "date_range": {"start": str(start), "end": str(end)},
+            "total_days": len(logs)
+        }
+        
+        if mode == "daily":
+            data["logs"] = [_day_material(log) for log in logs]
+            return data
+        
+        day_summaries = await self._ensure(
+            "day", {(log.log_date, log.log_date): _day_material(log) for log in logs}
+        )
+        
+        weeks = _week_periods([log.log_date for log in logs], start, end)
+        if mode == "weekly" or len(weeks) == 1:
+            data["daily_summaries"] = [
+                {"date": str(period[0]), "summary": text}
+                for period, text in sorted(day_summaries.items())
+            ]
+            return data
+        
+        week_summaries = await self._ensure("week", {
+            period: [
+                {"date": str(day), "summary": day_summaries[(day, day)]}
+                for day in days
+            ]
+            for period, days in weeks.items()
+        })
+        
+        if len(weeks) <= settings.summary_max_weeks_per_report:
+            data["weekly_summaries"] = [
+                {"period": f"{period[0]} to {period[1]}", "summary": text}
+                for period, text in sorted(week_summaries.items())
+            ]
+            return data
+        
+        month_summaries = await self._ensure("month", {
+            period: [
+                {"period": f"{week[0]} to {week[1]}", "summary": week_summaries[week]}
+                for week in month_weeks
+            ]
+            for period, month_weeks in _month_periods(weeks).items()
+        })
+        data["monthly_summaries"] = [
+            {"period": f"{period[0]} to {period[1]}", "summary": text}
+            for period, text in sorted(month_summaries.items())
+        ]
+        return data
+
+
+async def invalidate_summaries(db: AsyncSession, user_id: uuid.UUID, log_dates: Iterable[date]):
+    """
+    Drop cached summaries whose period contains any of the given dates
+    Covers the day itself and its week and month ancestors; siblings stay cached
+    """
+    dates = set(log_dates)
+    if not dates:
+        return
+    
+    await db.execute(
+        delete(DiarySummary).where(
+            and_(
+                DiarySummary.user_id == user_id,
+                or_(*[
+                    and_(DiarySummary.period_start <= day, DiarySummary.period_end >= day)
+                    for day in dates
+                ])
+            )
+        )
+    )
+
+
+async def logs_fingerprint(db: AsyncSession, user_id: uuid.UUID, start: date, end: date) -> Tuple[int, str]:
+    """
+    Cheap fingerprint of the logs in a range: count and latest updated_at
+    Any insert or edit in the range changes it, so cached reports self-invalidate
+    """
+    result = await db.execute(
+        select(func.count(DailyLog.id), func.max(DailyLog.updated_at)).where(
+            and_(
+                DailyLog.user_id == user_id,
+                DailyLog.log_date >= start,
+                DailyLog.log_date <= end
+            )
+        )
+    )
+    count, latest = result.one()
+    latest_part = latest.isoformat() if latest else "-"
+    return count, f"{count}:{latest_part}"
+
+
+async def get_cached_report(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    mode: str,
+    start: date,
+    end: date,
+    fingerprint: str
+) -> Optional[SummaryReport]:
+    """Return the cached report for this request if it is still current"""
+    result = await db.execute(
+        select(SummaryReport).where(
+            and_(
+                SummaryReport.user_id == user_id,
+                SummaryReport.mode == mode,
+                SummaryReport.period_start == start,
+                SummaryReport.period_end == end
+            )
+        )
+    )
+    report = result.scalar_one_or_none()
+    if report and report.fingerprint == fingerprint and report.prompt_version == REPORT_CACHE_VERSION:
+        return report
+    return None
+
+
+async def store_report(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    mode: str,
+    start: date,
+    end: date,
+    fingerprint: str,
+    summary: str,
+    metadata: Dict[str, Any]
+):
+    """Insert or replace the cached report for this request"""
+    stmt = insert(SummaryReport).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        mode=mode,
+        period_start=start,
+        period_end=end,
+        prompt_version=REPORT_CACHE_VERSION,
+        fingerprint=fingerprint,
+        summary=summary,
+        report_metadata=metadata
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_summary_report_request",
+        set_={
+            "prompt_version": stmt.excluded.prompt_version,
+            "fingerprint": stmt.excluded.fingerprint,
+            "summary": stmt.excluded.summary,
+            "report_metadata": stmt.excluded.report_metadata,
+            "created_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+    await db.commit()
@@ -0,0 +1,121 @@
+"""
+Backfill Normalized Log Data
+Logs ingested before normalization existed only have `structured_data`; their
+concepts, concept links, activities and assignments were never written, so
+concept search, explain and guidance see none of that history. This replays
+the ingestion normalization stage over every extracted log, in batches, and
+embeds concepts that have no vector yet. Finally every user's analytics
+rollups are rebuilt over their whole history. Re-running it is safe: each
+batch replaces the rows of its own logs.
+Run after `alembic upgrade head` with: python -m scripts.backfill_normalized_data
+"""
+import argparse
+import asyncio
+from typing import List, Optional
+import uuid
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, close_db
+from app.models import DailyLog, Concept
+from app.core.vector_store import async_vector_store
+from app.services.ingestion_pipeline import materialize_structured_data, embed_new_concepts
+from app.services.analytics_rollups import refresh_rollups
+
+
+async def backfill_logs(batch_size: int) -> int:
+    """Normalize every log that has extraction results; returns how many"""
+    done = 0
+    after: Optional[uuid.UUID] = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = select(DailyLog).where(DailyLog.structured_data.isnot(None))
+            if after is not None:
+                query = query.where(DailyLog.id > after)
+            result = await db.execute(query.order_by(DailyLog.id).limit(batch_size))
+            logs: List[DailyLog] = list(result.scalars().all())
+            if not logs:
+                return done
+            
+            new_concepts = await materialize_structured_data(db, logs)
+            await db.commit()
+            await embed_new_concepts(new_concepts)
+            
+            after = logs[-1].id
+            done += len(logs)
+            print(f"  ✅ {done} log(s) normalized, {len(new_concepts)} new concept(s) in this batch")
+
+
+async def backfill_concept_vectors(batch_size: int) -> int:
+    """Embed concepts that have no point in the concept collection; returns how many"""
+    embedded = 0
+    after: Optional[uuid.UUID] = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = select(Concept)
+            if after is not None:
+                query = query.where(Concept.id > after)
+            result = await db.execute(query.order_by(Concept.id).limit(batch_size))
+            concepts: List[Concept] = list(result.scalars().all())
+        if not concepts:
+            return embedded
+        
+        stored = await async_vector_store.get_concept_vectors([str(c.id) for c in concepts])
+        missing = [c for c in concepts if str(c.id) not in stored]
+        await embed_new_concepts(missing)
+        
+        after = concepts[-1].id
+        embedded += len(missing)
+
+
+async def rebuild_rollups() -> int:
+    """Recompute every user's rollups over all dates with logs or first-learned concepts"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(DailyLog.user_id).distinct())
+        user_ids = list(result.scalars().all())
+    
+    for user_id in user_ids:
+        async with AsyncSessionLocal() as db:
+            log_dates = await db.execute(
+                select(DailyLog.log_date).distinct().where(DailyLog.user_id == user_id)
+            )
+            concept_dates = await db.execute(
+                select(Concept.first_learned_date).distinct().where(
+                    Concept.user_id == user_id,
+                    Concept.first_learned_date.isnot(None)
+                )
+            )
+            dates = set(log_dates.scalars().all()) | set(concept_dates.scalars().all())
+            await refresh_rollups(db, user_id, dates)
+            await db.commit()
+        print(f"  ✅ User {user_id}: rollups rebuilt over {len(dates)} day(s)")
+    return len(user_ids)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Normalize logs ingested before normalization existed")
+    parser.add_argument("--batch-size", type=int, default=200, help="logs or concepts per transaction")
+    parser.add_argument("--rollups-only", action="store_true", help="only rebuild analytics rollups")
+    args = parser.parse_args()
+    
+    print("=" * 70)
+    print("Normalized Data Backfill")
+    print("=" * 70)
+    
+    try:
+        if not args.rollups_only:
+            print("\nNormalizing logs...")
+            logs = await backfill_logs(args.batch_size)
+            print("\nEmbedding concepts without vectors...")
+            embedded = await backfill_concept_vectors(args.batch_size)
+            print(f"\n✅ Normalized {logs} log(s) and embedded {embedded} concept(s).")
+        print("\nRebuilding analytics rollups...")
+        users = await rebuild_rollups()
+        print(f"\n✅ Done. Rebuilt rollups for {users} user(s).")
+    finally:
+        await async_vector_store.close()
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Embedding Backend Benchmark
+Compare torch, ONNX fp32 and ONNX int8 backends on latency, peak RSS and
+cosine agreement with the torch embeddings
+Run with: python -m scripts.benchmark_embeddings [onnx_dir]
+Each backend runs in its own process so RSS reflects only that backend
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_ONNX_DIR = "models/all-MiniLM-L6-v2-onnx"
+BACKENDS = ["torch", "onnx-fp32", "onnx-int8"]
+
+SAMPLE_TEXTS = [
+    "Today I learned FastAPI routing and created 2 REST endpoints.",
+    "Mentor assigned JWT authentication implementation for the login flow.",
+    "Struggled with async/await concepts in SQLAlchemy sessions but fixed it.",
+    "Set up Qdrant locally and stored sentence embeddings for daily logs.",
+    "Debugged a CORS issue between the Next.js frontend and the backend API.",
+    "Wrote Alembic migrations for the concepts and log_concepts tables.",
+    "Attended standup, reviewed a pull request and paired on unit tests.",
+    "Read about vector quantization and approximate nearest neighbour search.",
+] * 8
+
+
+def load_model(backend: str, onnx_dir: str):
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer("all-MiniLM-L6-v2")
+    from app.core.onnx_embeddings import OnnxEmbeddingModel
+    return OnnxEmbeddingModel(onnx_dir, quantized=(backend == "onnx-int8"))
+
+
+def run_worker(backend: str, onnx_dir: str, output_path: str):
+    """Benchmark one backend and print its stats as JSON"""
+    started = time.perf_counter()
+    model = load_model(backend, onnx_dir)
+    load_seconds = time.perf_counter() - started
+    
+    # Warm up
+    model.encode(SAMPLE_TEXTS[:4], convert_to_numpy=True)
+    
+    single = []
+    for text in SAMPLE_TEXTS:
+        t0 = time.perf_counter()
+        model.encode(text, convert_to_numpy=True)
+        single.append((time.perf_counter() - t0) * 1000)
+    
+    t0 = time.perf_counter()
+    embeddings = np.asarray(model.encode(SAMPLE_TEXTS, convert_to_numpy=True), dtype=np.float32)
+    batch_ms = (time.perf_counter() - t0) * 1000
+    np.save(output_path, embeddings)
+    
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_seconds, 2),
+        "single_p50_ms": round(float(np.percentile(single, 50)), 2),
+        "single_p95_ms": round(float(np.percentile(single, 95)), 2),
+        "batch_ms_per_text": round(batch_ms / len(SAMPLE_TEXTS), 2),
+        "peak_rss_mb": round(rss_mb, 1),
+    }))
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> float:
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return float(np.min(np.sum(reference * candidate, axis=1)))
+
+
+def main():
+    onnx_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ONNX_DIR
+    
+    print("=" * 70)
+    print("Embedding Backend Benchmark")
+    print("=" * 70)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            output_path = os.path.join(tmp, f"{backend}.npy")
+            proc = subprocess.run(
+                [sys.executable, "-m", "scripts.benchmark_embeddings", "--worker", backend, onnx_dir, output_path],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"⚠️ {backend} failed:\n{proc.stderr.strip()}")
+                continue
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            stats["embeddings"] = np.load(output_path)
+            results[backend] = stats
+    
+    reference = results.get("torch", {}).get("embeddings")
+    header = f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'batch ms/text':>14} {'RSS MB':>8} {'min cos':>8}"
+    print(header)
+    print("-" * len(header))
+    for backend, stats in results.items():
+        agreement = cosine_agreement(reference, stats["embeddings"]) if reference is not None else float("nan")
+        print(
+            f"{backend:<10} {stats['load_s']:>7} {stats['single_p50_ms']:>8} {stats['single_p95_ms']:>8} "
+            f"{stats['batch_ms_per_text']:>14} {stats['peak_rss_mb']:>8} {agreement:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2], sys.argv[3], sys.argv[4])
+    else:
+        main()
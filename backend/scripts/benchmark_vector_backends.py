@@ -0,0 +1,132 @@
+"""
+Vector Backend Benchmark
+Compare the in-process NumPy index with a Qdrant server on build time,
+query latency and recall@10 at several collection sizes
+Run with: python -m scripts.benchmark_vector_backends [sizes...] [--qdrant-url URL] [--dtype float16]
+Default sizes: 10000 100000 1000000. Qdrant is skipped if it is unreachable.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+
+from app.core.numpy_vector_store import NumpyVectorIndex
+
+DIM = 384
+NUM_QUERIES = 100
+TOP_K = 10
+BATCH = 5000
+
+
+def random_vectors(rng, count: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile_ms(samples, q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def bench_numpy(vectors: np.ndarray, queries: np.ndarray, dtype: str):
+    directory = tempfile.mkdtemp(prefix="numpy_vectors_")
+    try:
+        index = NumpyVectorIndex(directory, dim=DIM, dtype=dtype, initial_capacity=len(vectors))
+        started = time.perf_counter()
+        for start in range(0, len(vectors), BATCH):
+            index.upsert([
+                (str(i), vectors[i], {"row": i})
+                for i in range(start, min(start + BATCH, len(vectors)))
+            ])
+        build_s = time.perf_counter() - started
+        
+        latencies, results = [], []
+        for query in queries:
+            t0 = time.perf_counter()
+            hits = index.search(query, TOP_K)
+            latencies.append(time.perf_counter() - t0)
+            results.append([payload["row"] for _, payload in hits])
+        
+        index.close()
+        return {
+            "build_s": round(build_s, 1),
+            "p50_ms": percentile_ms(latencies, 50),
+            "p95_ms": percentile_ms(latencies, 95),
+            "matrix_mb": round(len(vectors) * DIM * np.dtype(dtype).itemsize / 2**20, 1),
+        }, results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_qdrant(client: QdrantClient, vectors: np.ndarray, queries: np.ndarray):
+    collection = f"bench_{uuid.uuid4().hex[:8]}"
+    client.create_collection(collection, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+    try:
+        started = time.perf_counter()
+        for start in range(0, len(vectors), BATCH):
+            client.upsert(collection_name=collection, points=[
+                PointStruct(id=i, vector=vectors[i].tolist(), payload={"row": i})
+                for i in range(start, min(start + BATCH, len(vectors)))
+            ], wait=True)
+        build_s = time.perf_counter() - started
+        
+        latencies, results = [], []
+        for query in queries:
+            t0 = time.perf_counter()
+            hits = client.search(collection_name=collection, query_vector=query.tolist(), limit=TOP_K)
+            latencies.append(time.perf_counter() - t0)
+            results.append([hit.id for hit in hits])
+        
+        return {
+            "build_s": round(build_s, 1),
+            "p50_ms": percentile_ms(latencies, 50),
+            "p95_ms": percentile_ms(latencies, 95),
+        }, results
+    finally:
+        client.delete_collection(collection)
+
+
+def recall(exact, approximate) -> float:
+    return float(np.mean([len(set(e) & set(a)) / len(e) for e, a in zip(exact, approximate)]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    args = parser.parse_args()
+    
+    client = QdrantClient(url=args.qdrant_url)
+    try:
+        client.get_collections()
+    except Exception as e:
+        print(f"⚠️ Qdrant unreachable at {args.qdrant_url} ({e}); benchmarking NumPy only")
+        client = None
+    
+    print("=" * 70)
+    print(f"Vector Backend Benchmark (dim={DIM}, top-{TOP_K}, {NUM_QUERIES} queries, numpy {args.dtype})")
+    print("=" * 70)
+    
+    rng = np.random.default_rng(42)
+    for size in args.sizes:
+        vectors = random_vectors(rng, size)
+        queries = random_vectors(rng, NUM_QUERIES)
+        
+        numpy_stats, exact = bench_numpy(vectors, queries, args.dtype)
+        print(f"\n{size:,} vectors")
+        print(f"  numpy : build {numpy_stats['build_s']}s, p50 {numpy_stats['p50_ms']}ms, "
+              f"p95 {numpy_stats['p95_ms']}ms, matrix {numpy_stats['matrix_mb']}MB (exact)")
+        
+        if client is not None:
+            qdrant_stats, approximate = bench_qdrant(client, vectors, queries)
+            print(f"  qdrant: build {qdrant_stats['build_s']}s, p50 {qdrant_stats['p50_ms']}ms, "
+                  f"p95 {qdrant_stats['p95_ms']}ms, recall@{TOP_K} {recall(exact, approximate):.3f}")
+
+
+if __name__ == "__main__":
+    main()
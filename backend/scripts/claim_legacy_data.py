@@ -0,0 +1,67 @@
+"""
+Claim Legacy Data
+Before authentication every log, concept and vector point belonged to one
+built-in MVP user (00000000-0000-0000-0000-000000000001) that has no password,
+so nobody can log in as it. This sets an email and password on that user;
+log in with them afterwards and all of the earlier data is yours.
+Run with: python -m scripts.claim_legacy_data --email you@example.com
+"""
+import argparse
+import asyncio
+import getpass
+import sys
+import uuid
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal, close_db
+from app.models import User
+from app.core.security import hash_password
+
+LEGACY_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+
+async def claim(email: str, password: str, full_name: Optional[str] = None) -> bool:
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, LEGACY_USER_ID)
+        if not user:
+            print("ℹ️ No legacy user in this database; nothing to claim.")
+            return False
+        
+        result = await db.execute(select(User.id).where(User.email == email, User.id != LEGACY_USER_ID))
+        if result.scalar_one_or_none():
+            print(f"❌ {email} already belongs to another account; choose a different email.")
+            return False
+        
+        user.email = email
+        user.hashed_password = hash_password(password)
+        if full_name:
+            user.full_name = full_name
+        await db.commit()
+    return True
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Set login credentials on the legacy MVP user")
+    parser.add_argument("--email", required=True, help="email to log in with")
+    parser.add_argument("--full-name", help="optional display name")
+    args = parser.parse_args()
+    
+    password = getpass.getpass("New password: ")
+    if len(password) < 8:
+        print("❌ Password must be at least 8 characters.")
+        sys.exit(1)
+    if password != getpass.getpass("Repeat password: "):
+        print("❌ Passwords do not match.")
+        sys.exit(1)
+    
+    try:
+        if await claim(args.email.strip().lower(), password, args.full_name):
+            print(f"✅ Legacy data claimed. Log in as {args.email.strip().lower()}.")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,18 @@
+"""
+Export Embedding Model to ONNX
+Writes model.onnx, model_int8.onnx and tokenizer.json for the ONNX backend
+Run with: python -m scripts.export_onnx_embeddings [output_dir]
+Requires requirements-torch.txt (export machine only, not the workers)
+"""
+import sys
+
+from app.core.onnx_embeddings import export_onnx_model
+
+DEFAULT_OUTPUT_DIR = "models/all-MiniLM-L6-v2-onnx"
+
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT_DIR
+    print(f"Exporting all-MiniLM-L6-v2 to {output_dir}...")
+    export_onnx_model("all-MiniLM-L6-v2", output_dir, quantize=True)
+    print("✅ Export complete")
+    print("\nSet EMBEDDING_BACKEND=onnx (and EMBEDDING_ONNX_DIR if not default) to use it.")
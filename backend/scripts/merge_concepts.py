@@ -0,0 +1,31 @@
+"""
+Merge Near-Duplicate Concepts
+One-off run of the background canonicalization pass: folds concepts whose
+names embed within CONCEPT_MERGE_THRESHOLD into the earliest-learned one
+Run with: python -m scripts.merge_concepts
+"""
+import asyncio
+
+from app.config import settings
+from app.database import close_db
+from app.services.concept_canonicalizer import run_merge_pass
+
+
+async def main():
+    print("=" * 70)
+    print("Concept Merge Pass")
+    print("=" * 70)
+    print(f"Similarity threshold: {settings.concept_merge_threshold}\n")
+    
+    try:
+        merged = await run_merge_pass()
+        if merged is None:
+            print("\n⚠️ A server worker is running the merge pass right now; try again shortly.")
+        else:
+            print(f"\n✅ Done. Merged {merged} duplicate concept(s).")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+Backfill Vector Point Owners
+Sets user_id on concept/log points written before it was stored, looking the
+owner up from Postgres; points whose row no longer exists are deleted.
+Searches filter strictly on user_id, so ownerless points are invisible until
+this has run.
+Run with: python -m scripts.migrate_vector_owners
+"""
+import asyncio
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal, close_db
+from app.models import DailyLog, Concept
+from app.core.vector_store import vector_store
+
+
+async def _owners(model, ids: List[str]) -> Dict[str, str]:
+    """Row id → owning user id for the rows that still exist"""
+    valid = []
+    for value in ids:
+        try:
+            valid.append(uuid.UUID(value))
+        except (TypeError, ValueError):
+            continue
+    if not valid:
+        return {}
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(model.id, model.user_id).where(model.id.in_(valid)))
+        return {str(row_id): str(user_id) for row_id, user_id in result.all()}
+
+
+async def backfill(collection: str, model, id_field: str):
+    points = vector_store.ownerless_points(collection)
+    print(f"{collection}: {len(points)} ownerless point(s)")
+    if not points:
+        return
+    
+    owners = await _owners(model, [payload.get(id_field) for _, payload in points])
+    by_user: Dict[str, List[str]] = defaultdict(list)
+    orphans: List[str] = []
+    for pid, payload in points:
+        owner = owners.get(str(payload.get(id_field)))
+        if owner:
+            by_user[owner].append(pid)
+        else:
+            orphans.append(pid)
+    
+    for user_id, point_ids in by_user.items():
+        vector_store.set_point_owner(collection, user_id, point_ids)
+        print(f"  ✅ {len(point_ids)} point(s) → user {user_id}")
+    if orphans:
+        vector_store.delete_points(collection, orphans)
+        print(f"  🗑️ Deleted {len(orphans)} point(s) whose {id_field} no longer exists")
+
+
+async def main():
+    print("=" * 70)
+    print("Vector Point Owner Backfill")
+    print("=" * 70)
+    print(f"Backend: {settings.vector_store_backend}\n")
+    
+    try:
+        await backfill(vector_store.log_collection, DailyLog, "log_id")
+        await backfill(vector_store.concept_collection, Concept, "concept_id")
+        print("\n✅ Done. Every point now carries its owner's user_id.")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+"""
+Apply Vector Storage Settings to Existing Collections
+Switches concept/log collections to the configured quantization and
+on-disk storage (QDRANT_QUANTIZATION, QDRANT_VECTORS_ON_DISK)
+Run with: python -m scripts.migrate_vector_quantization
+"""
+from app.config import settings
+from app.core.vector_store import QdrantVectorStore
+
+
+def migrate():
+    print("=" * 70)
+    print("Vector Storage Migration")
+    print("=" * 70)
+    print(f"Quantization: {settings.qdrant_quantization}")
+    print(f"Original vectors on disk: {settings.qdrant_vectors_on_disk}")
+    print(f"Search: oversampling={settings.qdrant_oversampling}, rescore={settings.qdrant_rescore}\n")
+    
+    store = QdrantVectorStore()
+    store.apply_storage_settings()
+    print("\n✅ Done. Qdrant re-quantizes segments in the background; "
+          "check collection status before benchmarking recall.")
+
+
+if __name__ == "__main__":
+    migrate()
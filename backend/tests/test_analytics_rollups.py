@@ -0,0 +1,33 @@
+"""
+Rollup periods and streak renumbering
+"""
+from datetime import date
+
+from app.services.analytics_rollups import rollup_periods, number_streaks
+
+
+def test_rollup_periods_cover_day_iso_week_and_month():
+    assert rollup_periods(date(2024, 2, 29)) == [
+        ("day", date(2024, 2, 29), date(2024, 2, 29)),
+        ("week", date(2024, 2, 26), date(2024, 3, 3)),
+        ("month", date(2024, 2, 1), date(2024, 2, 29)),
+    ]
+
+
+def test_number_streaks_restarts_after_gaps():
+    days = [date(2024, 1, d) for d in (1, 2, 3, 5, 6, 9)]
+    assert number_streaks(days) == [1, 2, 3, 1, 2, 1]
+
+
+def test_number_streaks_continues_from_previous_day():
+    days = [date(2024, 1, 10), date(2024, 1, 11)]
+    assert number_streaks(days, date(2024, 1, 9), 4) == [5, 6]
+
+
+def test_number_streaks_ignores_previous_streak_across_a_gap():
+    # The changed day (Jan 10) lost its log: Jan 11 starts a new run
+    assert number_streaks([date(2024, 1, 11)], date(2024, 1, 9), 4) == [1]
+
+
+def test_number_streaks_empty_window():
+    assert number_streaks([], date(2024, 1, 9), 4) == []
@@ -0,0 +1,83 @@
+"""
+CircuitBreaker state changes: closed → open → half-open (single trial) → closed/open
+"""
+import pytest
+
+from app.services import llm_service as llm
+from app.services.llm_service import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() as seen by llm_service"""
+    now = [1000.0]
+    monkeypatch.setattr(llm.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_half_open_lets_only_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    assert not breaker.try_acquire()
+    
+    clock[0] += 30
+    assert breaker.try_acquire()
+    # Concurrent callers are refused while the trial is in flight
+    assert not breaker.allow()
+    assert not breaker.try_acquire()
+
+
+def test_successful_trial_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.try_acquire()
+    breaker.record_success()
+    assert breaker.try_acquire()
+    assert breaker.try_acquire()
+
+
+def test_failed_trial_restarts_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.try_acquire()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.try_acquire()
+
+
+def test_abandoned_trial_expires_after_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.try_acquire()
+    # The trial never reports back (e.g. cancelled hedge)
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.try_acquire()
+
+
+def test_closed_calls_do_not_claim_trial_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30)
+    assert breaker.try_acquire()
+    assert breaker.trial_started_at is None
@@ -0,0 +1,85 @@
+"""
+Canonicalization thresholds: ingest-time name mapping and the merge pass plan
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from app.services import concept_canonicalizer as canon
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_plan_merges_respects_threshold_and_order():
+    vectors = np.stack([
+        _unit(1, 0, 0),
+        _unit(0.95, 0.31, 0),   # cos ≈ 0.95 with row 0
+        _unit(0, 1, 0),
+        _unit(0.6, 0.8, 0),     # cos 0.6 / 0.8: below 0.88 with both canonicals
+    ])
+    assert canon._plan_merges(vectors, threshold=0.88) == [(1, 0)]
+    assert canon._plan_merges(vectors, threshold=0.96) == []
+    # Merged rows never become canonical for later ones
+    assert canon._plan_merges(vectors, threshold=0.5) == [(1, 0), (3, 2)]
+
+
+def test_plan_merges_picks_most_similar_canonical():
+    vectors = np.stack([_unit(1, 0), _unit(0, 1), _unit(0.3, 1)])
+    assert canon._plan_merges(vectors, threshold=0.5) == [(2, 1)]
+
+
+class _FakeCache:
+    def __init__(self, vectors):
+        self.vectors = vectors
+    
+    async def embed(self, text):
+        return self.vectors[text]
+
+
+class _FakeStore:
+    def __init__(self, hits):
+        self.hits = hits
+    
+    async def search_similar_concepts(self, embedding, limit, user_id):
+        return self.hits.get(tuple(embedding), [])
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    monkeypatch.setattr(canon.settings, "concept_merge_threshold", 0.88)
+
+
+async def test_new_name_maps_onto_existing_concept_above_threshold(monkeypatch, threshold):
+    monkeypatch.setattr(canon, "concept_embedding_cache", _FakeCache({
+        "FastAPI routes": [1.0, 0.0], "Redis": [0.0, 1.0]
+    }))
+    monkeypatch.setattr(canon, "async_vector_store", _FakeStore({
+        (1.0, 0.0): [{"name": "FastAPI Router", "score": 0.93}],
+        (0.0, 1.0): [{"name": "Celery", "score": 0.87}],
+    }))
+    mapping = await canon.canonicalize_concept_names(
+        "user", {"fastapi routes": "FastAPI routes", "redis": "Redis"}
+    )
+    assert mapping == {
+        "fastapi routes": ("fastapi router", "FastAPI Router"),
+        "redis": ("redis", "Redis"),
+    }
+
+
+async def test_new_names_in_one_batch_collapse_onto_the_first(monkeypatch, threshold):
+    monkeypatch.setattr(canon, "concept_embedding_cache", _FakeCache({
+        "JWT": [1.0, 0.0], "JWT tokens": [0.95, 0.05], "OAuth": [0.0, 1.0]
+    }))
+    monkeypatch.setattr(canon, "async_vector_store", _FakeStore({}))
+    mapping = await canon.canonicalize_concept_names(
+        "user", {"jwt": "JWT", "jwt tokens": "JWT tokens", "oauth": "OAuth"}
+    )
+    assert mapping == {
+        "jwt": ("jwt", "JWT"),
+        "jwt tokens": ("jwt", "JWT"),
+        "oauth": ("oauth", "OAuth"),
+    }
@@ -0,0 +1,76 @@
+"""
+Context packer: redundancy stripping and the token budget
+"""
+import json
+
+from app.core.context_packer import (
+    ContextPacker, compact_json, estimate_tokens, reduce_entry, strip_redundant
+)
+
+
+def _entry(day: int, words: int = 60):
+    return {
+        "date": f"2024-01-{day:02d}",
+        "raw_text": f"Day {day}. " + " ".join(f"word{n}" for n in range(words)) + ".",
+        "concepts": [f"concept{day}"],
+    }
+
+
+def test_strip_redundant_drops_values_repeated_in_text():
+    entry = {
+        "raw_text": "Learned FastAPI routing and wrote tests",
+        "concepts": ["FastAPI", "pytest"],
+        "activities": [{"description": "wrote tests", "duration_minutes": 30}],
+        "mood": "",
+    }
+    assert strip_redundant(entry) == {
+        "raw_text": "Learned FastAPI routing and wrote tests",
+        "concepts": ["pytest"],
+        "activities": [{"duration_minutes": 30}],
+    }
+
+
+def test_reduce_entry_keeps_opening_sentences():
+    reduced = reduce_entry({"raw_text": "Short first sentence. " + "x" * 400})
+    assert reduced["raw_text"] == "Short first sentence."
+
+
+def test_everything_fits_in_full_form_under_a_large_budget():
+    items = [_entry(day) for day in range(1, 4)]
+    text, stats = ContextPacker(10_000).pack({"user": "u"}, "logs", items)
+    context = json.loads(text)
+    assert stats["included"] == 3 and stats["reduced"] == 0
+    assert "omitted_entries" not in context
+    assert [log["raw_text"] for log in context["logs"]] == [item["raw_text"] for item in items]
+
+
+def test_pack_stays_within_budget_and_prefers_recent_entries():
+    items = [_entry(day) for day in range(1, 11)]
+    budget = 300
+    text, stats = ContextPacker(budget).pack({"user": "u"}, "logs", items)
+    context = json.loads(text)
+    
+    assert estimate_tokens(text) <= budget
+    assert stats["tokens"] <= budget
+    assert 0 < stats["included"] < len(items)
+    assert context["omitted_entries"] == len(items) - stats["included"]
+    kept = [log["date"] for log in context["logs"]]
+    # Most recent first by priority, output in original order
+    assert kept == sorted(kept)
+    assert kept[-1] == "2024-01-10"
+
+
+def test_reduced_entries_are_upgraded_only_while_budget_allows():
+    items = [_entry(day, words=120) for day in range(1, 4)]
+    base = estimate_tokens(compact_json({"logs": [], "omitted_entries": 3}))
+    reduced = [estimate_tokens(compact_json(strip_redundant(reduce_entry(i)))) for i in items]
+    upgrade = estimate_tokens(compact_json(strip_redundant(items[-1]))) - reduced[-1]
+    # Room for all three reduced, and for upgrading only the latest to full text
+    budget = base + sum(cost + 1 for cost in reduced) + upgrade + upgrade // 2
+    text, stats = ContextPacker(budget).pack({}, "logs", items)
+    context = json.loads(text)
+    
+    assert stats["included"] == 3
+    assert stats["reduced"] == 2
+    assert context["logs"][-1]["raw_text"] == items[-1]["raw_text"]
+    assert estimate_tokens(text) <= budget
@@ -0,0 +1,57 @@
+"""
+Extraction cache: running size totals, LRU eviction and primary-only storage
+"""
+import json
+
+from app.services.extraction_cache import ExtractionCache
+from app.services import llm_service as llm_module
+from app.services.llm_service import llm_service
+
+
+def _size(value) -> int:
+    return len(json.dumps(value).encode("utf-8"))
+
+
+def test_running_totals_track_inserts_replacements_and_eviction(tmp_path):
+    first, second = {"concepts": ["a" * 40]}, {"concepts": ["b" * 40]}
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite3"), max_bytes=_size(first) + _size(second))
+    
+    cache.set("k1", first)
+    cache.set("k2", second)
+    cache.set("k1", first)  # Replacement does not double count
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["size_bytes"] == _size(first) + _size(second)
+    
+    assert cache.get("k1") == first  # k2 is now least recently used
+    cache.set("k3", {"concepts": ["c"]})
+    assert cache.get("k2") is None
+    assert cache.get("k1") == first
+    
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["size_bytes"] <= stats["max_bytes"]
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    
+    # Totals survive a reopen
+    reopened = ExtractionCache(str(tmp_path / "cache.sqlite3"), max_bytes=stats["max_bytes"])
+    assert reopened.stats()["size_bytes"] == stats["size_bytes"]
+
+
+async def test_fallback_extractions_are_not_cached(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    monkeypatch.setattr(llm_module, "extraction_cache", cache)
+    answers = {"provider": "openai"}
+    
+    async def fake_agenerate(prompt, temperature):
+        return answers["provider"], json.dumps({"concepts": [answers["provider"]]})
+    
+    monkeypatch.setattr(llm_service, "_agenerate", fake_agenerate)
+    
+    assert await llm_service.aextract_structured_data("Learned joins") == {"concepts": ["openai"]}
+    assert cache.stats()["entries"] == 0
+    
+    answers["provider"] = "gemini"
+    assert await llm_service.aextract_structured_data("Learned joins") == {"concepts": ["gemini"]}
+    answers["provider"] = "openai"
+    assert await llm_service.aextract_structured_data("Learned  joins") == {"concepts": ["gemini"]}
+    assert cache.stats()["hits"] == 1
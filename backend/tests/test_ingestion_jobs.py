@@ -0,0 +1,60 @@
+"""
+Background ingestion jobs: non-blocking enqueue and extraction failures
+"""
+from datetime import date
+import uuid
+
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from app.models import DailyLog, IngestionJob
+from app.services import ingestion_jobs
+from app.services.ingestion_jobs import IngestionWorkerPool, initial_stages
+
+
+class _Session:
+    """Stands in for the job's AsyncSession; nothing reaches a database"""
+    
+    async def commit(self):
+        pass
+    
+    async def rollback(self):
+        pass
+    
+    async def refresh(self, obj):
+        pass
+
+
+def _pool(max_queue_size: int = 10) -> IngestionWorkerPool:
+    return IngestionWorkerPool(1, max_queue_size, lease_seconds=60, sweep_interval_seconds=0)
+
+
+async def test_enqueue_never_blocks_on_full_queue():
+    pool = _pool(max_queue_size=1)
+    first, second = uuid.uuid4(), uuid.uuid4()
+    
+    assert pool.enqueue(first) is True
+    assert pool.enqueue(first) is True  # Already pending, not queued twice
+    assert pool.queue.qsize() == 1
+    
+    assert pool.enqueue(second) is False
+    assert second not in pool.pending
+
+
+async def test_extraction_outage_fails_the_stage(monkeypatch):
+    async def unavailable(raw_text):
+        raise Exception("All LLM providers failed")
+    
+    monkeypatch.setattr(ingestion_jobs.llm_service, "aextract_structured_data", unavailable)
+    
+    log = DailyLog(id=uuid.uuid4(), user_id=uuid.uuid4(), log_date=date(2026, 10, 1), raw_text="Learned asyncio")
+    job = IngestionJob(id=uuid.uuid4(), log_id=log.id, status="running", stages=initial_stages())
+    
+    await _pool()._run_stages(_Session(), job, log)
+    
+    assert job.status == "failed"
+    assert job.stages["extraction"] == "failed"
+    assert job.stages["normalization"] == "pending"
+    assert job.error.startswith("extraction:")
+    assert log.structured_data is None
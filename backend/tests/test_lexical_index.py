@@ -0,0 +1,64 @@
+"""
+BM25 scoring, incremental updates and reciprocal rank fusion
+"""
+from app.core.lexical_index import BM25Index, LexicalSearchIndex, tokenize, reciprocal_rank_fusion
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    tokens = tokenize("Fixed asyncpg error in app.core/vector-store")
+    assert "asyncpg" in tokens
+    assert "app.core/vector-store" in tokens
+    assert {"app", "core", "vector", "store"} <= set(tokens)
+
+
+def test_rare_terms_outscore_common_ones():
+    index = BM25Index()
+    index.add("a", "python jwt tokens", {"id": "a"})
+    index.add("b", "python routing", {"id": "b"})
+    index.add("c", "python testing", {"id": "c"})
+    results = index.search("python jwt", limit=3)
+    assert results[0][1]["id"] == "a"
+    assert len(results) == 3
+
+
+def test_readding_replaces_and_remove_forgets():
+    index = BM25Index()
+    index.add("a", "redis caching", {"id": "a"})
+    index.add("a", "postgres indexes", {"id": "a"})
+    assert index.search("redis", limit=5) == []
+    assert index.search("postgres", limit=5)[0][1]["id"] == "a"
+    assert len(index) == 1
+    
+    index.remove("a")
+    assert len(index) == 0
+    assert index.total_length == 0
+    assert index.postings == {}
+
+
+def test_search_logs_applies_user_and_date_filters():
+    index = LexicalSearchIndex()
+    index.index_log("1", "u1", "2024-01-05", "learned JWT", ["JWT"])
+    index.index_log("2", "u2", "2024-01-06", "learned JWT too", ["JWT"])
+    index.index_log("3", "u1", "2024-02-01", "JWT refresh tokens", ["JWT"])
+    
+    hits = index.search_logs("jwt", 10, user_id="u1", end_date="2024-01-31")
+    assert [hit["log_id"] for hit in hits] == ["1"]
+
+
+def test_replace_swaps_in_fresh_index():
+    index = LexicalSearchIndex()
+    index.index_concept("old", "u1", "Celery", None, None)
+    fresh = LexicalSearchIndex()
+    fresh.index_concept("new", "u1", "Kafka", None, None)
+    
+    index.replace(fresh)
+    assert index.search_concepts("celery", 5) == []
+    assert index.search_concepts("kafka", 5)[0]["concept_id"] == "new"
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert fused["b"] == 1 / 62 + 1 / 61
+    assert fused["a"] == 1 / 61
+    assert max(fused, key=fused.get) == "b"
+    assert set(fused) == {"a", "b", "c", "d"}
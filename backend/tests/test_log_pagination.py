@@ -0,0 +1,45 @@
+"""
+Keyset cursor encoding and column projection for GET /logs/daily
+"""
+import uuid
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+pytest.importorskip("sentence_transformers")
+
+from app.api.v1.ingestion import _encode_cursor, _decode_cursor, _parse_fields, LIST_FIELDS
+
+
+def test_cursor_round_trips_date_and_id():
+    log_id = uuid.uuid4()
+    cursor = _encode_cursor(date(2024, 3, 9), log_id)
+    assert "|" not in cursor and "/" not in cursor and "+" not in cursor
+    assert _decode_cursor(cursor) == (date(2024, 3, 9), log_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "MjAyNC0wMy0wOQ==",  # date without id
+    "bm90LWEtZGF0ZXxub3QtYS11dWlk",  # "not-a-date|not-a-uuid"
+])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_fields_default_to_every_list_column():
+    assert _parse_fields(None) == list(LIST_FIELDS)
+
+
+def test_fields_always_include_cursor_keys_once():
+    assert _parse_fields("mood, log_date") == ["id", "log_date", "mood"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as error:
+        _parse_fields("mood,hashed_password")
+    assert error.value.status_code == 400
+    assert "hashed_password" in error.value.detail
@@ -0,0 +1,67 @@
+"""
+Mastery scoring: difficulty/mood weights, decay measured against today and level saturation
+"""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.services.mastery import (
+    mastery_label, average_difficulty, update_mastery,
+    mention_weight, mastery_level, score_mastery
+)
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+    
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+
+def test_mastery_label_bands():
+    assert [mastery_label(level) for level in (None, 1, 2, 3, 4, 5)] == [
+        "beginner", "beginner", "beginner", "intermediate", "advanced", "advanced"
+    ]
+
+
+def test_average_difficulty_rounds_to_label_and_ignores_unknown():
+    assert average_difficulty(["easy", "hard"]) == "medium"
+    assert average_difficulty(["easy", "easy", "medium"]) == "easy"
+    assert average_difficulty(["hard", "hard", "medium"]) == "hard"
+    assert average_difficulty([None, "unknown"]) is None
+
+
+async def test_update_mastery_skips_empty_input():
+    db = _RecordingSession()
+    await update_mastery(db, [])
+    assert db.statements == []
+
+
+def test_mention_weight_combines_difficulty_mood_and_half_life():
+    half_life = settings.mastery_half_life_days
+    assert mention_weight("hard", "positive", 0) == pytest.approx(1.3 * 1.1)
+    assert mention_weight("easy", "frustrated", 0) == pytest.approx(0.8 * 0.8)
+    assert mention_weight(None, "unknown", 0) == 1.0
+    assert mention_weight("medium", "neutral", half_life) == pytest.approx(0.5)
+    assert mention_weight("medium", "neutral", 2 * half_life) == pytest.approx(0.25)
+    # Future-dated logs count as today's rather than weighing more
+    assert mention_weight("medium", "neutral", -10) == 1.0
+
+
+def test_mastery_level_saturates_onto_one_to_five():
+    saturation = settings.mastery_saturation
+    assert mastery_level(0) == 1
+    assert mastery_level(saturation) == 4  # 1 + round(4 * (1 - 1/e)) = 1 + round(2.53)
+    assert mastery_level(100 * saturation) == 5
+    levels = [mastery_level(score / 4) for score in range(0, 80)]
+    assert levels == sorted(levels)
+
+
+def test_unpractised_concepts_fade_with_age():
+    recent = [("hard", "positive", 0)] * 4
+    assert score_mastery(recent) == 4
+    # The same practice, two months ago
+    stale = [(d, m, age + 60) for d, m, age in recent]
+    assert score_mastery(stale) == 1
+    assert score_mastery([]) == 1
@@ -0,0 +1,36 @@
+"""
+NumPy vector index: repeated ids within a batch and single-process locking
+"""
+import pytest
+
+from app.core.numpy_vector_store import NumpyVectorIndex, fcntl
+
+
+def test_repeated_id_in_one_batch_keeps_last_write(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path), dim=2, keyword_fields=["user_id"])
+    index.upsert([
+        ("p1", [1.0, 0.0], {"user_id": "u", "v": 1}),
+        ("p2", [0.0, 1.0], {"user_id": "u", "v": 2}),
+        ("p1", [0.6, 0.8], {"user_id": "u", "v": 3}),
+    ])
+    
+    assert index.count == 2
+    assert int(index.alive.sum()) == 2
+    assert index.get("p1") == {"user_id": "u", "v": 3}
+    hits = index.search([1.0, 0.0], limit=10)
+    assert [payload["v"] for _, payload in hits] == [3, 2]
+    
+    index.close()
+    reopened = NumpyVectorIndex(str(tmp_path), dim=2)
+    assert reopened.count == 2
+    assert reopened.get("p1")["v"] == 3
+    reopened.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="flock is POSIX-only")
+def test_second_opener_fails_fast(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path), dim=2)
+    with pytest.raises(RuntimeError, match="single worker process"):
+        NumpyVectorIndex(str(tmp_path), dim=2)
+    index.close()
+    NumpyVectorIndex(str(tmp_path), dim=2).close()
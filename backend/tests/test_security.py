@@ -0,0 +1,112 @@
+"""
+Password hashing, token issuing and the JWT verification cache
+"""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.exc import IntegrityError
+
+from app.api.v1 import auth
+from app.config import settings
+from app.core import security
+from app.core.security import (
+    TokenVerifier, InvalidTokenError, create_access_token, hash_password, verify_password
+)
+from app.schemas.common import UserCreate
+
+
+def _expired(*args, **kwargs):
+    raise jwt.ExpiredSignatureError("Signature has expired.")
+
+
+def test_password_round_trip_and_passwordless_accounts():
+    hashed = hash_password("correct horse")
+    assert verify_password("correct horse", hashed)
+    assert not verify_password("wrong horse", hashed)
+    assert not verify_password("anything", None)
+
+
+def test_repeat_verification_is_served_from_cache(monkeypatch):
+    verifier = TokenVerifier()
+    user_id = uuid.uuid4()
+    token, _ = create_access_token(user_id)
+    
+    assert verifier.verify(token) == user_id
+    decode = jwt.decode
+    calls = []
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **kw: calls.append(a) or decode(*a, **kw))
+    assert verifier.verify(token) == user_id
+    assert calls == []
+    assert verifier.stats()["hits"] == 1 and verifier.stats()["misses"] == 1
+
+
+def test_cached_entry_expires_with_the_token(monkeypatch):
+    verifier = TokenVerifier()
+    token, lifetime = create_access_token(uuid.uuid4())
+    verifier.verify(token)
+    
+    # Past the token's exp the cache entry is dropped and the token fully re-checked
+    now = security.time.time()
+    monkeypatch.setattr(security.time, "time", lambda: now + lifetime + 1)
+    monkeypatch.setattr(security.jwt, "decode", _expired)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+    assert verifier.stats()["entries"] == 0
+    assert verifier.stats()["misses"] == 2
+
+
+def test_cache_is_lru_bounded():
+    verifier = TokenVerifier(max_entries=2)
+    tokens = [create_access_token(uuid.uuid4())[0] for _ in range(3)]
+    verifier.verify(tokens[0])
+    verifier.verify(tokens[1])
+    verifier.verify(tokens[0])  # refresh: tokens[1] is now least recent
+    verifier.verify(tokens[2])
+    assert list(verifier._entries) == [tokens[0], tokens[2]]
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-jwt",
+    jwt.encode({"sub": str(uuid.uuid4()), "exp": 4102444800}, "other-secret", algorithm="HS256"),
+    jwt.encode({"exp": 4102444800}, settings.secret_key, algorithm=settings.jwt_algorithm),
+    jwt.encode({"sub": "not-a-uuid", "exp": 4102444800}, settings.secret_key, algorithm=settings.jwt_algorithm),
+])
+def test_invalid_tokens_are_rejected_and_not_cached(token):
+    verifier = TokenVerifier()
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+    assert verifier.stats()["entries"] == 0
+
+
+class _RacingSession:
+    """Email looks free at the check, but a concurrent registration commits first"""
+    
+    def __init__(self):
+        self.rolled_back = False
+    
+    async def execute(self, statement):
+        class _Result:
+            def scalar_one_or_none(self):
+                return None
+        return _Result()
+    
+    def add(self, obj):
+        pass
+    
+    async def commit(self):
+        raise IntegrityError("INSERT INTO users", {}, Exception("duplicate key"))
+    
+    async def rollback(self):
+        self.rolled_back = True
+
+
+async def test_concurrent_registration_returns_400():
+    db = _RacingSession()
+    with pytest.raises(HTTPException) as raised:
+        await auth.register(UserCreate(email="Dup@Example.com", password="secret-pass"), db)
+    
+    assert raised.value.status_code == 400
+    assert "dup@example.com" in raised.value.detail
+    assert db.rolled_back
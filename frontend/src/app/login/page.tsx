@@ -0,0 +1,148 @@
+"use client";
+
+import { Suspense, useState } from "react";
+import { useRouter, useSearchParams } from "next/navigation";
+import { Brain, Loader2, LogIn, UserPlus } from "lucide-react";
+import { api } from "@/lib/api";
+
+function LoginForm() {
+  const router = useRouter();
+  const searchParams = useSearchParams();
+  const [mode, setMode] = useState<"login" | "register">("login");
+  const [email, setEmail] = useState("");
+  const [password, setPassword] = useState("");
+  const [fullName, setFullName] = useState("");
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    setLoading(true);
+    setError(null);
+
+    try {
+      if (mode === "login") {
+        await api.login(email, password);
+      } else {
+        await api.register(email, password, fullName || undefined);
+      }
+      // Only follow same-site paths back after logging in
+      const next = searchParams.get("next");
+      router.replace(next && next.startsWith("/") && !next.startsWith("//") ? next : "/");
+    } catch (err: any) {
+      setError(err.message || "Authentication failed");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="min-h-screen bg-background flex items-center justify-center px-6">
+      <div className="w-full max-w-md space-y-8">
+        {/* Title */}
+        <div className="text-center space-y-3">
+          <div className="w-12 h-12 mx-auto rounded-xl bg-gradient-to-br from-purple-600 to-cyan-500 flex items-center justify-center glow-sm">
+            <Brain className="w-7 h-7 text-white" />
+          </div>
+          <h1 className="text-4xl font-bold gradient-text">
+            {mode === "login" ? "Welcome back" : "Create your account"}
+          </h1>
+          <p className="text-muted-foreground">
+            {mode === "login" ? "Log in to continue your learning journal." : "Start tracking your internship journey."}
+          </p>
+        </div>
+
+        {/* Form */}
+        <form onSubmit={handleSubmit} className="card-glass space-y-4">
+          {mode === "register" && (
+            <div className="space-y-2">
+              <label className="text-sm font-medium">Full name</label>
+              <input
+                type="text"
+                value={fullName}
+                onChange={(e) => setFullName(e.target.value)}
+                className="input"
+                autoComplete="name"
+              />
+            </div>
+          )}
+
+          <div className="space-y-2">
+            <label className="text-sm font-medium">Email</label>
+            <input
+              type="email"
+              value={email}
+              onChange={(e) => setEmail(e.target.value)}
+              className="input"
+              autoComplete="email"
+              required
+            />
+          </div>
+
+          <div className="space-y-2">
+            <label className="text-sm font-medium">Password</label>
+            <input
+              type="password"
+              value={password}
+              onChange={(e) => setPassword(e.target.value)}
+              className="input"
+              autoComplete={mode === "login" ? "current-password" : "new-password"}
+              minLength={mode === "register" ? 8 : undefined}
+              required
+            />
+          </div>
+
+          {/* Submit Button */}
+          <button
+            type="submit"
+            disabled={loading}
+            className="btn-primary w-full disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {loading ? (
+              <Loader2 className="w-5 h-5 animate-spin" />
+            ) : mode === "login" ? (
+              <>
+                <LogIn className="w-5 h-5" />
+                <span>Log In</span>
+              </>
+            ) : (
+              <>
+                <UserPlus className="w-5 h-5" />
+                <span>Create Account</span>
+              </>
+            )}
+          </button>
+
+          {/* Error Message */}
+          {error && (
+            <div className="p-4 rounded-lg bg-destructive/10 border border-destructive/20 text-destructive">
+              <p className="text-sm font-medium">{error}</p>
+            </div>
+          )}
+        </form>
+
+        <p className="text-center text-sm text-muted-foreground">
+          {mode === "login" ? "New here?" : "Already have an account?"}{" "}
+          <button
+            type="button"
+            onClick={() => {
+              setMode(mode === "login" ? "register" : "login");
+              setError(null);
+            }}
+            className="text-primary hover:underline"
+          >
+            {mode === "login" ? "Create an account" : "Log in"}
+          </button>
+        </p>
+      </div>
+    </div>
+  );
+}
+
+export default function LoginPage() {
+  return (
+    <Suspense>
+      <LoginForm />
+    </Suspense>
+  );
+}
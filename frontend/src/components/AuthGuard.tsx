@@ -0,0 +1,20 @@
+"use client";
+
+import { useEffect } from "react";
+import { usePathname } from "next/navigation";
+import { api, redirectToLogin } from "@/lib/api";
+
+const PUBLIC_PATHS = ["/login"];
+
+// Sends visitors without a stored token to /login; expired tokens are caught on the first 401
+export default function AuthGuard({ children }: { children: React.ReactNode }) {
+  const pathname = usePathname();
+
+  useEffect(() => {
+    if (!PUBLIC_PATHS.includes(pathname) && !api.getToken()) {
+      redirectToLogin();
+    }
+  }, [pathname]);
+
+  return <>{children}</>;
+}
@@ -1,4 +1,5 @@
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+const TOKEN_STORAGE_KEY = 'intern_ai_token';
 
 export interface DailyLog {
   id: string;
@@ -18,16 +19,97 @@ export interface SummaryRequest {
   end_date?: string;
 }
 
+export interface TokenResponse {
+  access_token: string;
+  token_type: string;
+  expires_in: number;
+}
+
 export class ApiClient {
   private baseUrl: string;
+  private token: string | null = null;
 
   constructor() {
     this.baseUrl = API_BASE_URL;
   }
 
+  setToken(token: string | null) {
+    this.token = token;
+    if (typeof window === 'undefined') return;
+    if (token) {
+      window.localStorage.setItem(TOKEN_STORAGE_KEY, token);
+    } else {
+      window.localStorage.removeItem(TOKEN_STORAGE_KEY);
+    }
+  }
+
+  getToken(): string | null {
+    if (!this.token && typeof window !== 'undefined') {
+      this.token = window.localStorage.getItem(TOKEN_STORAGE_KEY);
+    }
+    return this.token;
+  }
+
+  logout() {
+    this.setToken(null);
+    redirectToLogin();
+  }
+
+  private authHeaders(headers: Record<string, string> = {}): Record<string, string> {
+    const token = this.getToken();
+    return token ? { ...headers, Authorization: `Bearer ${token}` } : headers;
+  }
+
+  // Authenticated request: an expired or invalid token sends the user back to /login
+  private async authFetch(path: string, init: RequestInit = {}): Promise<Response> {
+    const response = await fetch(`${this.baseUrl}${path}`, {
+      ...init,
+      headers: this.authHeaders(init.headers as Record<string, string>),
+    });
+    if (response.status === 401) {
+      this.logout();
+      throw new Error('Session expired, please log in again');
+    }
+    return response;
+  }
+
+  // Auth
+  async register(email: string, password: string, full_name?: string): Promise<TokenResponse> {
+    const response = await fetch(`${this.baseUrl}/api/v1/auth/register`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ email, password, full_name }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to register');
+    }
+
+    const token: TokenResponse = await response.json();
+    this.setToken(token.access_token);
+    return token;
+  }
+
+  async login(email: string, password: string): Promise<TokenResponse> {
+    const response = await fetch(`${this.baseUrl}/api/v1/auth/token`, {
+      method: 'POST',
+      body: new URLSearchParams({ username: email, password }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to log in');
+    }
+
+    const token: TokenResponse = await response.json();
+    this.setToken(token.access_token);
+    return token;
+  }
+
   // Daily Logs
   async createDailyLog(log_date: string, raw_text: string): Promise<DailyLog> {
-    const response = await fetch(`${this.baseUrl}/api/v1/logs/daily`, {
+    const response = await this.authFetch('/api/v1/logs/daily', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ log_date, raw_text }),
@@ -42,7 +124,7 @@ export class ApiClient {
   }
 
   async getDailyLog(date: string): Promise<DailyLog> {
-    const response = await fetch(`${this.baseUrl}/api/v1/logs/daily/${date}`);
+    const response = await this.authFetch(`/api/v1/logs/daily/${date}`);
     
     if (!response.ok) {
       throw new Error('Log not found');
@@ -51,21 +133,30 @@ export class ApiClient {
     return response.json();
   }
 
-  async listDailyLogs(skip: number = 0, limit: number = 10): Promise<DailyLog[]> {
-    const response = await fetch(
-      `${this.baseUrl}/api/v1/logs/daily?skip=${skip}&limit=${limit}`
-    );
+  async listDailyLogs(
+    limit: number = 10,
+    cursor?: string,
+    fields?: (keyof DailyLog)[]
+  ): Promise<{ logs: Partial<DailyLog>[]; nextCursor: string | null }> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (cursor) params.set('cursor', cursor);
+    if (fields) params.set('fields', fields.join(','));
+
+    const response = await this.authFetch(`/api/v1/logs/daily?${params}`);
 
     if (!response.ok) {
       throw new Error('Failed to fetch logs');
     }
 
-    return response.json();
+    return {
+      logs: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
   }
 
   // Reasoning
   async generateSummary(request: SummaryRequest): Promise<any> {
-    const response = await fetch(`${this.baseUrl}/api/v1/reasoning/summarize`, {
+    const response = await this.authFetch('/api/v1/reasoning/summarize', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(request),
@@ -80,7 +171,7 @@ export class ApiClient {
   }
 
   async explainConcept(concept_name: string): Promise<any> {
-    const response = await fetch(`${this.baseUrl}/api/v1/reasoning/explain`, {
+    const response = await this.authFetch('/api/v1/reasoning/explain', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ concept_name }),
@@ -95,7 +186,7 @@ export class ApiClient {
   }
 
   async semanticSearch(query: string, searchType: 'concepts' | 'logs' = 'concepts', limit: number = 5): Promise<any> {
-    const response = await fetch(`${this.baseUrl}/api/v1/reasoning/search`, {
+    const response = await this.authFetch('/api/v1/reasoning/search', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ query, search_type: searchType, limit }),
@@ -110,7 +201,7 @@ export class ApiClient {
   }
 
   async getLearningGuidance(): Promise<any> {
-    const response = await fetch(`${this.baseUrl}/api/v1/reasoning/guidance`);
+    const response = await this.authFetch('/api/v1/reasoning/guidance');
 
     if (!response.ok) {
       throw new Error('Failed to get guidance');
@@ -126,4 +217,10 @@ export class ApiClient {
   }
 }
 
+export function redirectToLogin() {
+  if (typeof window === 'undefined' || window.location.pathname === '/login') return;
+  const next = encodeURIComponent(window.location.pathname + window.location.search);
+  window.location.href = `/login?next=${next}`;
+}
+
 export const api = new ApiClient();